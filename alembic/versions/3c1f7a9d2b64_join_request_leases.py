@@ -0,0 +1,43 @@
+"""join request leases
+
+Revision ID: 3c1f7a9d2b64
+Revises: e90fe0fd055f
+Create Date: 2026-10-16 11:02:17.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f7a9d2b64'
+down_revision: Union[str, Sequence[str], None] = 'e90fe0fd055f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A new enum value must be committed before it can be used, e.g. in the index below.
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE joinrequeststatus ADD VALUE IF NOT EXISTS 'PROCESSING'")
+    op.add_column(
+        'channel_join_requests',
+        sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        'ix_join_requests_claimable',
+        'channel_join_requests',
+        ['created_at'],
+        postgresql_where=sa.text("status IN ('PENDING', 'PROCESSING')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_join_requests_claimable', table_name='channel_join_requests')
+    op.drop_column('channel_join_requests', 'locked_until')
+    # Postgres cannot drop an enum value; hand in-flight requests back as pending instead.
+    op.execute("UPDATE channel_join_requests SET status = 'PENDING' WHERE status = 'PROCESSING'")
@@ -0,0 +1,41 @@
+"""resolved entities
+
+Revision ID: 8d4e2b6c1a57
+Revises: 3c1f7a9d2b64
+Create Date: 2026-10-16 13:41:05.219374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4e2b6c1a57'
+down_revision: Union[str, Sequence[str], None] = '3c1f7a9d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'resolved_entities',
+        sa.Column('identifier', sa.String(), nullable=False),
+        sa.Column('peer_id', sa.BigInteger(), nullable=True),
+        sa.Column('access_hash', sa.BigInteger(), nullable=True),
+        # The chattype enum already exists (channels.type).
+        sa.Column('type', postgresql.ENUM(name='chattype', create_type=False), nullable=True),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('username', sa.String(), nullable=True),
+        sa.Column('resolved_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('identifier'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('resolved_entities')
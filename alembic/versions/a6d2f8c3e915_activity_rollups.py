@@ -0,0 +1,70 @@
+"""activity rollups
+
+Revision ID: a6d2f8c3e915
+Revises: f3c9a1e7b524
+Create Date: 2026-10-17 00:04:51.372916
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2f8c3e915'
+down_revision: Union[str, Sequence[str], None] = 'f3c9a1e7b524'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'channel_activity_hourly',
+        sa.Column('channel_id', sa.UUID(), nullable=False),
+        sa.Column('hour', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('message_count', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['channel_id'], ['channels.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('channel_id', 'hour'),
+    )
+    op.create_index('ix_channel_activity_hourly_hour', 'channel_activity_hourly', ['hour'])
+    op.create_table(
+        'tag_activity_daily',
+        sa.Column('tag_id', sa.UUID(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('message_count', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tag_id', 'day'),
+    )
+    op.create_index('ix_tag_activity_daily_day', 'tag_activity_daily', ['day'])
+    op.create_table(
+        'subscription_matches_daily',
+        sa.Column('subscription_id', sa.UUID(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('match_count', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['subscription_id'], ['subscriptions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('subscription_id', 'day'),
+    )
+    op.create_index('ix_subscription_matches_daily_day', 'subscription_matches_daily', ['day'])
+
+    # Backfill from the messages still in Postgres, tagged by their channel's current
+    # tags. Past matches were never stored, so the match rollup starts empty.
+    op.execute(
+        "INSERT INTO channel_activity_hourly (channel_id, hour, message_count) "
+        "SELECT channel_id, date_trunc('hour', sent_at, 'UTC'), count(*) FROM messages "
+        "WHERE channel_id IS NOT NULL GROUP BY 1, 2"
+    )
+    op.execute(
+        "INSERT INTO tag_activity_daily (tag_id, day, message_count) "
+        "SELECT t.tag_id, (a.hour AT TIME ZONE 'UTC')::date, sum(a.message_count) "
+        "FROM channel_activity_hourly a JOIN channels c ON c.id = a.channel_id "
+        "CROSS JOIN unnest(c.tag_ids) AS t(tag_id) GROUP BY 1, 2"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('subscription_matches_daily')
+    op.drop_table('tag_activity_daily')
+    op.drop_table('channel_activity_hourly')
@@ -0,0 +1,36 @@
+"""keyset pagination indexes
+
+Revision ID: b7a3c9e1f402
+Revises: 8d4e2b6c1a57
+Create Date: 2026-10-16 15:20:48.663102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7a3c9e1f402'
+down_revision: Union[str, Sequence[str], None] = '8d4e2b6c1a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY so building them on a large messages table does not block ingestion.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_messages_sent_at_id', 'messages', ['sent_at', 'id'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_channels_name_id', 'channels', [sa.text("coalesce(name, '')"), 'id'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_subscriptions_created_at_id', 'subscriptions', ['created_at', 'id'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_users_full_name_id', 'users', ['full_name', 'id'], postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_full_name_id', table_name='users')
+    op.drop_index('ix_subscriptions_created_at_id', table_name='subscriptions')
+    op.drop_index('ix_channels_name_id', table_name='channels')
+    op.drop_index('ix_messages_sent_at_id', table_name='messages')
@@ -0,0 +1,33 @@
+"""join request identifier lower index
+
+Revision ID: b8d3e6f1a427
+Revises: a6d2f8c3e915
+Create Date: 2026-10-17 01:12:40.218364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d3e6f1a427'
+down_revision: Union[str, Sequence[str], None] = 'a6d2f8c3e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Duplicate checks compare @usernames case-insensitively.
+    op.create_index(
+        'ix_join_requests_identifier_lower',
+        'channel_join_requests',
+        [sa.text('lower(identifier)')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_join_requests_identifier_lower', table_name='channel_join_requests')
@@ -0,0 +1,48 @@
+"""message full-text search
+
+Revision ID: c4e8f2a6d913
+Revises: b7a3c9e1f402
+Create Date: 2026-10-16 17:05:12.418337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8f2a6d913'
+down_revision: Union[str, Sequence[str], None] = 'b7a3c9e1f402'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Adding a stored generated column rewrites the table once.
+    op.add_column('messages', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple', coalesce(content, ''))", persisted=True),
+        nullable=True,
+    ))
+
+    # pg_trgm is a contrib extension and may not be installed on the server.
+    # Without it, substring search still works, just without an index.
+    has_trgm = op.get_bind().scalar(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"))
+    if has_trgm:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_messages_search_vector', 'messages', ['search_vector'], postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+        if has_trgm:
+            op.create_index('ix_messages_content_trgm', 'messages', ['content'], postgresql_using='gin', postgresql_ops={'content': 'gin_trgm_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_content_trgm', table_name='messages', if_exists=True)
+    op.drop_index('ix_messages_search_vector', table_name='messages')
+    op.drop_column('messages', 'search_vector')
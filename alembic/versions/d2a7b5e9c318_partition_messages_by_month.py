@@ -0,0 +1,140 @@
+"""partition messages by month
+
+Revision ID: d2a7b5e9c318
+Revises: c4e8f2a6d913
+Create Date: 2026-10-16 19:42:37.905114
+
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7b5e9c318'
+down_revision: Union[str, Sequence[str], None] = 'c4e8f2a6d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same as MESSAGE_PARTITION_PREMAKE_MONTHS; the maintenance task takes over from here.
+PREMAKE_MONTHS = 3
+
+MESSAGE_COLUMNS = "id, telegram_message_id, channel_id, channel_telegram_id, content, sent_at, created_at"
+
+
+# A frozen copy of app.core.months.add_months: a migration must keep doing what
+# it did when it was written, whatever happens to the app code.
+def _add_months(month: datetime.date, count: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _months(first: datetime.date, last: datetime.date):
+    month = first.replace(day=1)
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def _message_columns() -> list:
+    return [
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('telegram_message_id', sa.BigInteger(), nullable=False),
+        sa.Column('channel_id', sa.UUID(), nullable=True),
+        sa.Column('channel_telegram_id', sa.BigInteger(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('simple', coalesce(content, ''))", persisted=True), nullable=True),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    ]
+
+
+def _create_message_indexes() -> None:
+    # Not CONCURRENTLY: this runs inside the migration's transaction, and
+    # indexes on a partitioned table cannot be built concurrently anyway.
+    op.create_index('ix_messages_telegram_message_id', 'messages', ['telegram_message_id'])
+    op.create_index('ix_messages_channel_id', 'messages', ['channel_id'])
+    op.create_index('ix_messages_channel_telegram_id', 'messages', ['channel_telegram_id'])
+    op.create_index('ix_messages_sent_at_id', 'messages', ['sent_at', 'id'])
+    op.create_index('ix_messages_search_vector', 'messages', ['search_vector'], postgresql_using='gin')
+    has_trgm = op.get_bind().scalar(sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+    if has_trgm:
+        op.create_index('ix_messages_content_trgm', 'messages', ['content'], postgresql_using='gin', postgresql_ops={'content': 'gin_trgm_ops'})
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The new tables are filled before they get keys and indexes, which is much
+    # faster than maintaining them row by row. This runs in one transaction and
+    # blocks writes to messages until it commits.
+    op.create_table('messages_partitioned', *_message_columns(), postgresql_partition_by='RANGE (sent_at)')
+    op.create_table(
+        'message_tags_partitioned',
+        sa.Column('message_id', sa.UUID(), nullable=False),
+        sa.Column('message_sent_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('tag_id', sa.UUID(), nullable=False),
+        postgresql_partition_by='RANGE (message_sent_at)',
+    )
+
+    bind = op.get_bind()
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    oldest = bind.scalar(sa.text("SELECT min(sent_at) FROM messages"))
+    first_month = min(oldest.astimezone(datetime.timezone.utc).date(), today) if oldest else today
+    for parent in ('messages', 'message_tags'):
+        op.execute(f"CREATE TABLE {parent}_default PARTITION OF {parent}_partitioned DEFAULT")
+        for month in _months(first_month, _add_months(today.replace(day=1), PREMAKE_MONTHS)):
+            op.execute(
+                f"CREATE TABLE {parent}_y{month.year}m{month.month:02d} PARTITION OF {parent}_partitioned "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') TO ('{_add_months(month, 1).isoformat()} 00:00+00')"
+            )
+
+    op.execute(f"INSERT INTO messages_partitioned ({MESSAGE_COLUMNS}) SELECT {MESSAGE_COLUMNS} FROM messages")
+    op.execute(
+        "INSERT INTO message_tags_partitioned (message_id, message_sent_at, tag_id) "
+        "SELECT mt.message_id, m.sent_at, mt.tag_id FROM message_tags mt JOIN messages m ON m.id = mt.message_id"
+    )
+
+    op.drop_table('message_tags')
+    op.drop_table('messages')
+    op.rename_table('messages_partitioned', 'messages')
+    op.rename_table('message_tags_partitioned', 'message_tags')
+
+    op.create_primary_key('messages_pkey', 'messages', ['id', 'sent_at'])
+    op.create_unique_constraint('uq_messages_channel_message', 'messages', ['channel_telegram_id', 'telegram_message_id', 'sent_at'])
+    op.create_foreign_key('messages_channel_id_fkey', 'messages', 'channels', ['channel_id'], ['id'], ondelete='SET NULL')
+    _create_message_indexes()
+
+    op.create_primary_key('message_tags_pkey', 'message_tags', ['message_id', 'message_sent_at', 'tag_id'])
+    op.create_foreign_key('message_tags_message_id_fkey', 'message_tags', 'messages', ['message_id', 'message_sent_at'], ['id', 'sent_at'], ondelete='CASCADE')
+    op.create_foreign_key('message_tags_tag_id_fkey', 'message_tags', 'tags', ['tag_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Rows of partitions detached by the retention setting are not brought back.
+    op.create_table('messages_unpartitioned', *_message_columns())
+    op.create_table(
+        'message_tags_unpartitioned',
+        sa.Column('message_id', sa.UUID(), nullable=False),
+        sa.Column('tag_id', sa.UUID(), nullable=False),
+    )
+    op.execute(f"INSERT INTO messages_unpartitioned ({MESSAGE_COLUMNS}) SELECT {MESSAGE_COLUMNS} FROM messages")
+    op.execute("INSERT INTO message_tags_unpartitioned (message_id, tag_id) SELECT message_id, tag_id FROM message_tags")
+
+    # Dropping a partitioned table drops its partitions.
+    op.drop_table('message_tags')
+    op.drop_table('messages')
+    op.rename_table('messages_unpartitioned', 'messages')
+    op.rename_table('message_tags_unpartitioned', 'message_tags')
+
+    op.create_primary_key('messages_pkey', 'messages', ['id'])
+    op.create_unique_constraint('uq_messages_channel_message', 'messages', ['channel_telegram_id', 'telegram_message_id'])
+    op.create_foreign_key('messages_channel_id_fkey', 'messages', 'channels', ['channel_id'], ['id'], ondelete='SET NULL')
+    _create_message_indexes()
+
+    op.create_primary_key('message_tags_pkey', 'message_tags', ['message_id', 'tag_id'])
+    op.create_foreign_key('message_tags_message_id_fkey', 'message_tags', 'messages', ['message_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('message_tags_tag_id_fkey', 'message_tags', 'tags', ['tag_id'], ['id'], ondelete='CASCADE')
@@ -0,0 +1,42 @@
+"""unique message per channel
+
+Revision ID: e90fe0fd055f
+Revises: 
+Create Date: 2026-10-16 09:12:44.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e90fe0fd055f'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Remove duplicates left behind by re-delivered updates, keeping the first copy.
+    op.execute(
+        """
+        DELETE FROM messages m
+        USING messages d
+        WHERE m.channel_telegram_id = d.channel_telegram_id
+          AND m.telegram_message_id = d.telegram_message_id
+          AND (m.created_at, m.id) > (d.created_at, d.id)
+        """
+    )
+    op.create_unique_constraint(
+        'uq_messages_channel_message',
+        'messages',
+        ['channel_telegram_id', 'telegram_message_id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_messages_channel_message', 'messages', type_='unique')
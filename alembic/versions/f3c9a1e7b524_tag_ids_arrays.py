@@ -0,0 +1,82 @@
+"""trigger-maintained tag_ids arrays
+
+Revision ID: f3c9a1e7b524
+Revises: d2a7b5e9c318
+Create Date: 2026-10-16 23:18:44.160273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9a1e7b524'
+down_revision: Union[str, Sequence[str], None] = 'd2a7b5e9c318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# association table -> (owner table, {owner column: association column})
+TAG_IDS_TRIGGERS = {
+    'channel_tags': ('channels', {'id': 'channel_id'}),
+    'subscription_tags': ('subscriptions', {'id': 'subscription_id'}),
+    'message_tags': ('messages', {'id': 'message_id', 'sent_at': 'message_sent_at'}),
+}
+
+
+# A deliberate frozen copy of app.domain.models.tag_ids_trigger_ddl as of this
+# revision: a migration must keep creating what it created when it was written.
+def _trigger_ddl(association: str, owner: str, keys: dict[str, str]) -> str:
+    def match(row: str) -> str:
+        return " AND ".join(f"{column} = {row}.{ref}" for column, ref in keys.items())
+    return f"""
+CREATE OR REPLACE FUNCTION {association}_sync_tag_ids() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE {owner} SET tag_ids = array_remove(tag_ids, OLD.tag_id)
+        WHERE {match("OLD")} AND tag_ids @> ARRAY[OLD.tag_id];
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE {owner} SET tag_ids = array_append(tag_ids, NEW.tag_id)
+        WHERE {match("NEW")} AND NOT tag_ids @> ARRAY[NEW.tag_id];
+    END IF;
+    RETURN NULL;
+END $$;
+CREATE TRIGGER {association}_sync_tag_ids AFTER INSERT OR UPDATE OR DELETE ON {association}
+    FOR EACH ROW EXECUTE FUNCTION {association}_sync_tag_ids();
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default makes ADD COLUMN a catalog-only change. The lock it takes
+    # is held until commit, so no tag can change between the backfill and the triggers.
+    for association, (owner, keys) in TAG_IDS_TRIGGERS.items():
+        op.add_column(owner, sa.Column(
+            'tag_ids', postgresql.ARRAY(sa.UUID()), server_default=sa.text("'{}'"), nullable=False,
+        ))
+        match = " AND ".join(f"o.{column} = a.{ref}" for column, ref in keys.items())
+        refs = ", ".join(keys.values())
+        op.execute(
+            f"UPDATE {owner} o SET tag_ids = a.tag_ids "
+            f"FROM (SELECT {refs}, array_agg(tag_id) AS tag_ids FROM {association} GROUP BY {refs}) a "
+            f"WHERE {match}"
+        )
+        op.execute(_trigger_ddl(association, owner, keys))
+
+    # Not CONCURRENTLY: indexes on the partitioned messages table cannot be, and
+    # channels and subscriptions are small.
+    op.create_index('ix_channels_tag_ids', 'channels', ['tag_ids'], postgresql_using='gin')
+    op.create_index('ix_subscriptions_tag_ids', 'subscriptions', ['tag_ids'], postgresql_using='gin')
+    op.create_index('ix_messages_tag_ids', 'messages', ['tag_ids'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for association, (owner, _) in TAG_IDS_TRIGGERS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {association}_sync_tag_ids ON {association}")
+        op.execute(f"DROP FUNCTION IF EXISTS {association}_sync_tag_ids()")
+        op.drop_index(f'ix_{owner}_tag_ids', table_name=owner)
+        op.drop_column(owner, 'tag_ids')
@@ -0,0 +1,203 @@
+# benchmarks/bench_api_concurrency.py
+"""
+Throughput and latency of the list endpoints under concurrent load: the API as
+it was (sync `def` routes and dependency classes, which FastAPI runs in its
+threadpool, calling the sync repositories) against the async routers, which
+run on the event loop and await the asyncpg engine.
+
+Both apps serve the same three endpoints (messages, channels, tags) from the
+same database and are driven in-process through httpx's ASGI transport by
+`--concurrency` clients each, so only the request path differs. The async pool
+is sized like the sync engine's default (5 + 10 overflow) unless
+ASYNC_DB_POOL_SIZE / ASYNC_DB_MAX_OVERFLOW are set.
+
+A local database answers in microseconds, so requests are bound by CPU rather
+than by waiting. `--rtt-ms` puts a TCP proxy in front of DB_URL that delays
+traffic by that round-trip time, like a database across the network.
+Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/bench_api_concurrency.py
+    PYTHONPATH=src python benchmarks/bench_api_concurrency.py --rtt-ms 2 --concurrency 1 20 100 --requests 1000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+
+import anyio.to_thread
+import httpx
+from sqlalchemy import make_url
+
+PATHS = ["/messages/?limit=25", "/channels/?limit=25", "/tags/"]
+
+
+def sync_app():
+    """The endpoints as sync routes over the sync UnitOfWork, as they were before the async rewrite."""
+    from fastapi import APIRouter, Depends, FastAPI
+    from app.domain import schemas
+    from app.repo.unit_of_work import UnitOfWork
+    from app.services.channel_service import _CHANNELS
+    from app.services.message_service import _MESSAGE_RESPONSES
+
+    router = APIRouter()
+
+    @router.get("/messages/", response_model=schemas.PaginatedResponse[schemas.MessageResponse])
+    def get_all_messages(filters: schemas.MessageFilterParams = Depends()):
+        with UnitOfWork(readonly=True) as uow:
+            page = uow.messages.get_paginated_messages(filters)
+            page.items = _MESSAGE_RESPONSES.validate_python(page.items)
+        return schemas.PaginatedResponse(total=page.total, limit=filters.limit, skip=filters.skip, items=page.items, next_cursor=page.next_cursor, total_strategy=page.total_strategy)
+
+    @router.get("/channels/", response_model=schemas.PaginatedResponse[schemas.Channel])
+    def get_all_channels(filters: schemas.ChannelFilterParams = Depends()):
+        with UnitOfWork(readonly=True) as uow:
+            page = uow.channels.get_paginated_channels(filters)
+            page.items = _CHANNELS.validate_python(page.items)
+        return schemas.PaginatedResponse(total=page.total, limit=filters.limit, skip=filters.skip, items=page.items, next_cursor=page.next_cursor, total_strategy=page.total_strategy)
+
+    @router.get("/tags/", response_model=list[schemas.Tag])
+    def get_all_tags():
+        with UnitOfWork(readonly=True) as uow:
+            return [schemas.Tag.model_validate(tag) for tag in uow.tags.get_all_tags()]
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+def async_app():
+    from fastapi import FastAPI
+    from app.routers.api.channel_router import channel_router
+    from app.routers.api.message_router import message_router
+    from app.routers.api.tags_router import tag_router
+
+    app = FastAPI()
+    for router in (message_router, channel_router, tag_router):
+        app.include_router(router)
+    return app
+
+
+def start_latency_proxy(db_url: str, rtt_ms: float) -> str:
+    """
+    Starts a TCP proxy to the database in a background thread, delaying each
+    direction by half of `rtt_ms`. Returns DB_URL pointed at the proxy.
+    """
+    url = make_url(db_url)
+    socket_dir = url.query.get("host")
+    delay = rtt_ms / 2000
+    ready = threading.Event()
+    port = None
+
+    async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def send():
+            while (item := await queue.get()) is not None:
+                due, data = item
+                await asyncio.sleep(due - loop.time())
+                writer.write(data)
+                await writer.drain()
+            writer.close()
+
+        sender = asyncio.create_task(send())
+        while data := await reader.read(65536):
+            queue.put_nowait((loop.time() + delay, data))
+        queue.put_nowait(None)
+        await sender
+
+    async def handle(client_reader, client_writer):
+        if socket_dir:
+            db_reader, db_writer = await asyncio.open_unix_connection(f"{socket_dir}/.s.PGSQL.{url.port or 5432}")
+        else:
+            db_reader, db_writer = await asyncio.open_connection(url.host or "localhost", url.port or 5432)
+        await asyncio.gather(pipe(client_reader, db_writer), pipe(db_reader, client_writer), return_exceptions=True)
+
+    async def serve():
+        nonlocal port
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        ready.set()
+        await server.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    ready.wait()
+    query = {key: value for key, value in url.query.items() if key != "host"}
+    return url.set(host="127.0.0.1", port=port, query=query).render_as_string(hide_password=False)
+
+
+async def load(app, concurrency: int, requests: int) -> dict:
+    """Sends `requests` requests from `concurrency` clients, cycling through PATHS."""
+    latencies: list[float] = []
+    next_request = iter(range(requests))
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    peak_threads = 0
+
+    async def client(http: httpx.AsyncClient):
+        for n in next_request:
+            started = time.perf_counter()
+            response = await http.get(PATHS[n % len(PATHS)])
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+
+    async def sample_threads():
+        nonlocal peak_threads
+        while True:
+            peak_threads = max(peak_threads, limiter.borrowed_tokens)
+            await asyncio.sleep(0.001)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        sampler = asyncio.create_task(sample_threads())
+        started = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "threads": peak_threads,
+    }
+
+
+async def run(args):
+    apps = {"sync": sync_app(), "async": async_app()}
+    for app in apps.values():
+        await load(app, 5, 30)  # warm up pools and statement caches
+
+    print(f"rtt {args.rtt_ms} ms, {args.requests} requests per run, threadpool size {anyio.to_thread.current_default_thread_limiter().total_tokens}")
+    print(f"{'clients':>7} {'variant':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'threads':>7}")
+    for concurrency in args.concurrency:
+        for name, app in apps.items():
+            result = await load(app, concurrency, args.requests)
+            print(
+                f"{concurrency:>7} {name:>7} {result['rps']:>8.0f} {result['p50']:>8.1f} "
+                f"{result['p95']:>8.1f} {result['threads']:>7}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load on the sync and the async API.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--requests", type=int, default=600, help="Requests per run")
+    parser.add_argument("--rtt-ms", type=float, default=0, help="Simulated network round trip to the database")
+    args = parser.parse_args()
+
+    # Before the app is imported: its engines are created from these at import time.
+    os.environ.setdefault("ASYNC_DB_POOL_SIZE", "5")
+    os.environ.setdefault("ASYNC_DB_MAX_OVERFLOW", "10")
+    if args.rtt_ms:
+        from app.config.config import settings
+        settings.DB_URL = start_latency_proxy(settings.DB_URL, args.rtt_ms)
+        settings.ASYNC_DB_URL = ""  # derived from the proxied DB_URL
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_keyword_matching.py
+"""
+Compares the compiled KeywordMatcher (Aho-Corasick) with the original
+per-subscription substring loop used by run_matching_for_message.
+
+Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/bench_keyword_matching.py
+    PYTHONPATH=src python benchmarks/bench_keyword_matching.py --subscriptions 20000 --messages 500
+"""
+import argparse
+import random
+import string
+import time
+import uuid
+
+from app.services.keyword_matcher import KeywordMatcher
+
+
+def naive_match(subscriptions: list[tuple[uuid.UUID, str]], content: str) -> set[uuid.UUID]:
+    """The pre-automaton logic, verbatim: lowercase per subscription, then `any(keyword in ...)`."""
+    matched = set()
+    for sub_id, query_text in subscriptions:
+        keywords = query_text.lower().split()
+        message_lower = content.lower()
+        if any(keyword in message_lower for keyword in keywords):
+            matched.add(sub_id)
+    return matched
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list[str]:
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscriptions", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--message-words", type=int, default=80)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+    messages = [
+        " ".join(rng.choices(vocabulary, k=args.message_words)).capitalize()
+        for _ in range(args.messages)
+    ]
+
+    print(f"{'subs':>8} {'naive ms/msg':>14} {'automaton ms/msg':>18} {'build ms':>10} {'speedup':>8}")
+    for count in args.subscriptions:
+        subscriptions = [
+            (uuid.uuid4(), " ".join(rng.choices(vocabulary, k=rng.randint(1, 4))))
+            for _ in range(count)
+        ]
+
+        started = time.perf_counter()
+        matcher = KeywordMatcher(subscriptions)
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        naive_results = [naive_match(subscriptions, m) for m in messages]
+        naive = (time.perf_counter() - started) / len(messages)
+
+        started = time.perf_counter()
+        automaton_results = [matcher.match(m) for m in messages]
+        automaton = (time.perf_counter() - started) / len(messages)
+
+        if naive_results != automaton_results:
+            raise SystemExit(f"Results differ for {count} subscriptions!")
+
+        print(f"{count:>8} {naive * 1000:>14.3f} {automaton * 1000:>18.3f} {build * 1000:>10.1f} {naive / automaton:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
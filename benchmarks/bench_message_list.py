@@ -0,0 +1,109 @@
+# benchmarks/bench_message_list.py
+"""
+Per-page latency of the message list endpoint's data path: the original ORM
+query (Message entities, selectin-loaded channel, tags and channel tags, then
+MessageResponse.model_validate per row) against the column projection used by
+MessageRepo.get_paginated_messages with the cached TypeAdapter.
+
+Both sides run in a read-only transaction against DB_URL, with count=none so
+only the page itself is measured. Each page is also serialized to JSON, like
+FastAPI does with the response. Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/bench_message_list.py
+    PYTHONPATH=src python benchmarks/bench_message_list.py --limits 25 100 --repeat 50 --search news
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.domain import models, schemas
+from app.repo.message_repo import MESSAGE_KEYSET, MessageRepo
+from app.repo.pagination import paginate
+from app.repo.unit_of_work import UnitOfWork
+from app.services.message_service import _MESSAGE_RESPONSES
+
+PAGE = schemas.PaginatedResponse[schemas.MessageResponse]
+
+
+def orm_page(uow: UnitOfWork, limit: int, search: str | None) -> list[schemas.MessageResponse]:
+    """The pre-projection query and DTO conversion, verbatim apart from the filters."""
+    stmt = (
+        select(models.Message)
+        .options(
+            selectinload(models.Message.channel),
+            selectinload(models.Message.tags),
+        )
+    )
+    if search:
+        stmt = stmt.where(models.Message.content.ilike(f"%{search}%"))
+    page = paginate(uow.session, stmt, MESSAGE_KEYSET, limit, count=schemas.CountStrategy.NONE)
+    return [schemas.MessageResponse.model_validate(m) for m in page.items]
+
+
+def projected_page(uow: UnitOfWork, limit: int, search: str | None) -> list[schemas.MessageResponse]:
+    filters = _filters(limit, search)
+    return _MESSAGE_RESPONSES.validate_python(MessageRepo(uow.session).get_paginated_messages(filters).items)
+
+
+def _filters(limit: int, search: str | None):
+    # MessageFilterParams takes FastAPI Query() defaults, so set every field explicitly.
+    filters = schemas.MessageFilterParams.__new__(schemas.MessageFilterParams)
+    filters.__dict__.update(
+        skip=0, limit=limit, search=search, start_date=None, end_date=None, tags=None, cursor=None,
+        count=schemas.CountStrategy.NONE, channel_id=None, channel_telegram_id=None, message_id=None,
+        search_mode=schemas.SearchMode.SUBSTRING, rank=False, highlight=False,
+    )
+    return filters
+
+
+def _comparable(items: list[schemas.MessageResponse]) -> list[dict]:
+    """The pages as dicts, with tag lists sorted: the projection orders them by name, the ORM does not."""
+    dumped = [m.model_dump() for m in items]
+    for message in dumped:
+        for owner in (message, message["channel"] or {}):
+            owner["tags"] = sorted(owner.get("tags", []), key=lambda t: t["name"])
+    return dumped
+
+
+def measure(fetch, limit: int, search: str | None, repeat: int) -> tuple[float, float]:
+    """Median and p95 milliseconds for one page: query, DTOs and JSON."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with UnitOfWork(readonly=True) as uow:
+            items = fetch(uow, limit, search)
+        PAGE(total=None, limit=limit, skip=0, items=items).model_dump_json()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[max(int(len(timings) * 0.95) - 1, 0)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limits", type=int, nargs="+", default=[25, 100])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--search", default=None, help="Also filter by a substring, as ?search=...&search_mode=substring")
+    args = parser.parse_args()
+
+    for limit in args.limits:
+        # Same rows, same JSON (up to the order of each tag list), before timing anything.
+        with UnitOfWork(readonly=True) as uow:
+            before, after = orm_page(uow, limit, args.search), projected_page(uow, limit, args.search)
+        if _comparable(before) != _comparable(after):
+            raise SystemExit(f"Pages differ for limit={limit}!")
+        # Warm up connections and statement caches.
+        measure(orm_page, limit, args.search, 3)
+        measure(projected_page, limit, args.search, 3)
+
+    print(f"{'limit':>6} {'orm p50 ms':>11} {'orm p95 ms':>11} {'proj p50 ms':>12} {'proj p95 ms':>12} {'speedup':>8}")
+    for limit in args.limits:
+        orm_p50, orm_p95 = measure(orm_page, limit, args.search, args.repeat)
+        proj_p50, proj_p95 = measure(projected_page, limit, args.search, args.repeat)
+        print(f"{limit:>6} {orm_p50:>11.2f} {orm_p95:>11.2f} {proj_p50:>12.2f} {proj_p95:>12.2f} {orm_p50 / proj_p50:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,12 +15,93 @@ class Settings(BaseSettings):
     DEFAULT_SESSION_NAME: str = "default_session"
     TELEGRAM_BOT_TOKEN: str = ""  
     DB_URL: str = ""
+    ASYNC_DB_URL: str = ""  # Defaults to DB_URL with the asyncpg driver
+    ASYNC_DB_POOL_SIZE: int = 10
+    ASYNC_DB_MAX_OVERFLOW: int = 10
+    # Optional read replica for read-only unit of work (list endpoints)
+    REPLICA_DB_URL: str = ""  # Empty: read-only work also goes to DB_URL
+    ASYNC_REPLICA_DB_URL: str = ""  # Defaults to REPLICA_DB_URL with the asyncpg driver
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # Reads fall back to the primary while the replica is further behind
+    REPLICA_LAG_CHECK_SECONDS: float = 2.0  # How long a lag measurement (or a failed one) is trusted
+    REPLICA_CONNECT_TIMEOUT_SECONDS: int = 2  # An unreachable replica fails this fast and reads go to the primary
     # Directories
     SENTRY_DSN: str = ""
     SESSIONS_DIR: Path = BASE_DIR / "sessions"
 
     # TAGS_FILE_PATH: Path = BASE_DIR / "src/app/config/tags.json"
     LOGS_DIR: Path = BASE_DIR / "logs"
+
+    # Listener ingest queue
+    INGEST_QUEUE_SIZE: int = 1000  # Max events buffered between the Telethon handler and the workers
+    INGEST_WORKERS: int = 8  # Number of concurrent process_new_message consumers
+    INGEST_ENQUEUE_TIMEOUT: float = 30.0  # Seconds to wait for queue space before dropping an event
+    INGEST_DRAIN_TIMEOUT: float = 30.0  # Seconds on shutdown for the workers to finish the queued events
+    SEEN_MESSAGES_CACHE_SIZE: int = 50_000  # Recently stored (chat, message) IDs used to drop re-delivered updates
+
+    CHANNEL_CACHE_SIZE: int = 10_000  # Channels whose metadata is kept in memory for the ingest path
+
+    # Matcher subscription snapshot
+    SUBSCRIPTION_SNAPSHOT_CHECK_SECONDS: float = 2.0  # Min seconds between version checks against the DB
+    SUBSCRIPTION_SNAPSHOT_MAX_AGE_SECONDS: float = 300.0  # Full reload at least this often, as a safety net
+
+    # Notifier HTTP client (Bot API)
+    NOTIFIER_MAX_CONNECTIONS: int = 20
+    NOTIFIER_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    NOTIFIER_KEEPALIVE_EXPIRY: float = 90.0  # Seconds an idle connection to api.telegram.org is kept open
+    NOTIFIER_TIMEOUT: float = 10.0
+
+    # Notification dispatcher (Bot API limits: ~30 msg/s overall, ~1 msg/s per chat)
+    NOTIFIER_SENDERS: int = 8  # Concurrent send tasks
+    NOTIFIER_QUEUE_SIZE: int = 10_000  # Pending notifications before new ones are dropped
+    NOTIFIER_GLOBAL_RATE: float = 30.0  # Messages per second across all chats
+    NOTIFIER_GLOBAL_BURST: int = 30
+    NOTIFIER_PER_CHAT_RATE: float = 1.0  # Messages per second to a single chat
+    NOTIFIER_PER_CHAT_BURST: int = 3
+    NOTIFIER_MAX_ATTEMPTS: int = 5  # Sends per notification, counting 429 retries
+
+    # Join request processing
+    JOIN_WORKERS: int = 3  # Requests joined concurrently
+    JOIN_LEASE_SECONDS: int = 600  # How long a claim lasts before another worker may take the request over
+    JOIN_POLL_SECONDS: float = 300.0  # Safety-net poll; new requests normally wake the workers at once
+    JOIN_NOTIFY_CHANNEL: str = "join_requests"  # Postgres NOTIFY channel for new join requests
+
+    JOIN_IMPORT_CHUNK_SIZE: int = 500  # Identifiers deduplicated and inserted per statement by the bulk importer
+
+    # Join pacing per Telegram method. Starting points only: FloodWaits slow them down further.
+    JOIN_RESOLVE_PER_HOUR: float = 200.0  # ResolveUsernameRequest
+    JOIN_RESOLVE_BURST: int = 5
+    JOIN_CHANNEL_PER_HOUR: float = 30.0  # JoinChannelRequest
+    JOIN_CHANNEL_BURST: int = 2
+    JOIN_IMPORT_PER_HOUR: float = 30.0  # ImportChatInviteRequest
+    JOIN_IMPORT_BURST: int = 2
+    JOIN_MAX_INLINE_WAIT_SECONDS: float = 180.0  # Longer waits hand the request back instead of holding a worker
+
+    # Username / invite resolution cache
+    ENTITY_CACHE_TTL_HOURS: float = 168.0  # How long a successful resolution is trusted
+    ENTITY_CACHE_NEGATIVE_TTL_HOURS: float = 6.0  # How long "does not exist" is remembered
+
+    # Paginated list totals (?count=cached)
+    COUNT_CACHE_TTL_SECONDS: float = 30.0  # How long a cached total is served
+    COUNT_CACHE_SIZE: int = 1000  # Distinct filter combinations remembered
+
+    # Batched message persistence
+    MESSAGE_BATCH_SIZE: int = 100  # Max messages written in one INSERT
+    MESSAGE_BATCH_MAX_DELAY_MS: int = 50  # Max time a message waits for its batch to fill
+
+    # Monthly partitions of messages and message_tags
+    MESSAGE_PARTITION_PREMAKE_MONTHS: int = 3  # Future months created ahead of time
+    MESSAGE_RETENTION_MONTHS: int = 0  # Months kept, counting the current one; 0 keeps everything
+    MESSAGE_RETENTION_DROP: bool = False  # Drop expired partitions instead of only detaching them
+    PARTITION_MAINTENANCE_INTERVAL_HOURS: float = 6.0
+
+    # Cold storage of old messages in Parquet files (see app/repo/message_archive.py)
+    ARCHIVE_DIR: Path = BASE_DIR / "archive"
+    ARCHIVE_AFTER_DAYS: int = 0  # Messages older than this move out of Postgres; 0 disables archival
+    ARCHIVE_BATCH_SIZE: int = 10000  # Rows per streamed fetch, Parquet row group and DELETE
+    ARCHIVE_INTERVAL_HOURS: float = 24.0
+
+    # Activity rollups (see app/repo/stats_repo.py)
+    STATS_FLUSH_SECONDS: float = 5.0  # How often counted matches are written; a crash loses at most this much
     class Config:
         # This will automatically look for a .env file
         env_file = ".env"
@@ -1,6 +1,7 @@
 import os
 from app.config.config import settings
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -15,6 +16,56 @@ engine = create_engine(SQLALCHEMY_DATABASE_URL)
 # Each instance of SessionLocal will be a database session.
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# --- Async engine for code running on the event loop ---
+# The listener, matcher and join processor use this so that waiting on the
+# database never blocks Telethon's update handling. Same database, asyncpg driver.
+ASYNC_SQLALCHEMY_DATABASE_URL = settings.ASYNC_DB_URL or make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg")
+
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    pool_size=settings.ASYNC_DB_POOL_SIZE,
+    max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+)
+
+# expire_on_commit=False: objects stay readable after commit without a new
+# (async) round trip, which is how the services turn them into DTOs.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# --- Read-only sessions ---
+# Sessions for UnitOfWork(readonly=True). postgresql_readonly makes every
+# transaction BEGIN READ ONLY, so a stray write fails instead of landing on
+# the primary by accident. When REPLICA_DB_URL is set the same kind of session
+# is also available on the replica; app/repo/replica_router.py picks one.
+ReadOnlySessionLocal = sessionmaker(bind=engine.execution_options(postgresql_readonly=True), autoflush=False)
+AsyncReadOnlySessionLocal = async_sessionmaker(
+    bind=async_engine.execution_options(postgresql_readonly=True), autoflush=False, expire_on_commit=False
+)
+
+replica_engine = None
+async_replica_engine = None
+ReplicaSessionLocal = None
+AsyncReplicaSessionLocal = None
+if settings.REPLICA_DB_URL:
+    # A short connect timeout: an unreachable replica must not stall requests
+    # while the router probes it; they fall back to the primary instead.
+    replica_engine = create_engine(
+        settings.REPLICA_DB_URL,
+        pool_pre_ping=True,
+        connect_args={"connect_timeout": settings.REPLICA_CONNECT_TIMEOUT_SECONDS},
+    )
+    async_replica_engine = create_async_engine(
+        settings.ASYNC_REPLICA_DB_URL or make_url(settings.REPLICA_DB_URL).set(drivername="postgresql+asyncpg"),
+        pool_size=settings.ASYNC_DB_POOL_SIZE,
+        max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        connect_args={"timeout": settings.REPLICA_CONNECT_TIMEOUT_SECONDS},
+    )
+    ReplicaSessionLocal = sessionmaker(bind=replica_engine.execution_options(postgresql_readonly=True), autoflush=False)
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        bind=async_replica_engine.execution_options(postgresql_readonly=True), autoflush=False, expire_on_commit=False
+    )
+
 # Create a Base class
 # Our ORM models will inherit from this class.
 Base = declarative_base()
@@ -61,10 +61,14 @@ else:
 (ASK_QUERY,) = range(1) # We only need one state for this conversation
 (ASK_NEW_QUERY,) = range(10, 11)
 
-# --- List of available tags. Later this can come from the DB. ---
+# --- List of available tags, loaded from the DB by load_available_tags when the bot starts. ---
 # As requested, 'others' is included as a choice.
-AVAILABLE_TAGS = get_all_tags()
-# logger.info(f"Loaded {AVAILABLE_TAGS} available tags from the service.")
+AVAILABLE_TAGS = []
+
+async def load_available_tags(application: Application) -> None:
+    """Runs on the bot's own event loop, before polling starts."""
+    AVAILABLE_TAGS[:] = await get_all_tags()
+    logger.info(f"Loaded {len(AVAILABLE_TAGS)} available tags from the service.")
 
 
 
@@ -152,10 +156,10 @@ async def handle_tag_selection(update: Update, context: ContextTypes.DEFAULT_TYP
             selected_tags.append(default_tag_slug)
         
         try:
-            db_user = get_or_create_user(query.from_user)
+            db_user = await get_or_create_user(query.from_user)
             
             # Call the service, passing the list of clean slugs
-            join_req, was_newly_created = create_join_request(
+            join_req, was_newly_created = await create_join_request(
                 identifier=normalized_identifier,
                 tags=selected_tags,
                 user_id=db_user.id
@@ -245,7 +249,7 @@ async def handle_query_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
         # Call our clean, reusable service function
 
         tag_names = ["others"]
-        add_subscription_for_user(
+        await add_subscription_for_user(
             user_id=db_user_id,
             query_text=query_text,
             tag_names=tag_names
@@ -277,7 +281,7 @@ async def list_subscriptions(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return
 
     # Call the service to get the subscriptions
-    subscriptions = get_user_subscriptions(user_id=db_user_id)
+    subscriptions = await get_user_subscriptions(user_id=db_user_id)
 
     if not subscriptions:
         await update.message.reply_text("You have no active subscriptions. Use /subscribe to create one.")
@@ -330,10 +334,10 @@ async def handle_new_query_input(update: Update, context: ContextTypes.DEFAULT_T
         subscription_id = uuid.UUID(subscription_id_str)
         
         # Get the user's DB ID
-        db_user = get_or_create_user(update.effective_user)
+        db_user = await get_or_create_user(update.effective_user)
         
         # Call the edit service
-        success = edit_subscription(
+        success = await edit_subscription(
             user_id=db_user.id,
             subscription_id=subscription_id,
             new_query_text=new_query_text
@@ -373,10 +377,10 @@ async def handle_cancel_button(update: Update, context: ContextTypes.DEFAULT_TYP
         
         # --- THIS IS THE CORRECTED LOGIC ---
         # 1. Call the user service to get the user's DB info
-        db_user = get_or_create_user(query.from_user)
+        db_user = await get_or_create_user(query.from_user)
 
         # 2. Call the subscription service with the necessary IDs
-        success = cancel_subscription(
+        success = await cancel_subscription(
             user_id=db_user.id, 
             subscription_id=subscription_id
         )
@@ -426,7 +430,7 @@ def main() -> None:
     """Sets up and runs the bot with all handlers."""
     
     # 1. Create the Application object
-    application = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).build()
+    application = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).post_init(load_available_tags).build()
 
     # 2. Add all your handlers
 
@@ -23,7 +23,7 @@ def ensure_user(func):
         
         try:
             # --- Call the service ---
-            db_user = get_or_create_user(update.effective_user)
+            db_user = await get_or_create_user(update.effective_user)
             
             # Attach the user's UUID to the context
             context.user_data['db_user_id'] = db_user.id
@@ -0,0 +1,183 @@
+# src/app/core/bot/dispatcher.py
+
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass
+
+from app.config.config import settings
+from app.core.cache import LRUCache
+from app.core.rate_limit import TokenBucket
+from app.core.bot.notifier import send_telegram_notification, NotificationRateLimited
+
+logger = logging.getLogger(__name__)
+
+# Lower numbers are sent first.
+PRIORITY_RETRY = 0
+PRIORITY_DEFAULT = 10
+
+
+@dataclass
+class Notification:
+    chat_id: int
+    text: str
+    priority: int = PRIORITY_DEFAULT
+    attempts: int = 0
+    # Set when the chat bucket already holds a token for this notification.
+    reserved: bool = False
+
+
+class NotificationDispatcher:
+    """
+    The notification stage between the matcher and the Bot API.
+
+    `enqueue` only puts the notification on a bounded priority queue and returns.
+    A pool of sender tasks drains the queue, taking a token from the global
+    bucket and from the chat's own bucket before each send, so the Bot API
+    limits are respected without blocking a sender on one busy chat. A 429
+    pauses that chat's bucket and schedules the retry for exactly `retry_after`.
+    """
+    def __init__(
+        self,
+        senders: int = settings.NOTIFIER_SENDERS,
+        maxsize: int = settings.NOTIFIER_QUEUE_SIZE,
+        global_rate: float = settings.NOTIFIER_GLOBAL_RATE,
+        global_burst: int = settings.NOTIFIER_GLOBAL_BURST,
+        per_chat_rate: float = settings.NOTIFIER_PER_CHAT_RATE,
+        per_chat_burst: int = settings.NOTIFIER_PER_CHAT_BURST,
+        max_attempts: int = settings.NOTIFIER_MAX_ATTEMPTS,
+    ):
+        self.senders = senders
+        self.maxsize = maxsize
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.max_attempts = max_attempts
+
+        self._global_bucket = TokenBucket(global_rate, global_burst)
+        # Buckets of idle chats are simply evicted; a fresh one starts full, which is what an idle chat deserves.
+        self._chat_buckets: LRUCache[int, TokenBucket] = LRUCache(maxsize=10_000)
+        self._queue: asyncio.PriorityQueue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._scheduled: set[asyncio.TimerHandle] = set()
+        # Tie-breaker so equal priorities keep FIFO order and Notifications are never compared.
+        self._sequence = itertools.count()
+
+        # --- Metrics ---
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.rate_limited = 0
+        self.deferred = 0
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue(maxsize=self.maxsize)
+        self._tasks = [
+            asyncio.create_task(self._sender(i), name=f"notification-sender-{i}")
+            for i in range(self.senders)
+        ]
+        logger.info(f"[Dispatcher] Started {self.senders} senders.")
+
+    async def stop(self):
+        for handle in self._scheduled:
+            handle.cancel()
+        pending = (self._queue.qsize() if self._queue else 0) + len(self._scheduled)
+        self._scheduled.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info(f"[Dispatcher] Stopped, {pending} notifications were not sent.")
+
+    def enqueue(self, chat_id: int, text: str, priority: int = PRIORITY_DEFAULT) -> bool:
+        """Queues a notification without waiting. Returns False if the queue is full and it was dropped."""
+        if self._queue is None:
+            raise RuntimeError("NotificationDispatcher.start() must be called before enqueue().")
+        if not self._put(Notification(chat_id=chat_id, text=text, priority=priority)):
+            return False
+        self.enqueued += 1
+        return True
+
+    def _put(self, notification: Notification) -> bool:
+        try:
+            self._queue.put_nowait((notification.priority, next(self._sequence), notification))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.error(f"[Dispatcher] Queue full ({self.maxsize}), dropped notification for chat {notification.chat_id}.")
+            return False
+
+    def _put_later(self, notification: Notification, delay: float):
+        """Re-queues a notification after `delay` seconds without holding a sender."""
+        def fire():
+            self._scheduled.discard(handle)
+            self._put(notification)
+        handle = asyncio.get_running_loop().call_later(delay, fire)
+        self._scheduled.add(handle)
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+            self._chat_buckets.set(chat_id, bucket)
+        return bucket
+
+    async def _sender(self, sender_id: int):
+        while True:
+            _, _, notification = await self._queue.get()
+            try:
+                await self._send(notification)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"[Dispatcher] Sender {sender_id} failed on chat {notification.chat_id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, notification: Notification):
+        chat_bucket = self._chat_bucket(notification.chat_id)
+        if not notification.reserved or chat_bucket.paused_for > 0:
+            wait = chat_bucket.reserve()
+            if wait > 0:
+                # This chat is over its limit. Its token is reserved, so messages to one
+                # chat keep their order; the sender moves on to other chats meanwhile.
+                self.deferred += 1
+                notification.reserved = True
+                self._put_later(notification, wait)
+                return
+        notification.reserved = False
+
+        await self._global_bucket.acquire()
+        notification.attempts += 1
+        try:
+            if await send_telegram_notification(notification.chat_id, notification.text):
+                self.sent += 1
+            else:
+                self.failed += 1
+        except NotificationRateLimited as e:
+            self.rate_limited += 1
+            chat_bucket.pause(e.retry_after)
+            if notification.attempts >= self.max_attempts:
+                self.failed += 1
+                logger.error(f"[Dispatcher] Giving up on chat {notification.chat_id} after {notification.attempts} attempts.")
+                return
+            logger.warning(f"[Dispatcher] 429 for chat {notification.chat_id}, retrying in {e.retry_after}s.")
+            notification.priority = PRIORITY_RETRY
+            self._put_later(notification, e.retry_after)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self._queue.qsize() if self._queue else 0,
+            "scheduled": len(self._scheduled),
+            "senders": len(self._tasks),
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "rate_limited": self.rate_limited,
+            "deferred": self.deferred,
+        }
+
+
+notification_dispatcher = NotificationDispatcher()
@@ -2,18 +2,79 @@
 
 import httpx
 import logging
+import time
 from app.config.config import settings
 
 logger = logging.getLogger(__name__)
 
-async def send_telegram_notification(user_telegram_id: int, message: str):
+# One pooled client per process, so notifications reuse warm TCP+TLS
+# connections to api.telegram.org. Opened and closed by the FastAPI lifespan.
+_client: httpx.AsyncClient | None = None
+
+class NotificationRateLimited(Exception):
+    """Raised when the Bot API answers 429; `retry_after` is the wait it asked for, in seconds."""
+    def __init__(self, user_telegram_id: int, retry_after: float):
+        super().__init__(f"Rate limited sending to {user_telegram_id}, retry after {retry_after}s")
+        self.user_telegram_id = user_telegram_id
+        self.retry_after = retry_after
+
+_stats = {
+    "requests": 0,
+    "errors": 0,
+    "rate_limited": 0,
+    "connections_opened": 0,
+    "total_latency": 0.0,
+    "max_latency": 0.0,
+}
+
+async def _trace(event_name: str, info: dict):
+    """httpcore trace hook; counts every new TCP connection the pool has to open."""
+    if event_name == "connection.connect_tcp.complete":
+        _stats["connections_opened"] += 1
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.NOTIFIER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.NOTIFIER_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.NOTIFIER_KEEPALIVE_EXPIRY,
+        ),
+        timeout=settings.NOTIFIER_TIMEOUT,
+    )
+
+async def start_notifier():
+    """Opens the shared HTTP client. Called from the application lifespan."""
+    global _client
+    if _client is None:
+        _client = _create_client()
+        logger.info("Notifier HTTP client opened.")
+
+async def close_notifier():
+    """Closes the shared HTTP client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Notifier HTTP client closed.")
+
+def get_client() -> httpx.AsyncClient:
+    """Returns the shared client, creating it on first use outside the lifespan (e.g. scripts)."""
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+async def send_telegram_notification(user_telegram_id: int, message: str) -> bool:
     """
     Sends a message to a specific user via the Telegram Bot API.
+    Returns True if Telegram accepted it. A 429 response raises
+    NotificationRateLimited so the caller can retry after the requested delay;
+    every other failure is logged and returns False.
     """
     bot_token = settings.TELEGRAM_BOT_TOKEN
     if not bot_token:
         logger.error("TELEGRAM_BOT_TOKEN not found. Cannot send notification.")
-        return
+        return False
 
     api_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
     payload = {
@@ -23,12 +84,47 @@ async def send_telegram_notification(user_telegram_id: int, message: str):
         "disable_web_page_preview": True,
     }
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(api_url, json=payload)
-            response.raise_for_status() # Raise an exception for bad responses (4xx or 5xx)
-            logger.info(f"Successfully sent notification to user {user_telegram_id}")
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Error sending notification to {user_telegram_id}: {e.response.text}")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred in notifier: {e}")
\ No newline at end of file
+    started = time.monotonic()
+    try:
+        response = await get_client().post(api_url, json=payload, extensions={"trace": _trace})
+        if response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+            _stats["rate_limited"] += 1
+            raise NotificationRateLimited(user_telegram_id, _retry_after(response))
+        response.raise_for_status() # Raise an exception for bad responses (4xx or 5xx)
+        logger.info(f"Successfully sent notification to user {user_telegram_id}")
+        return True
+    except NotificationRateLimited:
+        raise
+    except httpx.HTTPStatusError as e:
+        _stats["errors"] += 1
+        logger.error(f"Error sending notification to {user_telegram_id}: {e.response.text}")
+    except Exception as e:
+        _stats["errors"] += 1
+        logger.error(f"An unexpected error occurred in notifier: {e}")
+    finally:
+        latency = time.monotonic() - started
+        _stats["requests"] += 1
+        _stats["total_latency"] += latency
+        _stats["max_latency"] = max(_stats["max_latency"], latency)
+    return False
+
+def _retry_after(response: httpx.Response) -> float:
+    """Reads the wait Telegram asked for from a 429 response (body first, then the header)."""
+    try:
+        return float(response.json()["parameters"]["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        return float(response.headers.get("Retry-After", 1))
+
+def notifier_stats() -> dict:
+    """Connection reuse and latency counters for the metrics endpoint."""
+    requests = _stats["requests"]
+    opened = _stats["connections_opened"]
+    return {
+        "requests": requests,
+        "errors": _stats["errors"],
+        "rate_limited": _stats["rate_limited"],
+        "connections_opened": opened,
+        "connection_reuse_ratio": (requests - opened) / requests if requests else None,
+        "avg_latency_seconds": _stats["total_latency"] / requests if requests else 0.0,
+        "max_latency_seconds": _stats["max_latency"],
+    }
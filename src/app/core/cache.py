@@ -0,0 +1,71 @@
+# src/app/core/cache.py
+
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A small bounded mapping that evicts the least recently used key once
+    `maxsize` entries are stored. It is meant for per-process hot-path caches
+    owned by the event loop; `pop` and `clear` may also be called from worker
+    threads to invalidate entries.
+    """
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        try:
+            value = self._data[key]
+            self._data.move_to_end(key)
+        except KeyError:
+            # Also covers a key popped by an invalidation between the two calls.
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def add(self, key: K) -> bool:
+        """
+        Uses the cache as a bounded "seen" set.
+        Returns True if the key was new, False if it was already present.
+        """
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return False
+        self.misses += 1
+        self.set(key, True)
+        return True
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        return self._data.pop(key, default)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,102 @@
+# src/app/core/join_wakeup.py
+
+import asyncio
+import logging
+
+import asyncpg
+from sqlalchemy import make_url
+
+from app.config.config import settings
+from app.config.db import ASYNC_SQLALCHEMY_DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+
+class JoinWakeup:
+    """
+    Wakes the join workers as soon as a new join request exists.
+
+    Two signals feed the same asyncio.Event:
+      * `notify()` for requests created in this process (safe to call from any thread);
+      * a Postgres LISTEN on JOIN_NOTIFY_CHANNEL for requests created by other
+        processes, e.g. the bot, which publish it with pg_notify on commit.
+    Workers still poll every JOIN_POLL_SECONDS in case a notification is lost.
+    """
+    def __init__(self, channel: str = settings.JOIN_NOTIFY_CHANNEL):
+        self.channel = channel
+        self._event: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._connection: asyncpg.Connection | None = None
+
+        # --- Metrics ---
+        self.local_wakeups = 0
+        self.db_wakeups = 0
+        self.timeouts = 0
+
+    def _bind(self):
+        """Ties the event to the running loop; called from the consumer side."""
+        if self._event is None:
+            self._loop = asyncio.get_running_loop()
+            self._event = asyncio.Event()
+
+    def notify(self):
+        """Signals that a request is waiting. A no-op in processes without join workers."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        self.local_wakeups += 1
+        self._loop.call_soon_threadsafe(self._event.set)
+
+    async def wait(self, timeout: float = settings.JOIN_POLL_SECONDS) -> bool:
+        """Waits for a wakeup or the timeout. Returns True if it was woken."""
+        self._bind()
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return False
+        # Cleared before the caller claims, so a request created meanwhile sets it again.
+        self._event.clear()
+        return True
+
+    def _on_notification(self, connection, pid, channel, payload):
+        self.db_wakeups += 1
+        self._event.set()
+
+    async def listen(self):
+        """Keeps a LISTEN connection open, reconnecting if it drops. Run it as a task."""
+        self._bind()
+        dsn = make_url(ASYNC_SQLALCHEMY_DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            lost = asyncio.Event()
+            try:
+                self._connection = await asyncpg.connect(dsn)
+                self._connection.add_termination_listener(lambda _: lost.set())
+                await self._connection.add_listener(self.channel, self._on_notification)
+                logger.info(f"[Wakeup] Listening on '{self.channel}'.")
+                # Anything created while we were not listening is picked up now.
+                self._event.set()
+                await lost.wait()
+                logger.warning("[Wakeup] LISTEN connection lost, reconnecting.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[Wakeup] Could not listen on '{self.channel}': {e}")
+            finally:
+                await self.close()
+            await asyncio.sleep(5)
+
+    async def close(self):
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+    def stats(self) -> dict:
+        return {
+            "listening": self._connection is not None and not self._connection.is_closed(),
+            "local_wakeups": self.local_wakeups,
+            "db_wakeups": self.db_wakeups,
+            "timeouts": self.timeouts,
+        }
+
+
+join_wakeup = JoinWakeup()
@@ -2,126 +2,215 @@
 
 import asyncio
 import logging
+import time
+import uuid
+from datetime import datetime
 from telethon import TelegramClient
 from telethon.tl.functions.channels import JoinChannelRequest
 from telethon.tl.functions.messages import ImportChatInviteRequest
-from telethon.tl.types import Channel
-from telethon.errors.rpcerrorlist import UserAlreadyParticipantError
+from telethon.tl.types import InputChannel
+from telethon.errors.rpcerrorlist import UserAlreadyParticipantError, InviteHashExpiredError, InviteHashInvalidError
 from telethon.errors import FloodError
-from app.repo.unit_of_work import UnitOfWork
+from app.config.config import settings
+from app.core.join_wakeup import join_wakeup
+from app.core.listener.join_scheduler import join_scheduler, JoinDeferred
+from app.repo.unit_of_work import AsyncUnitOfWork
 from app.domain import models, schemas
+from app.services import entity_cache_service
 from app.services.channel_service import add_channel_with_tags
-from telethon.tl.types import Channel as TelethonChannel, Chat as TelethonChat
+from app.services.partition_service import maintain_message_partitions
+from app.services.archive_service import archive_old_messages
+from app.services.match_counter import match_counter
 from app.domain.models import ChatType
 
 
 logger = logging.getLogger(__name__)
 
+# Time kept free at the end of a join request's lease for the Telegram call and recording the outcome.
+LEASE_MARGIN_SECONDS = 60
+
 async def process_join_requests_task(client: TelegramClient):
     """
-    The main background worker task. Periodically fetches pending join requests
-    from the database and processes them.
+    The main background task. Runs JOIN_WORKERS workers that claim pending
+    join requests from the database and process them concurrently.
+    """
+    logger.info(f"[Processor] Starting join request processor with {settings.JOIN_WORKERS} workers...")
+    listener = asyncio.create_task(join_wakeup.listen(), name="join-wakeup-listener")
+    try:
+        await asyncio.gather(*(
+            _join_worker(client, worker_id) for worker_id in range(settings.JOIN_WORKERS)
+        ))
+    finally:
+        listener.cancel()
+
+
+async def partition_maintenance_task():
+    """Keeps the monthly message partitions created ahead of time and applies retention."""
+    while True:
+        try:
+            await maintain_message_partitions()
+        except Exception as e:
+            logger.error(f"[Partitions] Maintenance run failed: {e}", exc_info=True)
+        await asyncio.sleep(settings.PARTITION_MAINTENANCE_INTERVAL_HOURS * 3600)
+
+
+async def archive_task():
+    """Moves messages older than ARCHIVE_AFTER_DAYS to the Parquet archive, once per interval."""
+    if settings.ARCHIVE_AFTER_DAYS <= 0:
+        return
+    while True:
+        try:
+            # Blocking database and file I/O, so it runs off the event loop.
+            await asyncio.to_thread(archive_old_messages)
+        except Exception as e:
+            logger.error(f"[Archive] Archival run failed: {e}", exc_info=True)
+        await asyncio.sleep(settings.ARCHIVE_INTERVAL_HOURS * 3600)
+
+
+async def stats_flush_task():
+    """Writes the matcher's counted matches to the rollup every STATS_FLUSH_SECONDS."""
+    while True:
+        await asyncio.sleep(settings.STATS_FLUSH_SECONDS)
+        try:
+            await match_counter.flush()
+        except Exception as e:
+            logger.error(f"[Stats] Flushing match counts failed: {e}", exc_info=True)
+
+
+async def _join_worker(client: TelegramClient, worker_id: int):
+    """
+    Claims one request at a time and processes it.
+    The claim is a lease: if this worker dies or stalls, the request becomes
+    claimable again once JOIN_LEASE_SECONDS have passed, and the stale worker
+    can then no longer record an outcome for it.
     """
-    logger.info("[Processor] Starting join request processor task...")
     while True:
         try:
-            # --- THIS IS THE KEY CHANGE ---
-            # We will store the raw data, not the ORM object itself.
-            request_id = None
-            request_identifier = None
-            request_tags = None
-
-            # Use a UoW to safely fetch one pending job's data
-            with UnitOfWork() as uow:
-                pending_request = uow.join_requests.get_one_pending_request()
-                if pending_request:
-                    # Extract the data we need BEFORE the session closes
-                    request_id = pending_request.id
-                    request_identifier = pending_request.identifier
-                    request_tags = pending_request.tags
-
-            # If we didn't find a request, the variables will be None
-            if not request_id:
-                await asyncio.sleep(15) # Wait 15 seconds if no jobs
+            # We will store the raw data, not the ORM objects themselves.
+            async with AsyncUnitOfWork() as uow:
+                claimed = await uow.join_requests.claim_request(lease_seconds=settings.JOIN_LEASE_SECONDS)
+                job = (claimed.id, claimed.identifier, claimed.tags, claimed.locked_until) if claimed else None
+                retry_in = None if job else await uow.join_requests.seconds_until_next_claimable()
+
+            if not job:
+                # Sleep until a new request is created, a deferred one is due,
+                # or the safety-net poll interval passes.
+                timeout = settings.JOIN_POLL_SECONDS
+                if retry_in is not None:
+                    timeout = min(timeout, max(float(retry_in), 1.0))
+                await join_wakeup.wait(timeout)
                 continue
 
-            # Now we are using simple Python types (UUID, str, list), not detached ORM objects.
-            logger.info(f"Processing join request for identifier: {request_identifier}")
-            
-            try:
-                # --- Step 1: Use Telethon to join the channel ---
-                entity_name = request_identifier
-                # if 't.me/' in request_identifier and 't.me/+' not in request_identifier:
-                #     entity_name = request_identifier.split('/')[-1]
-
-                # if 't.me/+' in request_identifier :
-                #     invite_hash = request_identifier.split('/')[-1].replace('+', '')
-                #     updates = await client(ImportChatInviteRequest(invite_hash))
-                #     entity = updates.chats[0]
-                invite_hash = None
-                if "+" in request_identifier:
-                    # This is a private channel invite link
-                    invite_hash = request_identifier.replace('+', '')
-                    updates = await client(ImportChatInviteRequest(invite_hash))
-                    entity = updates.chats[0]
-                else:
-                    entity = await client.get_entity(entity_name)
-                    if isinstance(entity, Channel):
-                        await client(JoinChannelRequest(entity))
-                
-                logger.info(f"Successfully joined/verified channel: '{entity.title}'")
-
-                final_telegram_id = entity.id
-                # For basic groups, Telethon's entity.id is positive. We MUST store the negative.
-                
-                if isinstance(entity, TelethonChannel):
-                    # This handles both Channels and Supergroups
-                    final_telegram_id = -(entity.id + 1_000_000_000_000)
-                    chat_type = ChatType.SUPERGROUP if entity.megagroup else ChatType.CHANNEL
-
-                elif isinstance(entity, TelethonChat):
-                    final_telegram_id = -entity.id
-                    chat_type = ChatType.BASIC_GROUP
-               
-
-                logger.info(f"Chat id {final_telegram_id} type determined: {chat_type}")
-
-
-                # --- Step 2: Call the service to save the channel and tags ---
-                channel_data = schemas.ChannelCreate(
-                    telegram_id=final_telegram_id,
-                    name=entity.title,
-                    username=getattr(entity, 'username', None),
-                    type=chat_type  # Pass the chat type
-                )
-                
-                add_channel_with_tags(
-                    channel_schema=channel_data,
-                    tag_names=request_tags # Use the tags we safely extracted
-                )
-                
-                # --- Step 3: Update the request status to success ---
-                with UnitOfWork() as uow:
-                    # We now use the ID to update the request
-                    uow.join_requests.update_request_status(request_id, models.JoinRequestStatus.SUCCESS)
-
-            except UserAlreadyParticipantError:
-                logger.info(f"Already a participant in channel: {request_identifier}")
-                with UnitOfWork() as uow:
-                    # We use the ID here too
-                    uow.join_requests.update_request_status(request_id, models.JoinRequestStatus.SUCCESS)
-            
-            except FloodError:
-                logger.warning(f"Flood error while processing {request_identifier}. Retrying after cooldown.")
-                await asyncio.sleep(60)
-
-
-            except Exception as e:
-                logger.error(f"Failed to process join request for {request_identifier}: {e}", exc_info=True)
-                with UnitOfWork() as uow:
-                    # We use the ID here too
-                    uow.join_requests.update_request_status(request_id, models.JoinRequestStatus.FAILED)
-        
+            logger.info(f"[Processor] Worker {worker_id} claimed join request {job[0]}.")
+            await _process_join_request(client, *job)
+
         except Exception as e:
-            logger.error(f"Critical error in processor task loop: {e}", exc_info=True)
+            logger.error(f"Critical error in join worker {worker_id}: {e}", exc_info=True)
             await asyncio.sleep(60)
+
+
+async def _record_outcome(request_id: uuid.UUID, lease: datetime, status: models.JoinRequestStatus | None, retry_after: float = 0):
+    """
+    Stores a claimed request's outcome under its lease: the final `status`, or with
+    status None, hands the request back to be retried after `retry_after` seconds.
+    """
+    async with AsyncUnitOfWork() as uow:
+        if status is None:
+            recorded = await uow.join_requests.release_request(request_id, lease, delay_seconds=retry_after)
+        else:
+            recorded = await uow.join_requests.update_request_status(request_id, status, lease)
+    if not recorded:
+        logger.warning(f"[Processor] Lease on join request {request_id} expired before its outcome was recorded; left to its new owner.")
+
+
+async def _resolve_entity(client: TelegramClient, identifier: str, deadline: float) -> schemas.ResolvedEntity:
+    """Resolves an @username through the entity cache; other identifiers go through Telethon."""
+    if identifier.startswith("@"):
+        return await entity_cache_service.resolve_username(client, identifier, deadline=deadline)
+    entity = await client.get_entity(identifier)
+    return await entity_cache_service.remember_entity(identifier, entity)
+
+
+async def _process_join_request(client: TelegramClient, request_id: uuid.UUID, request_identifier: str, request_tags: list[str], lease: datetime):
+    """Joins one claimed request's chat, saves the channel and records the outcome."""
+    # We are using simple Python types (UUID, str, list), not detached ORM objects.
+    logger.info(f"Processing join request for identifier: {request_identifier}")
+    # Paced calls may only wait while the lease is safely held; longer waits hand the request back.
+    deadline = time.monotonic() + settings.JOIN_LEASE_SECONDS - LEASE_MARGIN_SECONDS
+
+    try:
+        # --- Step 1: Use Telethon to join the channel ---
+        entity_name = request_identifier
+        # if 't.me/' in request_identifier and 't.me/+' not in request_identifier:
+        #     entity_name = request_identifier.split('/')[-1]
+
+        # if 't.me/+' in request_identifier :
+        #     invite_hash = request_identifier.split('/')[-1].replace('+', '')
+        #     updates = await client(ImportChatInviteRequest(invite_hash))
+        #     entity = updates.chats[0]
+        invite_hash = None
+        if "+" in request_identifier:
+            # This is a private channel invite link
+            cached = await entity_cache_service.get_cached_entity(request_identifier)
+            if cached and not cached.found:
+                raise ValueError(f"Invite link '{request_identifier}' was recently found to be invalid.")
+            invite_hash = request_identifier.replace('+', '')
+            try:
+                updates = await join_scheduler.call(client, ImportChatInviteRequest(invite_hash), deadline=deadline)
+            except (InviteHashExpiredError, InviteHashInvalidError):
+                await entity_cache_service.remember_missing(request_identifier)
+                raise
+            resolved = await entity_cache_service.remember_entity(request_identifier, updates.chats[0])
+        else:
+            resolved = await _resolve_entity(client, entity_name, deadline)
+            if not resolved.found:
+                raise ValueError(f"'{request_identifier}' does not exist (cached until {resolved.expires_at}).")
+            if resolved.type in (ChatType.CHANNEL, ChatType.SUPERGROUP):
+                await join_scheduler.call(client, JoinChannelRequest(InputChannel(resolved.peer_id, resolved.access_hash)), deadline=deadline)
+
+        if resolved.type is None:
+            raise ValueError(f"'{request_identifier}' is a user, not a channel or group.")
+
+        logger.info(f"Successfully joined/verified channel: '{resolved.title}'")
+
+        # For basic groups, Telethon's entity.id is positive. We MUST store the negative.
+        final_telegram_id = resolved.telegram_id
+        chat_type = resolved.type
+
+        logger.info(f"Chat id {final_telegram_id} type determined: {chat_type}")
+
+
+        # --- Step 2: Call the service to save the channel and tags ---
+        channel_data = schemas.ChannelCreate(
+            telegram_id=final_telegram_id,
+            name=resolved.title,
+            username=resolved.username,
+            type=chat_type  # Pass the chat type
+        )
+        
+        await add_channel_with_tags(
+            channel_schema=channel_data,
+            tag_names=request_tags # Use the tags we safely extracted
+        )
+        
+        # --- Step 3: Update the request status to success ---
+        await _record_outcome(request_id, lease, models.JoinRequestStatus.SUCCESS)
+
+    except UserAlreadyParticipantError:
+        logger.info(f"Already a participant in channel: {request_identifier}")
+        await _record_outcome(request_id, lease, models.JoinRequestStatus.SUCCESS)
+    
+    except JoinDeferred as e:
+        # Rate limited: hand the request back for exactly as long as Telegram asked and move on.
+        logger.warning(f"Deferring {request_identifier}: {e}")
+        await _record_outcome(request_id, lease, None, retry_after=e.retry_after)
+
+    except FloodError:
+        logger.warning(f"Flood error while processing {request_identifier}. Retrying after cooldown.")
+        # Give the request back so it is not stuck until its lease expires, then back off.
+        await _record_outcome(request_id, lease, None, retry_after=60)
+
+
+    except Exception as e:
+        logger.error(f"Failed to process join request for {request_identifier}: {e}", exc_info=True)
+        await _record_outcome(request_id, lease, models.JoinRequestStatus.FAILED)
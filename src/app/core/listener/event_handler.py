@@ -1,30 +1,38 @@
 # src/app/core/event_handler.py
 
 import logging
-import asyncio
 from telethon import events, TelegramClient
 
 # Import our new worker function
 from .worker import process_new_message
+from .ingest_queue import IngestQueue
+from .message_writer import seen_messages
 
 logger = logging.getLogger(__name__)
 
+# The single ingest stage for this process. It is started and stopped by the
+# lifespan manager in main.py, and its stats are exposed by the metrics router.
+ingest_queue = IngestQueue(handler=process_new_message)
+
 def setup_event_handlers(client: TelegramClient):
     """
-    Attaches a simple event handler that triggers our worker function
-    for every new incoming message.
+    Attaches a simple event handler that hands every new incoming message
+    to the bounded ingest queue.
     """
     
     @client.on(events.NewMessage(incoming=True))
     async def new_message_trigger(event: events.NewMessage.Event):
         """
         This function's only job is to 'trigger' the real processing logic.
-        We run it as a background task to prevent blocking the event loop.
+        The event is queued for the worker pool; if the queue is full this
+        await applies backpressure to Telethon's update dispatch.
         """
+        if seen_messages.get((event.chat_id, event.message.id)):
+            logger.debug(f"Skipping duplicate message {event.message.id} in chat {event.chat_id}")
+            return
+
         logger.info(f"New message received in chat {event.chat_id}: {event.raw_text}")
         
-        # This is a "fire-and-forget" approach. The listener can immediately
-        # go back to listening for the next message while this one is processed.
-        asyncio.create_task(process_new_message(event))
+        await ingest_queue.put(event)
 
-    logger.info("✅ Event handler trigger for new messages has been set up.")
\ No newline at end of file
+    logger.info("✅ Event handler trigger for new messages has been set up.")
@@ -0,0 +1,168 @@
+# src/app/core/listener/ingest_queue.py
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from telethon import events
+
+from app.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[events.NewMessage.Event], Awaitable[None]]
+
+# Put on the queue by stop(), once per worker: a worker that takes one exits.
+_STOP = object()
+
+
+class IngestQueue:
+    """
+    A bounded buffer between the Telethon update handler and the message workers.
+
+    The handler only enqueues events; a fixed pool of consumer tasks drains the
+    queue and calls the per-item handler. When the queue is full, `put` waits
+    (which, with sequential updates enabled on the client, pauses update dispatch)
+    and gives up after `enqueue_timeout` seconds, counting the event as dropped.
+    On stop, the workers first finish the events already queued.
+    """
+    def __init__(
+        self,
+        handler: MessageHandler,
+        maxsize: int = settings.INGEST_QUEUE_SIZE,
+        workers: int = settings.INGEST_WORKERS,
+        enqueue_timeout: float = settings.INGEST_ENQUEUE_TIMEOUT,
+    ):
+        self.handler = handler
+        self.maxsize = maxsize
+        self.workers = workers
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._accepting = False
+
+        # --- Metrics ---
+        self.enqueued = 0
+        self.dequeued = 0
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self):
+        """Creates the queue and spawns the consumer workers on the running loop."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._accepting = True
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"ingest-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"[Ingest] Started {self.workers} workers (queue size {self.maxsize}).")
+
+    async def stop(self, timeout: float = settings.INGEST_DRAIN_TIMEOUT):
+        """
+        Stops accepting events and waits for the workers to handle everything
+        already queued. Workers still busy after `timeout` seconds are cancelled,
+        and the events left in the queue at that point are lost.
+        """
+        if not self._tasks:
+            return
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self._finish_queued(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"[Ingest] Workers did not finish the queue within {timeout}s, cancelling them.")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        left = sum(1 for item in _drain(self._queue) if item is not _STOP)
+        logger.info(f"[Ingest] Stopped workers, {left} events left unprocessed.")
+
+    async def _finish_queued(self):
+        # Queued behind every event (and any put() still waiting for room).
+        for _ in self._tasks:
+            await self._queue.put(_STOP)
+        await asyncio.gather(*self._tasks)
+
+    async def put(self, event: events.NewMessage.Event) -> bool:
+        """
+        Enqueues an event, waiting for free space if the queue is full.
+        Returns False if the event was dropped because the queue stayed full.
+        """
+        if self._queue is None:
+            raise RuntimeError("IngestQueue.start() must be called before put().")
+        if not self._accepting:
+            self.dropped += 1
+            logger.warning(f"[Ingest] Dropped message {event.message.id} in chat {event.chat_id}: shutting down.")
+            return False
+
+        item = (time.monotonic(), event)
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            logger.warning(f"[Ingest] Queue full ({self.maxsize}), applying backpressure.")
+            try:
+                await asyncio.wait_for(self._queue.put(item), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                logger.error(f"[Ingest] Dropped message {event.message.id} in chat {event.chat_id}: queue still full after {self.enqueue_timeout}s.")
+                return False
+
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    async def _worker(self, worker_id: int):
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            enqueued_at, event = item
+            wait = time.monotonic() - enqueued_at
+            self.dequeued += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            try:
+                await self.handler(event)
+                self.processed += 1
+            except Exception as e:
+                # The handler is expected to log its own errors; this is a last resort
+                # so a single bad event can never kill a worker.
+                self.failed += 1
+                logger.error(f"[Ingest] Worker {worker_id} failed to handle an event: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        """A snapshot of the queue's counters, suitable for a metrics endpoint."""
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "capacity": self.maxsize,
+            "workers": len(self._tasks),
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "avg_wait_seconds": self.total_wait / self.dequeued if self.dequeued else 0.0,
+            "max_wait_seconds": self.max_wait,
+        }
+
+
+def _drain(queue: asyncio.Queue) -> list:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
@@ -0,0 +1,141 @@
+# src/app/core/listener/join_scheduler.py
+
+import asyncio
+import logging
+import time
+
+from telethon import TelegramClient
+from telethon.errors import FloodWaitError
+from telethon.tl.functions.channels import JoinChannelRequest
+from telethon.tl.functions.contacts import ResolveUsernameRequest
+from telethon.tl.functions.messages import ImportChatInviteRequest
+
+from app.config.config import settings
+from app.core.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+RESOLVE = "resolve"
+JOIN = "join"
+IMPORT = "import"
+
+# The budget each Telegram method is charged against.
+METHOD_BUDGETS = {
+    ResolveUsernameRequest: RESOLVE,
+    JoinChannelRequest: JOIN,
+    ImportChatInviteRequest: IMPORT,
+}
+
+
+class JoinDeferred(Exception):
+    """The call cannot be made for `retry_after` seconds; the request should be retried later."""
+    def __init__(self, budget: str, retry_after: float):
+        super().__init__(f"'{budget}' budget exhausted, retry after {retry_after:.0f}s")
+        self.budget = budget
+        self.retry_after = retry_after
+
+
+class MethodBudget:
+    """
+    The pacing for one Telegram method.
+
+    It starts at the configured rate. Every FloodWait pauses it for exactly the
+    wait Telegram returned and halves the rate, since the account evidently hit a
+    limit; each success afterwards wins back a little of it, up to the configured
+    rate again.
+    """
+    def __init__(self, name: str, per_hour: float, burst: int):
+        self.name = name
+        self.max_rate = per_hour / 3600
+        self.bucket = TokenBucket(self.max_rate, burst)
+
+        # --- Metrics ---
+        self.calls = 0
+        self.flood_waits = 0
+        self.last_flood_wait = 0
+
+    @property
+    def per_hour(self) -> float:
+        return self.bucket.rate * 3600
+
+    def on_success(self):
+        self.calls += 1
+        self.bucket.rate = min(self.max_rate, self.bucket.rate + self.max_rate / 20)
+
+    def on_flood_wait(self, seconds: int):
+        self.flood_waits += 1
+        self.last_flood_wait = seconds
+        self.bucket.pause(seconds)
+        self.bucket.rate = max(self.max_rate / 16, self.bucket.rate / 2)
+        logger.warning(f"[JoinScheduler] FloodWait of {seconds}s on '{self.name}', now pacing at {self.per_hour:.1f}/h.")
+
+    def stats(self) -> dict:
+        return {
+            "per_hour": round(self.per_hour, 2),
+            "paused_for_seconds": round(self.bucket.paused_for),
+            "calls": self.calls,
+            "flood_waits": self.flood_waits,
+            "last_flood_wait_seconds": self.last_flood_wait,
+        }
+
+
+class JoinScheduler:
+    """
+    Paces the join processor's Telegram calls with one budget per method, so
+    resolving usernames, joining public channels and importing invites are
+    limited independently.
+
+    `call` waits for a short gap between calls. If the budget is paused or the wait
+    would exceed `max_inline_wait`, or run past the caller's `deadline`, it raises
+    JoinDeferred instead of holding the worker, and the caller hands the request
+    back with that delay. A FloodWaitError from Telegram is turned into
+    JoinDeferred the same way.
+    """
+    def __init__(self, max_inline_wait: float = settings.JOIN_MAX_INLINE_WAIT_SECONDS):
+        self.max_inline_wait = max_inline_wait
+        self.budgets = {
+            RESOLVE: MethodBudget(RESOLVE, settings.JOIN_RESOLVE_PER_HOUR, settings.JOIN_RESOLVE_BURST),
+            JOIN: MethodBudget(JOIN, settings.JOIN_CHANNEL_PER_HOUR, settings.JOIN_CHANNEL_BURST),
+            IMPORT: MethodBudget(IMPORT, settings.JOIN_IMPORT_PER_HOUR, settings.JOIN_IMPORT_BURST),
+        }
+
+    async def call(self, client: TelegramClient, request, deadline: float | None = None):
+        """
+        Makes a paced call. `deadline` is a time.monotonic() value the call has to
+        start by, e.g. while the caller still holds its lease on a join request.
+        """
+        budget = self.budgets[METHOD_BUDGETS[type(request)]]
+        while (wait := budget.bucket.try_acquire()) > 0:
+            if wait > self.max_inline_wait or (deadline is not None and time.monotonic() + wait > deadline):
+                raise JoinDeferred(budget.name, wait)
+            await asyncio.sleep(wait)
+
+        try:
+            # Threshold 0: never let Telethon sleep through a FloodWait on our behalf.
+            result = await client(request, flood_sleep_threshold=0)
+        except FloodWaitError as e:
+            budget.on_flood_wait(e.seconds)
+            raise JoinDeferred(budget.name, e.seconds) from e
+        budget.on_success()
+        return result
+
+    def estimate_drain_seconds(self, pending_public: int, pending_invites: int) -> float:
+        """
+        Rough time until the given backlog is through, at the current pacing.
+        A public request costs one resolve and one join; an invite costs one import.
+        """
+        def seconds_for(budget_name: str, calls: int) -> float:
+            budget = self.budgets[budget_name]
+            return budget.bucket.paused_for + calls / budget.bucket.rate if calls else 0.0
+
+        return max(
+            seconds_for(RESOLVE, pending_public),
+            seconds_for(JOIN, pending_public),
+            seconds_for(IMPORT, pending_invites),
+        )
+
+    def stats(self) -> dict:
+        return {name: budget.stats() for name, budget in self.budgets.items()}
+
+
+join_scheduler = JoinScheduler()
@@ -0,0 +1,183 @@
+# src/app/core/listener/message_writer.py
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from app.config.config import settings
+from app.core.cache import LRUCache
+from app.domain import schemas
+from app.services.message_service import save_new_messages
+
+logger = logging.getLogger(__name__)
+
+PersistedCallback = Callable[[schemas.Message, schemas.ChannelCreate], Awaitable[None]]
+BatchItem = tuple[schemas.MessageCreate, schemas.ChannelCreate]
+
+# Put on the queue by stop(): everything before it is written, then the flush loop exits.
+_STOP = object()
+
+# (chat_id, message_id) pairs known to be stored. Telethon re-delivers updates
+# after reconnects and catch-up; the event handler drops those it finds here. A
+# pair is only added once its message is in the database, so a failed write
+# never hides a later re-delivery. The unique constraint on messages catches
+# the rest (re-deliveries still in flight, or evicted from this window).
+seen_messages: LRUCache[tuple[int, int], bool] = LRUCache(maxsize=settings.SEEN_MESSAGES_CACHE_SIZE)
+
+
+class MessageBatchWriter:
+    """
+    Collects incoming messages and writes them to the database in batches.
+
+    A batch is flushed as soon as it holds `max_batch` messages or its first
+    message has waited `max_delay_ms`. After each flush the newly saved messages
+    are handed to `on_persisted` one by one, in the order they were submitted;
+    messages the database already had are skipped.
+    """
+    def __init__(
+        self,
+        on_persisted: PersistedCallback,
+        max_batch: int = settings.MESSAGE_BATCH_SIZE,
+        max_delay_ms: int = settings.MESSAGE_BATCH_MAX_DELAY_MS,
+    ):
+        self.on_persisted = on_persisted
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+        # --- Metrics ---
+        self.batches = 0
+        self.messages = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.last_flush_seconds = 0.0
+
+    def start(self):
+        """Spawns the flush loop on the running event loop."""
+        if self._task:
+            return
+        # Room for a few batches, so submitters only block when the DB falls behind.
+        self._queue = asyncio.Queue(maxsize=self.max_batch * 10)
+        self._task = asyncio.create_task(self._run(self._queue), name="message-batch-writer")
+        logger.info(f"[Writer] Started (batch size {self.max_batch}, max delay {self.max_delay * 1000:.0f}ms).")
+
+    async def stop(self):
+        """
+        Stops accepting messages and waits until the flush loop has written
+        everything submitted so far, including the batch it is working on.
+        """
+        if not self._task:
+            return
+        queue, self._queue = self._queue, None  # submit() refuses new messages from here on
+        if not self._task.done():
+            # Queued behind every submitted message (and any submitter still waiting for room).
+            await queue.put(_STOP)
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+        # Only left over if the flush loop died; write them here rather than lose them.
+        remaining = [item for item in _drain(queue) if item is not _STOP]
+        for i in range(0, len(remaining), self.max_batch):
+            await self._write(remaining[i:i + self.max_batch])
+        logger.info(f"[Writer] Stopped after writing all submitted messages ({len(remaining)} left over by the flush loop).")
+
+    async def submit(self, message_schema: schemas.MessageCreate, channel_schema: schemas.ChannelCreate):
+        """Adds a message to the next batch. Waits if the buffer is full."""
+        if self._queue is None:
+            raise RuntimeError("MessageBatchWriter is not running; call start() before submit().")
+        await self._queue.put((message_schema, channel_schema))
+
+    async def _run(self, queue: asyncio.Queue):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch(queue)
+            if batch:
+                await self._write(batch)
+
+    async def _next_batch(self, queue: asyncio.Queue) -> tuple[list[BatchItem], bool]:
+        """
+        Waits for one message, then gathers more until the batch is full or the delay
+        expires. Also returns whether stop() was requested; the batch then holds
+        everything that was submitted before it.
+        """
+        loop = asyncio.get_running_loop()
+        item = await queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = loop.time() + self.max_delay
+
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _write(self, batch: list[BatchItem]):
+        started = time.monotonic()
+        failed = 0
+        try:
+            results = await save_new_messages(batch)
+            stored = batch
+        except Exception as e:
+            # One bad row fails the whole INSERT. Retry one by one so the rest still land.
+            logger.error(f"[Writer] Batch of {len(batch)} failed, retrying individually: {e}", exc_info=True)
+            results, stored = [], []
+            for item in batch:
+                try:
+                    results.extend(await save_new_messages([item]))
+                    stored.append(item)
+                except Exception as item_error:
+                    failed += 1
+                    results.append(None)
+                    logger.error(f"[Writer] Could not save message {item[0].telegram_message_id}: {item_error}")
+
+        # Saved now or already there: either way the message is in the database.
+        for message_schema, channel_schema in stored:
+            seen_messages.set((channel_schema.telegram_id, message_schema.telegram_message_id), True)
+
+        saved = [
+            (message_dto, channel_schema)
+            for message_dto, (_, channel_schema) in zip(results, batch)
+            if message_dto is not None
+        ]
+        self.batches += 1
+        self.messages += len(saved)
+        self.failed += failed
+        self.duplicates += len(batch) - len(saved) - failed
+        self.last_flush_seconds = time.monotonic() - started
+
+        for message_dto, channel_schema in saved:
+            try:
+                await self.on_persisted(message_dto, channel_schema)
+            except Exception as e:
+                logger.error(f"[Writer] Post-save handler failed for message {message_dto.id}: {e}", exc_info=True)
+
+    def stats(self) -> dict:
+        """A snapshot of the writer's counters, suitable for a metrics endpoint."""
+        return {
+            "buffered": self._queue.qsize() if self._queue else 0,
+            "batches": self.batches,
+            "messages": self.messages,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "avg_batch_size": self.messages / self.batches if self.batches else 0.0,
+            "last_flush_seconds": self.last_flush_seconds,
+        }
+
+
+def _drain(queue: asyncio.Queue) -> list:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
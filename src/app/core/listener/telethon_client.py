@@ -19,6 +19,9 @@ def get_telethon_client(session_name: str) -> TelegramClient:
     client = TelegramClient(
         session_path,
         settings.API_ID,
-        settings.API_HASH
+        settings.API_HASH,
+        # Dispatch updates one at a time so a full ingest queue pauses
+        # update handling instead of piling up handler tasks.
+        sequential_updates=True,
     )
     return client
\ No newline at end of file
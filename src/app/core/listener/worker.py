@@ -6,16 +6,19 @@ from telethon.tl.types import Channel as TelethonChannel, Chat as TelethonChat
 
 from app.domain import schemas
 
-from app.services.message_service import save_new_message
 from app.services.matching_service import run_matching_for_message
 from app.domain.models import ChatType
+from .message_writer import MessageBatchWriter
 
 logger = logging.getLogger(__name__)
 
+# Saved messages are handed to the matcher in the order they were written.
+message_writer = MessageBatchWriter(on_persisted=run_matching_for_message)
+
 async def process_new_message(event: events.NewMessage.Event):
     """
     The orchestrator function. It extracts all necessary data and
-    calls the appropriate services.
+    hands the message to the batch writer.
     """
     try:
         logger.info(f"Processing new message in chat {event.chat_id}: {event.raw_text}")
@@ -57,19 +60,9 @@ async def process_new_message(event: events.NewMessage.Event):
             sent_at=event.message.date,
         )
         
-        # Step 3: Call the service to save everything.
-        # `db_message` is a safe Pydantic schema object.
-        message_schema = save_new_message(
-            message_schema=message_data,
-            channel_schema=channel_data # Pass the enriched channel data
-        )
-
-        if not message_schema:
-            logger.warning("Message was not saved, skipping matching.")
-            return
-
-        # Step 4: Call the dedicated matching service.
-        await run_matching_for_message(message_schema, channel_data)
+        # Step 3: Queue the message for the next batched write.
+        # The writer runs the matching service once the batch is saved.
+        await message_writer.submit(message_data, channel_data)
 
     except Exception as e:
         logger.error(f"Error in process_new_message orchestrator: {e}", exc_info=True)
\ No newline at end of file
@@ -0,0 +1,20 @@
+# src/app/core/months.py
+
+import datetime
+from typing import TypeVar
+
+Day = TypeVar("Day", datetime.date, datetime.datetime)
+
+
+def add_months(month: Day, count: int) -> Day:
+    """
+    The first day of the month `count` months after `month` (before it, if negative).
+    A datetime keeps its time of day and timezone.
+    """
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def month_start(moment: datetime.datetime) -> datetime.datetime:
+    """Midnight on the first day of `moment`'s month, in `moment`'s timezone."""
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
@@ -0,0 +1,64 @@
+# src/app/core/rate_limit.py
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    A classic token bucket: `rate` tokens per second, holding at most `capacity`.
+
+    `try_acquire` never waits; it either takes a token or reports how long
+    until one is available. `acquire` sleeps until it can take one. `reserve`
+    always takes a token, going into debt if needed, and returns when it may be
+    used; callers that reserve in order are served in that order.
+    `pause` blocks the bucket for a fixed time, e.g. after a 429 or FloodWait.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float):
+        if now < self._paused_until:
+            return
+        start = max(self._updated, self._paused_until)
+        self._tokens = min(self.capacity, self._tokens + (now - start) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Takes a token and returns 0.0, or returns the seconds until one will be available."""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def reserve(self) -> float:
+        """Takes a token now and returns the seconds until it may be used (0.0 if right away)."""
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens -= 1
+        return max(0.0, self._paused_until - now) + max(0.0, -self._tokens) / self.rate
+
+    async def acquire(self):
+        """Waits until a token is available, then takes it."""
+        while (delay := self.try_acquire()) > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        """
+        Blocks the bucket for `seconds`. It resumes with at most one token, so
+        nothing bursts out once the pause ends; existing reservations stay queued behind it.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = min(self._tokens, 1.0)
+
+    @property
+    def paused_for(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
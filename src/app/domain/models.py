@@ -2,11 +2,11 @@
 
 import uuid
 from sqlalchemy import (
-    Column, String, BigInteger, ForeignKey, Table, DateTime, Text, Boolean, ARRAY,
-    Enum as SQLAlchemyEnum
+    Column, String, BigInteger, ForeignKey, Table, Date, DateTime, Text, Boolean, ARRAY,
+    UniqueConstraint, ForeignKeyConstraint, Index, Computed, DDL, Enum as SQLAlchemyEnum, event, text
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.sql import func
 from app.config.db import Base
 import enum
@@ -24,6 +24,10 @@ class ChatType(enum.Enum):
     SUPERGROUP = "supergroup"
     BASIC_GROUP = "basic_group"
 
+# Text search configuration for message content. 'simple' only lowercases, with no
+# stemming or stop words, because the monitored chats are not all in one language.
+MESSAGE_SEARCH_CONFIG = "simple"
+
 # --- Association Table for Many-to-Many Relationships ---
 # We'll use the modern Mapped[] syntax for these too.
 channel_tags_table = Table(
@@ -53,11 +57,19 @@ subscription_tags_table = Table(
     Column('tag_id', UUID(as_uuid=True), ForeignKey('tags.id', ondelete="CASCADE"), primary_key=True)
 )
 
+# Partitioned like `messages`, on a copy of the message's sent_at, which is also
+# part of the foreign key (a partitioned table's keys must include its partition key).
 message_tags_table = Table(
     'message_tags',
     Base.metadata,
-    Column('message_id', UUID(as_uuid=True), ForeignKey('messages.id', ondelete="CASCADE"), primary_key=True),
-    Column('tag_id', UUID(as_uuid=True), ForeignKey('tags.id', ondelete="CASCADE"), primary_key=True)
+    Column('message_id', UUID(as_uuid=True), primary_key=True),
+    Column('message_sent_at', DateTime(timezone=True), primary_key=True),
+    Column('tag_id', UUID(as_uuid=True), ForeignKey('tags.id', ondelete="CASCADE"), primary_key=True),
+    ForeignKeyConstraint(
+        ['message_id', 'message_sent_at'], ['messages.id', 'messages.sent_at'],
+        name='message_tags_message_id_fkey', ondelete="CASCADE",
+    ),
+    postgresql_partition_by='RANGE (message_sent_at)',
 )
 
 
@@ -95,6 +107,11 @@ class Channel(Base):
     status: Mapped[Status] = mapped_column(SQLAlchemyEnum(Status), default=Status.ACTIVE, nullable=False)
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # IDs of the channel's tags, copied from channel_tags by a trigger (see the end of this module)
+    # so tag filters are a GIN-indexed array test instead of a join. Never written by the app.
+    tag_ids: Mapped[list[uuid.UUID]] = mapped_column(
+        ARRAY(UUID(as_uuid=True)), server_default=text("'{}'"), nullable=False, deferred=True
+    )
 
     # Relationships
     messages: Mapped[list["Message"]] = relationship(back_populates="channel")
@@ -140,13 +157,29 @@ class Subscription(Base):
     status: Mapped[Status] = mapped_column(SQLAlchemyEnum(Status), default=Status.ACTIVE, nullable=False)
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # IDs of the subscription's tags, copied from subscription_tags by a trigger (see the end of this module)
+    # so tag filters are a GIN-indexed array test instead of a join. Never written by the app.
+    tag_ids: Mapped[list[uuid.UUID]] = mapped_column(
+        ARRAY(UUID(as_uuid=True)), server_default=text("'{}'"), nullable=False, deferred=True
+    )
 
     # Relationships
     user: Mapped["User"] = relationship(back_populates="subscriptions")
     tags: Mapped[list["Tag"]] = relationship(secondary=subscription_tags_table, back_populates="subscriptions")
 
 class Message(Base):
+    """
+    Partitioned by month on sent_at (see app/services/partition_service.py), so
+    queries should bound sent_at whenever they can to let Postgres prune partitions.
+    """
     __tablename__ = "messages"
+    __table_args__ = (
+        # A Telegram message is identified by its chat and its per-chat ID.
+        # This makes re-delivered updates (reconnects, catch-up) a no-op insert.
+        # sent_at never changes for a message, and a unique key must contain the partition key.
+        UniqueConstraint("channel_telegram_id", "telegram_message_id", "sent_at", name="uq_messages_channel_message"),
+        {"postgresql_partition_by": "RANGE (sent_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     telegram_message_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
@@ -158,16 +191,30 @@ class Message(Base):
     channel_telegram_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
 
     content: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Maintained by Postgres from `content`; deferred because only search queries need it.
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{MESSAGE_SEARCH_CONFIG}', coalesce(content, ''))", persisted=True),
+        deferred=True,
+    )
     
-    
-    sent_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
+    sent_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), primary_key=True)
     
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    
+    # IDs of the message's tags, copied from message_tags by a trigger (see the end of this module)
+    # so tag filters are a GIN-indexed array test instead of a join. Never written by the app.
+    tag_ids: Mapped[list[uuid.UUID]] = mapped_column(
+        ARRAY(UUID(as_uuid=True)), server_default=text("'{}'"), nullable=False, deferred=True
+    )
+
     # Relationships
     channel: Mapped[Optional["Channel"]] = relationship(back_populates="messages")
     tags: Mapped[list["Tag"]] = relationship(secondary=message_tags_table, back_populates="messages")
 
+    # The table's key is (id, sent_at), but id alone is unique, so the ORM keeps
+    # identifying messages (and session.get) by id.
+    __mapper_args__ = {"primary_key": [id]}
+
     
     @property
     def clickable_link(self) -> str:
@@ -191,6 +238,7 @@ class Message(Base):
 # In src/app/domain/models.py
 class JoinRequestStatus(enum.Enum):
     PENDING = "pending"
+    PROCESSING = "processing"  # Claimed by a join worker until locked_until
     SUCCESS = "success"
     FAILED = "failed"
 
@@ -203,7 +251,142 @@ class ChannelJoinRequest(Base):
     requested_by_user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
     status: Mapped[JoinRequestStatus] = mapped_column(SQLAlchemyEnum(JoinRequestStatus), default=JoinRequestStatus.PENDING)
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # The lease of a PROCESSING request. Once it has passed, another worker may reclaim the request.
+    locked_until: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     requested_by: Mapped["User"] = relationship(back_populates="join_requests")
 
+    __table_args__ = (
+        # Serves the workers' claim query, which only looks at open requests in FIFO order.
+        Index(
+            "ix_join_requests_claimable",
+            "created_at",
+            postgresql_where=text("status IN ('PENDING', 'PROCESSING')"),
+        ),
+    )
+
     # TODO: Consider adding fields for approval status and privacy (e.g., approved)
+
+
+class ResolvedEntity(Base):
+    """
+    What a normalized identifier (@username or +invite hash) resolved to on Telegram.
+    Lets the join path and API skip ResolveUsernameRequest, which is heavily rate-limited.
+    A row without a peer_id is a negative entry: the identifier did not resolve.
+    """
+    __tablename__ = "resolved_entities"
+
+    identifier: Mapped[str] = mapped_column(String, primary_key=True)
+    # Telethon's raw (positive) ID and the access hash this session must use with it.
+    peer_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    access_hash: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    # None for a found entity means it is a user or bot, not a chat.
+    type: Mapped[Optional[ChatType]] = mapped_column(SQLAlchemyEnum(ChatType), nullable=True)
+    title: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    username: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    resolved_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+# --- Activity rollups ---
+# Counters kept up to date by the ingest path and the matcher (see app/repo/stats_repo.py),
+# so the stats API never scans messages. They keep counting messages that are later
+# archived or dropped by partition retention. All periods are in UTC.
+
+class ChannelActivityHourly(Base):
+    """Messages saved per channel per hour."""
+    __tablename__ = "channel_activity_hourly"
+
+    channel_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("channels.id", ondelete="CASCADE"), primary_key=True)
+    hour: Mapped[DateTime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    message_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    __table_args__ = (Index("ix_channel_activity_hourly_hour", "hour"),)
+
+
+class TagActivityDaily(Base):
+    """Messages saved per day from channels carrying each tag (as tagged when the message arrived)."""
+    __tablename__ = "tag_activity_daily"
+
+    tag_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[Date] = mapped_column(Date, primary_key=True)
+    message_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    __table_args__ = (Index("ix_tag_activity_daily_day", "day"),)
+
+
+class SubscriptionMatchesDaily(Base):
+    """Matches per subscription per day of the matched message."""
+    __tablename__ = "subscription_matches_daily"
+
+    subscription_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("subscriptions.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[Date] = mapped_column(Date, primary_key=True)
+    match_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    __table_args__ = (Index("ix_subscription_matches_daily_day", "day"),)
+
+
+# --- Keyset pagination indexes ---
+# Each matches a Keyset in app/repo, column for column (see app/repo/pagination.py).
+Index("ix_messages_sent_at_id", Message.sent_at, Message.id)
+Index("ix_channels_name_id", func.coalesce(Channel.name, ""), Channel.id)
+Index("ix_subscriptions_created_at_id", Subscription.created_at, Subscription.id)
+Index("ix_users_full_name_id", User.full_name, User.id)
+
+# --- Join request duplicate checks ---
+# @usernames are compared case-insensitively (see app/repo/join_request_repo.py).
+Index("ix_join_requests_identifier_lower", func.lower(ChannelJoinRequest.identifier))
+
+# --- Message search ---
+# The optional pg_trgm index for substring search (ix_messages_content_trgm) is only
+# created by the migration, when the extension is available.
+Index("ix_messages_search_vector", Message.search_vector, postgresql_using="gin")
+
+# --- Tag filters ---
+# tag_ids mirrors each association table. The triggers add or remove one ID at a
+# time under the owner's row lock, so concurrent tag changes never overwrite each other.
+Index("ix_channels_tag_ids", Channel.tag_ids, postgresql_using="gin")
+Index("ix_subscriptions_tag_ids", Subscription.tag_ids, postgresql_using="gin")
+Index("ix_messages_tag_ids", Message.tag_ids, postgresql_using="gin")
+
+def tag_ids_trigger_ddl(association: str, owner: str, keys: dict[str, str]) -> str:
+    """
+    The function and AFTER trigger on `association` that keep `owner`.tag_ids in step.
+    `keys` maps the owner's key columns to the association's columns referencing them.
+
+    Used by create_all. Migration f3c9a1e7b524 keeps a frozen copy; changing the
+    trigger here needs a new migration as well.
+    """
+    def match(row: str) -> str:
+        return " AND ".join(f"{column} = {row}.{ref}" for column, ref in keys.items())
+    return f"""
+CREATE OR REPLACE FUNCTION {association}_sync_tag_ids() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE {owner} SET tag_ids = array_remove(tag_ids, OLD.tag_id)
+        WHERE {match("OLD")} AND tag_ids @> ARRAY[OLD.tag_id];
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE {owner} SET tag_ids = array_append(tag_ids, NEW.tag_id)
+        WHERE {match("NEW")} AND NOT tag_ids @> ARRAY[NEW.tag_id];
+    END IF;
+    RETURN NULL;
+END $$;
+CREATE TRIGGER {association}_sync_tag_ids AFTER INSERT OR UPDATE OR DELETE ON {association}
+    FOR EACH ROW EXECUTE FUNCTION {association}_sync_tag_ids();
+"""
+
+TAG_IDS_TRIGGERS = {
+    "channel_tags": ("channels", {"id": "channel_id"}),
+    "subscription_tags": ("subscriptions", {"id": "subscription_id"}),
+    # sent_at lets Postgres go straight to the message's partition.
+    "message_tags": ("messages", {"id": "message_id", "sent_at": "message_sent_at"}),
+}
+for _association in (channel_tags_table, subscription_tags_table, message_tags_table):
+    event.listen(_association, "after_create", DDL(tag_ids_trigger_ddl(_association.name, *TAG_IDS_TRIGGERS[_association.name])))
+
+# --- Partitions ---
+# Monthly partitions are created ahead of time by the maintenance task; the default
+# partitions catch anything outside them, so an insert never fails for lack of one.
+event.listen(Message.__table__, "after_create", DDL("CREATE TABLE IF NOT EXISTS messages_default PARTITION OF messages DEFAULT"))
+event.listen(message_tags_table, "after_create", DDL("CREATE TABLE IF NOT EXISTS message_tags_default PARTITION OF message_tags DEFAULT"))
@@ -2,6 +2,8 @@
 
 from email import message
 from os import name
+import enum
+import inspect
 import uuid
 import datetime
 from pydantic import BaseModel, ConfigDict, Field
@@ -14,12 +16,30 @@ from .models import Status, ChatType # Import our custom Status enum
 
 # --- Base Schemas (for creation) ---
 
+class CountStrategy(str, enum.Enum):
+    """How the `total` of a paginated response is computed."""
+    EXACT = "exact"  # COUNT(*) over the filtered query
+    ESTIMATED = "estimated"  # The planner's row estimate; pg_class.reltuples when unfiltered
+    CACHED = "cached"  # An exact count, reused for a few seconds per filter combination
+    NONE = "none"  # No total at all
+
+class SearchMode(str, enum.Enum):
+    """How the `search` text of the messages endpoint is interpreted."""
+    WEB = "web"  # Words must all occur; supports "quoted phrases", OR and -excluded words
+    PHRASE = "phrase"  # The words must occur next to each other, in order
+    PREFIX = "prefix"  # Every word is a prefix (e.g. "deploy" finds "deployment")
+    SUBSTRING = "substring"  # Case-insensitive substring of the content (slowest)
+
 T = TypeVar('T')
 class PaginatedResponse(BaseModel, Generic[T]):
-    total: int
+    total: Optional[int]
+    # Which strategy actually produced `total` (a cache miss is reported as exact).
+    total_strategy: CountStrategy = CountStrategy.EXACT
     limit: int
     skip: int
     items: list[T]
+    # Pass as ?cursor= to get the next page; None on the last page.
+    next_cursor: Optional[str] = None
 
 
 class UserCreate(BaseModel):
@@ -120,6 +140,57 @@ class Message(BaseModel):
 class MessageResponse(Message): # Inherits from our existing Message schema
     tags: list[Tag] = []
     channel: Optional[Channel] = None # Ensure the channel info is included
+    snippet: Optional[str] = None # Highlighted search excerpt, only with ?highlight=true
+
+class JoinImportRequest(BaseModel):
+    identifiers: list[str]
+    tags: list[str] = ["others"]
+    user_id: uuid.UUID
+
+class JoinImportResult(BaseModel):
+    total: int = 0  # Non-empty input lines
+    invalid: int = 0  # Not recognized by normalize_identifier
+    duplicates: int = 0  # Repeated within the input itself
+    already_requested: int = 0  # A pending, processing or successful request exists
+    already_joined: int = 0  # A channel with that username is already known
+    created: int = 0
+
+class ResolvedEntity(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    identifier: str
+    peer_id: Optional[int] = None
+    access_hash: Optional[int] = None
+    type: Optional[ChatType] = None
+    title: Optional[str] = None
+    username: Optional[str] = None
+    resolved_at: datetime.datetime
+    expires_at: datetime.datetime
+
+    @property
+    def found(self) -> bool:
+        return self.peer_id is not None
+
+    @property
+    def telegram_id(self) -> int | None:
+        """The ID in the form we store for channels (the "-100..." form for channels and supergroups)."""
+        if self.type in (ChatType.CHANNEL, ChatType.SUPERGROUP):
+            return -(self.peer_id + 1_000_000_000_000)
+        if self.type == ChatType.BASIC_GROUP:
+            return -self.peer_id
+        return self.peer_id
+
+
+def async_depends(dependency_class: type):
+    """
+    Depends() on a dependency class, but called on the event loop. FastAPI runs
+    plain callables, classes included, in its threadpool; this wraps the class
+    in a coroutine function with the same parameters.
+    """
+    async def dependency(**kwargs):
+        return dependency_class(**kwargs)
+    dependency.__signature__ = inspect.signature(dependency_class)
+    return Depends(dependency)
 
 
 class BaseFilterParams:
@@ -134,6 +205,8 @@ class BaseFilterParams:
         start_date: datetime.date | None = Query(None, description="Start date for filtering (YYYY-MM-DD)"),
         end_date: datetime.date | None = Query(None, description="End date for filtering (YYYY-MM-DD)"),
         tags: list[str] | None = Query(None, description="Filter by tags (e.g., ?tags=tech&tags=jobs)"),
+        cursor: str | None = Query(None, description="The next_cursor of the previous page. Replaces skip and stays fast on deep pages"),
+        count: CountStrategy = Query(CountStrategy.EXACT, description="How to compute total: exact, estimated, cached or none"),
     ):
         self.skip = skip
         self.limit = limit
@@ -141,6 +214,8 @@ class BaseFilterParams:
         self.start_date = start_date
         self.end_date = end_date
         self.tags = tags
+        self.cursor = cursor
+        self.count = count
 
 
 class SubscriptionFilterParams(BaseFilterParams):
@@ -150,7 +225,7 @@ class SubscriptionFilterParams(BaseFilterParams):
     """
     def __init__(
         self,
-        common_filters: BaseFilterParams = Depends(),
+        common_filters: BaseFilterParams = async_depends(BaseFilterParams),
         subscription_id: uuid.UUID | None = Query(None, description="Filter by subscription ID"),
         user_id: uuid.UUID | None = Query(None, description="Filter by user ID"),
         status: Status | None = Query(None, description="Filter by subscription status (e.g., 'active', 'inactive')"),
@@ -165,7 +240,7 @@ class ChannelFilterParams(BaseFilterParams):
     """Dependency class for channel filtering and pagination."""
     def __init__(
         self,
-        common_filters: BaseFilterParams = Depends(),
+        common_filters: BaseFilterParams = async_depends(BaseFilterParams),
         channel_id: uuid.UUID | None = Query(None, description="Filter by a specific channel's UUID"),
         channel_telegram_id: int | None = Query(None, description="Filter by a specific channel's Telegram ID"),
         type: ChatType | None = Query(None, description="Filter by channel type (e.g., 'group', 'supergroup', 'channel')"),
@@ -180,15 +255,21 @@ class ChannelFilterParams(BaseFilterParams):
 class MessageFilterParams(BaseFilterParams):
     def __init__(
         self,
-        common_filters: BaseFilterParams = Depends(),
+        common_filters: BaseFilterParams = async_depends(BaseFilterParams),
         channel_id: uuid.UUID | None = Query(None, description="Filter by a specific channel's UUID"),
         channel_telegram_id: int | None = Query(None, description="Filter by a specific channel's Telegram ID"),
-        message_id: uuid.UUID | None = Query(None, description="Filter by a specific message's UUID")
+        message_id: uuid.UUID | None = Query(None, description="Filter by a specific message's UUID"),
+        search_mode: SearchMode = Query(SearchMode.WEB, description="How to match `search`: web, phrase, prefix or substring"),
+        rank: bool = Query(False, description="Order search results by relevance instead of date (pages are reached with skip only)"),
+        highlight: bool = Query(False, description="Return a highlighted snippet of each matching message"),
     ):
         self.__dict__.update(common_filters.__dict__)
         self.channel_id = channel_id
         self.channel_telegram_id = channel_telegram_id
         self.message_id = message_id
+        self.search_mode = search_mode
+        self.rank = rank
+        self.highlight = highlight
 
 class UserFilterParams(BaseFilterParams):
     """
@@ -197,7 +278,7 @@ class UserFilterParams(BaseFilterParams):
     """
     def __init__(
         self,
-        common_filters: BaseFilterParams = Depends(),
+        common_filters: BaseFilterParams = async_depends(BaseFilterParams),
         user_id: uuid.UUID | None = Query(None, description="Filter by user ID"),
         telegram_id: int | None = Query(None, description="Filter by Telegram ID"),
         status: Status | None = Query(None, description="Filter by user status (e.g., 'active', 'inactive')"),
@@ -209,4 +290,40 @@ class UserFilterParams(BaseFilterParams):
         self.telegram_id = telegram_id
         self.status = status
         self.name = name
-        self.username = username
\ No newline at end of file
+        self.username = username
+
+# --- Stats (served from the rollup tables) ---
+
+class StatsFilterParams:
+    """The period of a stats query: whole UTC days, the last 7 by default."""
+    def __init__(
+        self,
+        start_date: datetime.date | None = Query(None, description="First day (YYYY-MM-DD, UTC). Defaults to 6 days before end_date"),
+        end_date: datetime.date | None = Query(None, description="Last day, inclusive (YYYY-MM-DD, UTC). Defaults to today"),
+        limit: int = Query(25, ge=1, le=500, description="Max number of rows for ranked lists"),
+    ):
+        self.end_date = end_date or datetime.datetime.now(datetime.timezone.utc).date()
+        self.start_date = start_date or self.end_date - datetime.timedelta(days=6)
+        self.limit = limit
+
+class ChannelActivity(BaseModel):
+    channel_id: uuid.UUID
+    name: Optional[str] = None
+    username: Optional[str] = None
+    messages: int
+
+class HourlyCount(BaseModel):
+    hour: datetime.datetime
+    messages: int
+
+class TagVolume(BaseModel):
+    tag_id: uuid.UUID
+    name: str
+    messages: int  # Messages from channels carrying the tag
+
+class UserMatchRate(BaseModel):
+    user_id: uuid.UUID
+    telegram_id: int
+    full_name: str
+    matches: int
+    match_rate: float  # Matches per message saved in the period
@@ -2,16 +2,22 @@
 
 import asyncio
 import logging
-from re import L
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from logging.handlers import RotatingFileHandler # <-- Import for file logging
 import sentry_sdk # <-- Import Sentry
 from app.config.config import settings, setup_logging_directory, setup_sessions_directory
+from app.config.db import async_engine
 from app.core.listener.telethon_client import get_telethon_client, ACTIVE_CLIENTS
-from app.core.listener.event_handler import setup_event_handlers
-from app.core.listener.background_tasks import process_join_requests_task # <-- Renamed for clarity
+from app.core.listener.event_handler import setup_event_handlers, ingest_queue
+from app.core.listener.worker import message_writer
+from app.core.bot.notifier import start_notifier, close_notifier
+from app.core.bot.dispatcher import notification_dispatcher
+from app.core.listener.background_tasks import process_join_requests_task, partition_maintenance_task, archive_task, stats_flush_task
+from app.services.match_counter import match_counter
 from app.routers.routers import get_routers
+from app.repo.pagination import InvalidCursor
 
 setup_logging_directory()  # Ensure logging directory exists
 setup_sessions_directory()  # Ensure sessions directory exists
@@ -58,11 +64,20 @@ async def lifespan(app: FastAPI):
     logger.info(f"Connecting main client for '{main_session_name}'...")
     await client.start()
     
-    # 1. Setup the new message listener
+    # 1. Start the ingest workers and setup the new message listener
+    await start_notifier()
+    notification_dispatcher.start()
+    message_writer.start()
+    ingest_queue.start()
     setup_event_handlers(client)
     
     # 2. Start the background task for processing join requests
-    asyncio.create_task(process_join_requests_task(client))
+    background_tasks = [
+        asyncio.create_task(process_join_requests_task(client)),
+        asyncio.create_task(partition_maintenance_task()),
+        asyncio.create_task(archive_task()),
+        asyncio.create_task(stats_flush_task()),
+    ]
     
     ACTIVE_CLIENTS[main_session_name] = client
     logger.info(f"[SUCCESS] Client is running. Listening for messages and processing join requests.")
@@ -70,14 +85,33 @@ async def lifespan(app: FastAPI):
     yield
     
     logger.info("--- Shutting down application lifespan ---")
+    # Stop the periodic loops first: they use the client and the engine torn down below.
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await ingest_queue.stop()
+    await message_writer.stop()
+    try:
+        await match_counter.flush()
+    except Exception as e:
+        # The rest of the shutdown must still run; at most these counts are lost.
+        logger.error(f"[Stats] Flushing match counts on shutdown failed: {e}", exc_info=True)
+    await notification_dispatcher.stop()
+    await close_notifier()
     if client.is_connected():
         await client.disconnect()
         logger.info(f"Client for '{main_session_name}' disconnected.")
+    await async_engine.dispose()
 
 # Create the FastAPI app with the lifespan manager
 app = FastAPI(lifespan=lifespan)
 
 app.include_router(get_routers())
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    """A malformed or foreign ?cursor= is the client's mistake, not a server error."""
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
 # ... (rest of your main.py file is fine) ...
 # app.include_router(onboarding.router, prefix="/api", tags=["Onboarding"])
 
@@ -1,13 +1,97 @@
 # src/app/repo/channel_repo.py
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from ..domain import models, schemas
-from .tag_repo import TagRepo
+from .tag_repo import TagRepo, AsyncTagRepo, has_any_tag, tag_array, tag_dicts
+from .pagination import Keyset, Page, paginate, paginate_async
 from sqlalchemy.orm import selectinload
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, case
+from sqlalchemy.dialects.postgresql import insert
 import uuid
 
+# Alphabetical; backed by ix_channels_name_id.
+CHANNEL_KEYSET = Keyset(models.Channel.name, models.Channel.id)
+
+def channel_columns(prefix: str = "") -> list:
+    """The columns behind schemas.Channel, for projection queries, labelled `prefix` + field name."""
+    channel = models.Channel
+    return [
+        channel.id.label(f"{prefix}id"),
+        channel.telegram_id.label(f"{prefix}telegram_id"),
+        channel.name.label(f"{prefix}name"),
+        channel.username.label(f"{prefix}username"),
+        channel.status.label(f"{prefix}status"),
+        channel.type.label(f"{prefix}type"),
+        tag_array(channel.tag_ids).label(f"{prefix}tags"),
+    ]
+
+def channel_dict(row, prefix: str = "") -> dict:
+    """A row with the channel_columns(prefix) as a schemas.Channel-shaped dict."""
+    values = row._mapping
+    username = values[f"{prefix}username"]
+    return {
+        "id": values[f"{prefix}id"],
+        "telegram_id": values[f"{prefix}telegram_id"],
+        "name": values[f"{prefix}name"],
+        "username": username,
+        "status": values[f"{prefix}status"],
+        "type": values[f"{prefix}type"],
+        # Same as models.Channel.clickable_link.
+        "clickable_link": f"https://t.me/{username}" if username else None,
+        "tags": tag_dicts(values[f"{prefix}tags"]),
+    }
+
+def _channel_list_stmt(filters: schemas.ChannelFilterParams):
+    """The filtered (unordered) channel listing, selecting channel_columns()."""
+    stmt = select(*channel_columns())
+
+    if filters.search:
+        # Search in both name and username
+        search_term = f"%{filters.search}%"
+        stmt = stmt.where(
+            or_(
+                models.Channel.name.ilike(search_term),
+                models.Channel.username.ilike(search_term)
+            )
+        )
+    if filters.tags:
+        stmt = stmt.where(has_any_tag(models.Channel.tag_ids, filters.tags))
+    if filters.channel_id:
+        stmt = stmt.where(models.Channel.id == filters.channel_id)
+    if filters.channel_telegram_id:
+        stmt = stmt.where(models.Channel.telegram_id == filters.channel_telegram_id)
+    if filters.type:
+        stmt = stmt.where(models.Channel.type == filters.type)
+    if filters.status:
+        stmt = stmt.where(models.Channel.status == filters.status)
+    return stmt
+
+def _upsert_channels_stmt(returning=models.Channel):
+    stmt = insert(models.Channel)
+    channel = models.Channel
+    # Only the fields the caller knows overwrite the stored ones.
+    updated = {
+        "name": func.coalesce(stmt.excluded.name, channel.name),
+        "username": func.coalesce(stmt.excluded.username, channel.username),
+        "type": func.coalesce(stmt.excluded.type, channel.type),
+    }
+    changed = or_(*(value.is_distinct_from(getattr(channel, key)) for key, value in updated.items()))
+    return (
+        stmt.on_conflict_do_update(
+            index_elements=[channel.telegram_id],
+            set_={**updated, "updated_at": case((changed, func.now()), else_=channel.updated_at)},
+        )
+        .returning(returning)
+        .execution_options(populate_existing=True)
+    )
+
+def _channel_rows(schemas_: list[schemas.ChannelCreate]) -> list[dict]:
+    # Sorted so concurrent upserts lock rows in the same order.
+    unique = {schema.telegram_id: schema for schema in schemas_}
+    return [unique[telegram_id].model_dump() for telegram_id in sorted(unique)]
+
 class ChannelRepo:
     def __init__(self, session: Session):
         self.session = session
@@ -19,18 +103,17 @@ class ChannelRepo:
         ).scalar_one_or_none()
 
     def get_or_create_channel(self, schema: schemas.ChannelCreate) -> models.Channel:
-        """Finds a channel by telegram_id or creates it."""
-        channel = self.get_channel_by_telegram_id(schema.telegram_id)
-        if channel:
-            # Optionally update name/username if it has changed
-            channel.name = schema.name or channel.name
-            channel.username = schema.username or channel.username
-            channel.type = schema.type or channel.type
-            return channel
-        
-        new_channel = models.Channel(**schema.model_dump())
-        self.session.add(new_channel)
-        return new_channel
+        """Finds a channel by telegram_id or creates it, updating name/username/type if given."""
+        return self.get_or_create_channels([schema])[0]
+
+    def get_or_create_channels(self, channel_schemas: list[schemas.ChannelCreate]) -> list[models.Channel]:
+        """
+        Upserts any number of channels with one INSERT ... ON CONFLICT (telegram_id).
+        Returns one channel per distinct telegram_id, in no particular order.
+        """
+        if not channel_schemas:
+            return []
+        return list(self.session.scalars(_upsert_channels_stmt(), _channel_rows(channel_schemas)))
 
     def add_tags_to_channel(self, channel: models.Channel, tag: models.Tag):
         """
@@ -46,41 +129,25 @@ class ChannelRepo:
         """Gets a single channel by its primary key (UUID)."""
         return self.session.get(models.Channel, channel_id)
 
-    def get_paginated_channels(self, filters: schemas.ChannelFilterParams) -> tuple[int, list[models.Channel]]:
-        """A powerful query method for channels with filtering and pagination."""
-        stmt = (
+    def get_channels_by_ids(self, channel_ids: set[uuid.UUID]) -> list[models.Channel]:
+        if not channel_ids:
+            return []
+        return list(self.session.scalars(
             select(models.Channel)
-            .options(selectinload(models.Channel.tags)) # Eager load tags
-            .order_by(models.Channel.name)
-        )
+            .where(models.Channel.id.in_(channel_ids))
+            .options(selectinload(models.Channel.tags))
+        ).all())
 
-        if filters.search:
-            # Search in both name and username
-            search_term = f"%{filters.search}%"
-            stmt = stmt.where(
-                or_(
-                    models.Channel.name.ilike(search_term),
-                    models.Channel.username.ilike(search_term)
-                )
-            )
-        if filters.tags:
-            stmt = stmt.join(models.Channel.tags).where(models.Tag.name.in_(filters.tags))
-        if filters.channel_id:
-            stmt = stmt.where(models.Channel.id == filters.channel_id)
-        if filters.channel_telegram_id:
-            stmt = stmt.where(models.Channel.telegram_id == filters.channel_telegram_id)
-        if filters.type:
-            stmt = stmt.where(models.Channel.type == filters.type)
-        if filters.status:
-            stmt = stmt.where(models.Channel.status == filters.status)
-            
-
-        total_count = self.session.scalar(select(func.count()).select_from(stmt.subquery()))
-        
-        paginated_stmt = stmt.offset(filters.skip).limit(filters.limit)
-        items = self.session.execute(paginated_stmt).scalars().unique().all()
-        
-        return total_count, items
+    def get_paginated_channels(self, filters: schemas.ChannelFilterParams) -> Page[dict]:
+        """
+        A powerful query method for channels with filtering and pagination, by name.
+        Selects only what schemas.Channel needs and returns the items as dicts of it.
+        """
+        page = paginate(
+            self.session, _channel_list_stmt(filters), CHANNEL_KEYSET, filters.limit, filters.skip, filters.cursor, filters.count, scalars=False
+        )
+        page.items = [channel_dict(row) for row in page.items]
+        return page
 
     def delete_channel(self, channel: models.Channel):
         """
@@ -88,3 +155,80 @@ class ChannelRepo:
         message foreign keys to NULL and cascading deletes to channel_tags.
         """
         self.session.delete(channel)
+
+    def find_existing_usernames(self, usernames: list[str]) -> set[str]:
+        """Returns which of the given usernames (without '@') already belong to a known channel, lowercased."""
+        if not usernames:
+            return set()
+        return set(self.session.scalars(
+            select(func.lower(models.Channel.username))
+            .where(func.lower(models.Channel.username).in_([u.lower() for u in usernames]))
+        ))
+
+
+class AsyncChannelRepo:
+    """
+    Async counterpart of ChannelRepo. Channels are returned with their tags
+    eagerly loaded, since lazy loading is not available on an AsyncSession.
+    """
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.tag_repo = AsyncTagRepo(session)
+
+    async def get_channel_by_telegram_id(self, telegram_id: int) -> models.Channel | None:
+        return (await self.session.execute(
+            select(models.Channel)
+            .where(models.Channel.telegram_id == telegram_id)
+            .options(selectinload(models.Channel.tags))
+        )).scalar_one_or_none()
+
+    async def get_or_create_channel(self, schema: schemas.ChannelCreate) -> models.Channel:
+        """Finds a channel by telegram_id or creates it, updating name/username/type if given."""
+        return (await self.get_or_create_channels([schema]))[0]
+
+    async def get_or_create_channels(self, channel_schemas: list[schemas.ChannelCreate]) -> list[models.Channel]:
+        """See ChannelRepo.get_or_create_channels. The channels come with their tags loaded."""
+        if not channel_schemas:
+            return []
+        # The upsert only returns the IDs; the channels and their tags are then loaded
+        # by a plain SELECT, rather than through eager loading on INSERT ... RETURNING.
+        ids = list(await self.session.scalars(_upsert_channels_stmt(returning=models.Channel.id), _channel_rows(channel_schemas)))
+        return list(await self.session.scalars(
+            select(models.Channel)
+            .where(models.Channel.id.in_(ids))
+            .options(selectinload(models.Channel.tags))
+            .execution_options(populate_existing=True)
+        ))
+
+    async def get_channel_by_id(self, channel_id: uuid.UUID) -> models.Channel | None:
+        """Gets a single channel by its primary key (UUID)."""
+        return await self.session.get(
+            models.Channel, channel_id, options=[selectinload(models.Channel.tags)]
+        )
+
+    async def get_channels_by_ids(self, channel_ids: set[uuid.UUID]) -> list[models.Channel]:
+        if not channel_ids:
+            return []
+        return list(await self.session.scalars(
+            select(models.Channel)
+            .where(models.Channel.id.in_(channel_ids))
+            .options(selectinload(models.Channel.tags))
+        ))
+
+    async def get_paginated_channels(self, filters: schemas.ChannelFilterParams) -> Page[dict]:
+        """See ChannelRepo.get_paginated_channels."""
+        page = await paginate_async(
+            self.session, _channel_list_stmt(filters), CHANNEL_KEYSET, filters.limit,
+            skip=filters.skip, cursor=filters.cursor, count=filters.count, scalars=False,
+        )
+        page.items = [channel_dict(row) for row in page.items]
+        return page
+
+    async def find_existing_usernames(self, usernames: list[str]) -> set[str]:
+        """See ChannelRepo.find_existing_usernames."""
+        if not usernames:
+            return set()
+        return set(await self.session.scalars(
+            select(func.lower(models.Channel.username))
+            .where(func.lower(models.Channel.username).in_([u.lower() for u in usernames]))
+        ))
@@ -1,9 +1,44 @@
 # src/app/repo/join_request_repo.py
 import uuid # <-- Make sure to import uuid
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, and_, or_, func
 from ..domain import models
 
+def identifier_key(identifier: str) -> str:
+    """
+    What two normalized identifiers are compared by: @usernames are case-insensitive
+    on Telegram, invite hashes are not.
+    """
+    return identifier.lower() if identifier.startswith("@") else identifier
+
+
+def _identifier_in(identifiers: list[str]):
+    """Matches requests for any of `identifiers`, compared by identifier_key."""
+    JoinRequest = models.ChannelJoinRequest
+    usernames = [identifier_key(i) for i in identifiers if i.startswith("@")]
+    invites = [i for i in identifiers if not i.startswith("@")]
+    # lower(identifier) is indexed (ix_join_requests_identifier_lower).
+    return or_(func.lower(JoinRequest.identifier).in_(usernames), JoinRequest.identifier.in_(invites))
+
+
+def _existing_in(identifiers: list[str], stored: set[str]) -> set[str]:
+    """The given identifiers that one of the `stored` ones matches by identifier_key."""
+    stored_keys = {identifier_key(identifier) for identifier in stored}
+    return {identifier for identifier in identifiers if identifier_key(identifier) in stored_keys}
+
+
+def _held_under(request_id: uuid.UUID, lease: datetime):
+    """Matches the request only while it is still PROCESSING under the given lease."""
+    JoinRequest = models.ChannelJoinRequest
+    return and_(
+        JoinRequest.id == request_id,
+        JoinRequest.status == models.JoinRequestStatus.PROCESSING,
+        JoinRequest.locked_until == lease,
+    )
+
+
 class JoinRequestRepo:
     def __init__(self, session: Session):
         self.session = session
@@ -38,27 +73,199 @@ class JoinRequestRepo:
         """
         return self.session.execute(
             select(models.ChannelJoinRequest)
-            .where(models.ChannelJoinRequest.identifier == normalized_identifier)
+            .where(_identifier_in([normalized_identifier]))
             # --- THIS IS THE FIX ---
             # The status must be IN the list of non-failed statuses.
             # This prevents creating a new request if one is already pending OR successful.
             .where(models.ChannelJoinRequest.status.in_([
                 models.JoinRequestStatus.PENDING,
+                models.JoinRequestStatus.PROCESSING,
                 models.JoinRequestStatus.SUCCESS
             ]))
+            .limit(1)
         ).scalar_one_or_none()
 
     
-    # We'll need these methods for the listener later
-    def get_one_pending_request(self) -> models.ChannelJoinRequest | None:
-        return self.session.execute(
+    def find_existing_identifiers(self, identifiers: list[str]) -> set[str]:
+        """
+        The set-based form of get_existing_request: returns which of the given
+        normalized identifiers already have a pending, processing or successful request,
+        comparing @usernames case-insensitively.
+        """
+        if not identifiers:
+            return set()
+        return _existing_in(identifiers, set(self.session.scalars(
+            select(models.ChannelJoinRequest.identifier)
+            .where(_identifier_in(identifiers))
+            .where(models.ChannelJoinRequest.status.in_([
+                models.JoinRequestStatus.PENDING,
+                models.JoinRequestStatus.PROCESSING,
+                models.JoinRequestStatus.SUCCESS
+            ]))
+            .distinct()
+        )))
+
+    def bulk_create_requests(self, identifiers: list[str], tags: list[str], user_id: uuid.UUID) -> int:
+        """Inserts one pending request per identifier in a single statement. Returns the number inserted."""
+        if not identifiers:
+            return 0
+        self.session.execute(
+            insert(models.ChannelJoinRequest),
+            [
+                {"identifier": identifier, "tags": tags, "requested_by_user_id": user_id}
+                for identifier in identifiers
+            ],
+        )
+        return len(identifiers)
+
+
+class AsyncJoinRequestRepo:
+    """Async counterpart of JoinRequestRepo, for the join processor and the API."""
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create_request(self, identifier: str, tags: list[str], user_id: uuid.UUID) -> tuple[models.ChannelJoinRequest | None, bool]:
+        """See JoinRequestRepo.create_request."""
+        existing_request = await self.get_existing_request(identifier)
+        if existing_request:
+            return existing_request, False
+
+        new_req = models.ChannelJoinRequest(
+            identifier=identifier,
+            tags=tags,
+            requested_by_user_id=user_id
+        )
+        self.session.add(new_req)
+        return new_req, True
+
+    async def get_existing_request(self, normalized_identifier: str) -> models.ChannelJoinRequest | None:
+        """See JoinRequestRepo.get_existing_request."""
+        return (await self.session.execute(
             select(models.ChannelJoinRequest)
-            .where(models.ChannelJoinRequest.status == models.JoinRequestStatus.PENDING)
+            .where(_identifier_in([normalized_identifier]))
+            .where(models.ChannelJoinRequest.status.in_([
+                models.JoinRequestStatus.PENDING,
+                models.JoinRequestStatus.PROCESSING,
+                models.JoinRequestStatus.SUCCESS
+            ]))
             .limit(1)
-        ).scalar_one_or_none()
+        )).scalar_one_or_none()
+
+    async def find_existing_identifiers(self, identifiers: list[str]) -> set[str]:
+        """See JoinRequestRepo.find_existing_identifiers."""
+        if not identifiers:
+            return set()
+        return _existing_in(identifiers, set(await self.session.scalars(
+            select(models.ChannelJoinRequest.identifier)
+            .where(_identifier_in(identifiers))
+            .where(models.ChannelJoinRequest.status.in_([
+                models.JoinRequestStatus.PENDING,
+                models.JoinRequestStatus.PROCESSING,
+                models.JoinRequestStatus.SUCCESS
+            ]))
+            .distinct()
+        )))
 
-    def update_request_status(self, request_id: uuid.UUID, status: models.JoinRequestStatus):
-        # This method needs to be implemented to update the status
-        request = self.session.get(models.ChannelJoinRequest, request_id)
-        if request:
-            request.status = status
\ No newline at end of file
+    async def bulk_create_requests(self, identifiers: list[str], tags: list[str], user_id: uuid.UUID) -> int:
+        """See JoinRequestRepo.bulk_create_requests."""
+        if not identifiers:
+            return 0
+        await self.session.execute(
+            insert(models.ChannelJoinRequest),
+            [
+                {"identifier": identifier, "tags": tags, "requested_by_user_id": user_id}
+                for identifier in identifiers
+            ],
+        )
+        return len(identifiers)
+
+    async def claim_request(self, lease_seconds: int) -> models.ChannelJoinRequest | None:
+        """
+        Leases the oldest claimable request to the caller and marks it PROCESSING.
+        Claimable are PENDING requests not held back by a retry delay, and PROCESSING
+        ones whose lease has expired; in both cases `locked_until` has passed or is unset.
+        Rows another worker is claiming right now are skipped, so concurrent callers
+        never get the same request.
+
+        The returned request's `locked_until` identifies this claim: pass it as
+        `lease` to update_request_status / release_request.
+        """
+        JoinRequest = models.ChannelJoinRequest
+        claimable = (
+            select(JoinRequest.id)
+            .where(JoinRequest.status.in_([
+                models.JoinRequestStatus.PENDING,
+                models.JoinRequestStatus.PROCESSING,
+            ]))
+            .where(or_(JoinRequest.locked_until.is_(None), JoinRequest.locked_until < func.now()))
+            .order_by(JoinRequest.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.scalars(
+            update(JoinRequest)
+            .where(JoinRequest.id.in_(claimable.scalar_subquery()))
+            .values(
+                status=models.JoinRequestStatus.PROCESSING,
+                locked_until=func.now() + timedelta(seconds=lease_seconds),
+            )
+            .returning(JoinRequest),
+            execution_options={"synchronize_session": False},
+        )
+        return result.first()
+
+    async def update_request_status(self, request_id: uuid.UUID, status: models.JoinRequestStatus, lease: datetime) -> bool:
+        """
+        Records the final status of a claimed request. Only the holder of the current
+        lease may do so: returns False, changing nothing, if the lease expired and
+        the request was claimed again or handed back in the meantime.
+        """
+        result = await self.session.execute(
+            update(models.ChannelJoinRequest)
+            .where(_held_under(request_id, lease))
+            .values(status=status, locked_until=None)
+        )
+        return result.rowcount > 0
+
+    async def release_request(self, request_id: uuid.UUID, lease: datetime, delay_seconds: float = 0) -> bool:
+        """
+        Hands a claimed request back to the queue, e.g. when the worker has to back off.
+        With a delay, no worker claims it again until that many seconds have passed.
+        Like update_request_status, returns False if the lease is no longer held.
+        """
+        result = await self.session.execute(
+            update(models.ChannelJoinRequest)
+            .where(_held_under(request_id, lease))
+            .values(
+                status=models.JoinRequestStatus.PENDING,
+                locked_until=func.now() + timedelta(seconds=delay_seconds) if delay_seconds else None,
+            )
+        )
+        return result.rowcount > 0
+
+    async def seconds_until_next_claimable(self) -> float | None:
+        """How long until the earliest held-back or leased request can be claimed; None if there is none."""
+        JoinRequest = models.ChannelJoinRequest
+        return (await self.session.execute(
+            select(func.extract("epoch", func.min(JoinRequest.locked_until) - func.now()))
+            .where(JoinRequest.status.in_([
+                models.JoinRequestStatus.PENDING,
+                models.JoinRequestStatus.PROCESSING,
+            ]))
+        )).scalar_one_or_none()
+
+    async def count_open_requests(self) -> tuple[int, int]:
+        """Returns the number of open (pending or processing) public-username requests and invite-link requests."""
+        JoinRequest = models.ChannelJoinRequest
+        is_invite = JoinRequest.identifier.startswith("+")
+        public, invites = (await self.session.execute(
+            select(
+                func.count().filter(~is_invite),
+                func.count().filter(is_invite),
+            )
+            .where(JoinRequest.status.in_([
+                models.JoinRequestStatus.PENDING,
+                models.JoinRequestStatus.PROCESSING,
+            ]))
+        )).one()
+        return public, invites
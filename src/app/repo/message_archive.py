@@ -0,0 +1,379 @@
+# src/app/repo/message_archive.py
+
+import datetime
+import logging
+import os
+import re
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from app.config.config import settings
+from app.core.months import add_months
+from ..domain import models, schemas
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("telegram_message_id", pa.int64()),
+    ("channel_id", pa.string()),
+    ("channel_telegram_id", pa.int64()),
+    ("content", pa.string()),
+    ("sent_at", pa.timestamp("us", tz="UTC")),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+    ("tags", pa.list_(pa.struct([("id", pa.string()), ("name", pa.string())]))),
+])
+
+_MONTH_DIR = re.compile(r"month=(\d{4})-(\d{2})")
+
+
+@dataclass
+class ArchivedMessage:
+    """A message read back from the archive. Shaped like models.Message for schemas.MessageResponse."""
+    id: uuid.UUID
+    telegram_message_id: int
+    channel_id: uuid.UUID | None
+    channel_telegram_id: int
+    content: str | None
+    sent_at: datetime.datetime
+    tags: list[schemas.Tag] = field(default_factory=list)
+    channel: models.Channel | None = None
+
+    clickable_link = models.Message.clickable_link
+
+
+@dataclass
+class ArchiveMatches:
+    total: int
+    items: list[ArchivedMessage]
+
+
+class MessageArchive:
+    """
+    Old messages in zstd-compressed Parquet files, one directory per month:
+
+        <root>/messages/month=2025-03/part-20250301T000000-20250315T000000.parquet
+
+    Each file is sorted by (channel_telegram_id, sent_at) and written in row groups
+    of ARCHIVE_BATCH_SIZE, so the min/max statistics Parquet keeps per row group
+    work as an index on both columns. Files are read memory-mapped.
+
+    A file stays "pending" (an empty .pending marker next to it) until its rows
+    have been deleted from Postgres; see app/services/archive_service.py.
+    """
+    def __init__(self, root: Path):
+        self.root = root / "messages"
+
+    # --- Writing ---
+
+    def write(self, start: datetime.datetime, end: datetime.datetime, batches: Iterable[list[dict]]) -> Path | None:
+        """
+        Writes the messages with start <= sent_at < end, given as batches of row
+        dicts, to a new pending file. Returns its path, or None if there were no rows.
+        """
+        month_dir = self.root / f"month={start:%Y-%m}"
+        stem = f"part-{start:%Y%m%dT%H%M%S}-{end:%Y%m%dT%H%M%S}"
+        path, attempt = month_dir / f"{stem}.parquet", 1
+        while path.exists():
+            # Late-arriving messages archived again with the same cutoff.
+            attempt += 1
+            path = month_dir / f"{stem}-{attempt}.parquet"
+        tmp_path = path.with_suffix(".parquet.tmp")
+        month_dir.mkdir(parents=True, exist_ok=True)
+
+        rows = 0
+        writer = None
+        try:
+            try:
+                for batch in batches:
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_path, ARCHIVE_SCHEMA, compression="zstd")
+                    writer.write_table(pa.Table.from_pylist([_arrow_row(row) for row in batch], schema=ARCHIVE_SCHEMA))
+                    rows += len(batch)
+            finally:
+                if writer is not None:
+                    writer.close()
+            if not rows:
+                return None
+
+            with open(tmp_path, "rb") as f:
+                os.fsync(f.fileno())
+            # The marker goes first: a visible file is never mistaken for a finished one.
+            # A crash before the rename leaves a marker without a file; see pending_files.
+            self._pending_marker(path).touch()
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        logger.info(f"[Archive] Wrote {rows} messages to {path}.")
+        return path
+
+    def pending_files(self) -> list[Path]:
+        """
+        Files whose rows may still be in Postgres. A marker whose file was never
+        renamed into place is dropped: its rows were not deleted, so the next run
+        archives them again.
+        """
+        pending = []
+        for marker in self.root.glob("month=*/*.parquet.pending"):
+            path = marker.with_suffix("")
+            if path.exists():
+                pending.append(path)
+            else:
+                logger.warning(f"[Archive] Removing pending marker without a file: {marker}")
+                marker.unlink(missing_ok=True)
+        return sorted(pending)
+
+    def mark_done(self, path: Path):
+        self._pending_marker(path).unlink(missing_ok=True)
+
+    def id_chunks(self, path: Path) -> Iterator[tuple[list[uuid.UUID], datetime.datetime, datetime.datetime]]:
+        """Per row group of `path`: the message IDs and the min/max sent_at among them."""
+        parquet = pq.ParquetFile(pa.memory_map(str(path)))
+        for i in range(parquet.num_row_groups):
+            group = parquet.read_row_group(i, columns=["id", "sent_at"])
+            bounds = pc.min_max(group["sent_at"])
+            ids = [uuid.UUID(value) for value in group["id"].to_pylist()]
+            yield ids, bounds["min"].as_py(), bounds["max"].as_py()
+
+    @staticmethod
+    def _pending_marker(path: Path) -> Path:
+        return path.with_suffix(".parquet.pending")
+
+    # --- Reading ---
+
+    def months(self) -> list[datetime.date]:
+        """The first day of every month that has archived messages."""
+        months = []
+        for month_dir in self.root.glob("month=*"):
+            match = _MONTH_DIR.fullmatch(month_dir.name)
+            if match and any(month_dir.glob("*.parquet")):
+                months.append(datetime.date(int(match[1]), int(match[2]), 1))
+        return sorted(months)
+
+    def overlaps(self, start_date: datetime.date | None, end_date: datetime.date | None) -> bool:
+        """
+        True if the date range touches an archived month. An unbounded listing
+        (no dates at all) never does: the archive is only searched on request.
+        """
+        if start_date is None and end_date is None:
+            return False
+        for month in self.months():
+            if (end_date is None or month <= end_date) and (start_date is None or start_date < add_months(month, 1)):
+                return True
+        return False
+
+    def find_messages(self, filters: schemas.MessageFilterParams, cursor: tuple | None, limit: int) -> ArchiveMatches:
+        """
+        The archived messages matching `filters`, newest first: up to `limit` of them
+        after the (sent_at, id) `cursor`, and their total as `filters.count` asks for
+        (None with "none"). Text search is a plain case-insensitive match (every word
+        for web/prefix, the whole text for phrase/substring); archived messages have
+        no tsvector.
+
+        Row groups are visited newest first by their sent_at statistics, and only
+        until no remaining group can hold a row of the page. Counting reads just the
+        filtered columns, and none at all for a group that lies entirely inside the
+        filters; "estimated" counts every group the statistics cannot rule out.
+        """
+        start = _utc_midnight(filters.start_date) if filters.start_date else None
+        end = _utc_midnight(filters.end_date + datetime.timedelta(days=1)) if filters.end_date else None
+        groups = self._row_groups(start, end, filters.channel_telegram_id)
+
+        page = None
+        for group in sorted(groups, key=lambda group: group.max_sent_at, reverse=True):
+            if cursor and group.min_sent_at > cursor[0]:
+                continue  # Everything in it comes before the cursor.
+            if page is not None and page.num_rows >= limit and group.max_sent_at < page["sent_at"][-1].as_py():
+                break  # This and every later group is older than the whole page.
+            table = group.read(_ROW_COLUMNS)
+            mask = _and(_filter_mask(table, filters, start, end), _after_cursor(table, cursor))
+            if mask is not None:
+                table = table.filter(mask)
+            page = table if page is None else pa.concat_tables([page, table])
+            page = page.sort_by([("sent_at", "descending"), ("id", "descending")]).slice(0, limit)
+
+        items = [_archived_message(row) for row in page.to_pylist()] if page is not None else []
+        return ArchiveMatches(total=_count(groups, filters, start, end), items=items)
+
+    def _row_groups(self, start: datetime.datetime | None, end: datetime.datetime | None, channel_telegram_id: int | None) -> list["_RowGroup"]:
+        """The row groups whose statistics do not rule out the sent_at range and channel."""
+        groups = []
+        for month in self.months():
+            if (end and month >= end.date()) or (start and add_months(month, 1) <= start.date()):
+                continue
+            for path in sorted((self.root / f"month={month:%Y-%m}").glob("*.parquet")):
+                parquet = pq.ParquetFile(path, memory_map=True)
+                for i in range(parquet.num_row_groups):
+                    group = _RowGroup.of(parquet, i)
+                    if (end and group.min_sent_at >= end) or (start and group.max_sent_at < start):
+                        continue
+                    if channel_telegram_id and not group.min_channel <= channel_telegram_id <= group.max_channel:
+                        continue
+                    groups.append(group)
+        return groups
+
+
+# Everything an ArchivedMessage is built from.
+_ROW_COLUMNS = [name for name in ARCHIVE_SCHEMA.names if name != "created_at"]
+# What a count needs when only the sent_at range and channel_telegram_id are filtered.
+_RANGE_COLUMNS = ["sent_at", "channel_telegram_id"]
+
+_NO_MIN = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+_NO_MAX = datetime.datetime.max.replace(tzinfo=datetime.timezone.utc)
+
+
+@dataclass
+class _RowGroup:
+    """One row group of an archive file, with the statistics it is pruned and ordered by."""
+    parquet: pq.ParquetFile
+    index: int
+    num_rows: int
+    min_sent_at: datetime.datetime
+    max_sent_at: datetime.datetime
+    min_channel: float
+    max_channel: float
+
+    @classmethod
+    def of(cls, parquet: pq.ParquetFile, index: int) -> "_RowGroup":
+        metadata = parquet.metadata.row_group(index)
+        stats = {}
+        for i in range(metadata.num_columns):
+            column = metadata.column(i)
+            if column.statistics is not None and column.statistics.has_min_max:
+                stats[column.path_in_schema] = column.statistics
+        # Without statistics a group is assumed to hold anything.
+        sent_at, channel = stats.get("sent_at"), stats.get("channel_telegram_id")
+        return cls(
+            parquet=parquet,
+            index=index,
+            num_rows=metadata.num_rows,
+            min_sent_at=sent_at.min if sent_at else _NO_MIN,
+            max_sent_at=sent_at.max if sent_at else _NO_MAX,
+            min_channel=channel.min if channel else float("-inf"),
+            max_channel=channel.max if channel else float("inf"),
+        )
+
+    def read(self, columns: list[str]) -> pa.Table:
+        return self.parquet.read_row_group(self.index, columns=columns)
+
+    def within(self, start: datetime.datetime | None, end: datetime.datetime | None, channel_telegram_id: int | None) -> bool:
+        """True if every row of the group is inside the sent_at range and channel."""
+        return (
+            (start is None or self.min_sent_at >= start)
+            and (end is None or self.max_sent_at < end)
+            and (not channel_telegram_id or self.min_channel == self.max_channel == channel_telegram_id)
+        )
+
+
+def _count(groups: list[_RowGroup], filters: schemas.MessageFilterParams, start: datetime.datetime | None, end: datetime.datetime | None) -> int | None:
+    if filters.count == schemas.CountStrategy.NONE:
+        return None
+    columns = _filter_columns(filters)
+    total = 0
+    for group in groups:
+        if filters.count == schemas.CountStrategy.ESTIMATED or (columns == _RANGE_COLUMNS and group.within(start, end, filters.channel_telegram_id)):
+            total += group.num_rows
+            continue
+        table = group.read(columns)
+        mask = _filter_mask(table, filters, start, end)
+        total += table.num_rows if mask is None else table.filter(mask).num_rows
+    return total
+
+
+def _filter_columns(filters: schemas.MessageFilterParams) -> list[str]:
+    """The columns _filter_mask needs for `filters`."""
+    columns = list(_RANGE_COLUMNS)
+    if filters.search:
+        columns.append("content")
+    if filters.channel_id:
+        columns.append("channel_id")
+    if filters.message_id:
+        columns.append("id")
+    if filters.tags:
+        columns.append("tags")
+    return columns
+
+
+def _after_cursor(table: pa.Table, cursor: tuple | None):
+    if not cursor:
+        return None
+    sent_at, message_id = pa.scalar(cursor[0], ARCHIVE_SCHEMA.field("sent_at").type), str(cursor[1])
+    return pc.or_(
+        pc.less(table["sent_at"], sent_at),
+        pc.and_(pc.equal(table["sent_at"], sent_at), pc.less(table["id"], message_id)),
+    )
+
+
+def _filter_mask(table: pa.Table, filters: schemas.MessageFilterParams, start: datetime.datetime | None, end: datetime.datetime | None):
+    sent_at_type = ARCHIVE_SCHEMA.field("sent_at").type
+    conditions = []
+    if start:
+        conditions.append(pc.greater_equal(table["sent_at"], pa.scalar(start, sent_at_type)))
+    if end:
+        conditions.append(pc.less(table["sent_at"], pa.scalar(end, sent_at_type)))
+    if filters.channel_telegram_id:
+        conditions.append(pc.equal(table["channel_telegram_id"], filters.channel_telegram_id))
+    if filters.search:
+        if filters.search_mode in (schemas.SearchMode.WEB, schemas.SearchMode.PREFIX):
+            terms = re.findall(r"\w+", filters.search) or [filters.search]
+        else:
+            terms = [filters.search]
+        conditions += [pc.match_substring(table["content"], term, ignore_case=True) for term in terms]
+    if filters.channel_id:
+        conditions.append(pc.equal(table["channel_id"], str(filters.channel_id)))
+    if filters.message_id:
+        conditions.append(pc.equal(table["id"], str(filters.message_id)))
+    if filters.tags:
+        # Rows with at least one of the tags, like the EXISTS in MessageRepo.
+        names = pc.struct_field(pc.list_flatten(table["tags"]), "name")
+        parents = pc.list_parent_indices(table["tags"])
+        tagged = pc.unique(pc.filter(parents, pc.is_in(names, value_set=pa.array(filters.tags))))
+        conditions.append(pc.is_in(pa.array(range(table.num_rows), pa.int64()), value_set=tagged.cast(pa.int64())))
+
+    return _and(*conditions)
+
+
+def _and(*conditions):
+    """Combines boolean arrays, treating null as false. None (no condition) is skipped."""
+    mask = None
+    for condition in conditions:
+        if condition is None:
+            continue
+        condition = pc.fill_null(condition, False)
+        mask = condition if mask is None else pc.and_(mask, condition)
+    return mask
+
+
+def _arrow_row(row: dict) -> dict:
+    return {
+        **row,
+        "id": str(row["id"]),
+        "channel_id": str(row["channel_id"]) if row["channel_id"] else None,
+        "tags": [{"id": str(tag["id"]), "name": tag["name"]} for tag in row["tags"] or []],
+    }
+
+
+def _archived_message(row: dict) -> ArchivedMessage:
+    return ArchivedMessage(
+        id=uuid.UUID(row["id"]),
+        telegram_message_id=row["telegram_message_id"],
+        channel_id=uuid.UUID(row["channel_id"]) if row["channel_id"] else None,
+        channel_telegram_id=row["channel_telegram_id"],
+        content=row["content"],
+        sent_at=row["sent_at"],
+        tags=[schemas.Tag(id=uuid.UUID(tag["id"]), name=tag["name"]) for tag in row["tags"]],
+    )
+
+
+def _utc_midnight(day: datetime.date) -> datetime.datetime:
+    return datetime.datetime.combine(day, datetime.time(), tzinfo=datetime.timezone.utc)
+
+
+message_archive = MessageArchive(settings.ARCHIVE_DIR)
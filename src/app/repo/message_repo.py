@@ -1,12 +1,122 @@
 # src/app/repo/message_repo.py
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..domain import models, schemas
-from .channel_repo import ChannelRepo
+from .channel_repo import ChannelRepo, channel_columns, channel_dict
+from .tag_repo import has_any_tag, tag_array, tag_dicts
+from .pagination import Keyset, Page, paginate, paginate_async
 
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, delete, func, literal, any_
+from sqlalchemy.dialects.postgresql import insert, REGCONFIG
 import datetime
+import re
 import uuid
+from typing import Iterator
+
+# Newest first; backed by ix_messages_sent_at_id.
+MESSAGE_KEYSET = Keyset(models.Message.sent_at, models.Message.id, descending=True)
+
+_SEARCH_CONFIG = literal(models.MESSAGE_SEARCH_CONFIG, REGCONFIG)
+_HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=20, MinWords=8, FragmentDelimiter= … "
+
+def _search_query(search: str, mode: schemas.SearchMode):
+    """The tsquery for a full-text search mode, or None for substring search."""
+    if mode == schemas.SearchMode.PHRASE:
+        return func.phraseto_tsquery(_SEARCH_CONFIG, search)
+    if mode == schemas.SearchMode.PREFIX:
+        # \w+ never contains tsquery operators, so the words can be joined as-is.
+        words = re.findall(r"\w+", search)
+        return func.to_tsquery(_SEARCH_CONFIG, " & ".join(f"{word}:*" for word in words))
+    if mode == schemas.SearchMode.WEB:
+        return func.websearch_to_tsquery(_SEARCH_CONFIG, search)
+    return None
+
+# What schemas.MessageResponse needs, channel columns prefixed with "channel_".
+_MESSAGE_LIST_COLUMNS = [
+    models.Message.id,
+    models.Message.telegram_message_id,
+    models.Message.channel_telegram_id,
+    models.Message.content,
+    models.Message.sent_at,
+    tag_array(models.Message.tag_ids).label("tags"),
+    *channel_columns("channel_"),
+]
+
+def _message_dict(row) -> dict:
+    """A row of _MESSAGE_LIST_COLUMNS as a schemas.MessageResponse-shaped dict."""
+    return {
+        "id": row.id,
+        "telegram_message_id": row.telegram_message_id,
+        "content": row.content,
+        "sent_at": row.sent_at,
+        "clickable_link": models.Message.clickable_link.fget(row),
+        "tags": tag_dicts(row.tags),
+        "channel": channel_dict(row, "channel_") if row.channel_id is not None else None,
+    }
+
+def _message_list_stmt(filters: schemas.MessageFilterParams):
+    """
+    The filtered (unordered) message listing, selecting _MESSAGE_LIST_COLUMNS, and the
+    relevance order for ranked searches (None means the keyset order).
+    """
+    stmt = (
+        select(*_MESSAGE_LIST_COLUMNS)
+        .select_from(models.Message)
+        .outerjoin(models.Channel, models.Channel.id == models.Message.channel_id)
+    )
+
+    order_by = None
+    if filters.search:
+        query = _search_query(filters.search, filters.search_mode)
+        if query is None:
+            # Served by ix_messages_content_trgm where pg_trgm is installed.
+            stmt = stmt.where(models.Message.content.ilike(f"%{filters.search}%"))
+        else:
+            stmt = stmt.where(models.Message.search_vector.bool_op("@@")(query))
+            if filters.rank:
+                order_by = [
+                    func.ts_rank_cd(models.Message.search_vector, query).desc(),
+                    *MESSAGE_KEYSET.order_by(),
+                ]
+    if filters.channel_id:
+        stmt = stmt.where(models.Message.channel_id == filters.channel_id)
+    if filters.channel_telegram_id:
+        stmt = stmt.where(models.Message.channel_telegram_id == filters.channel_telegram_id)
+    if filters.message_id:
+        stmt = stmt.where(models.Message.id == filters.message_id)
+    if filters.start_date:
+        stmt = stmt.where(models.Message.sent_at >= filters.start_date)
+    if filters.end_date:
+        stmt = stmt.where(models.Message.sent_at < filters.end_date + datetime.timedelta(days=1))
+    if filters.tags:
+        stmt = stmt.where(has_any_tag(models.Message.tag_ids, filters.tags))
+    return stmt, order_by
+
+def _search_snippets_stmt(message_ids: list[uuid.UUID], query):
+    return select(
+        models.Message.id,
+        func.ts_headline(_SEARCH_CONFIG, func.coalesce(models.Message.content, ""), query, _HEADLINE_OPTIONS),
+    ).where(models.Message.id.in_(message_ids))
+
+def _message_rows(rows: list[tuple[schemas.MessageCreate, uuid.UUID, int]]) -> list[dict]:
+    return [
+        {
+            "telegram_message_id": message_schema.telegram_message_id,
+            "content": message_schema.content,
+            "sent_at": message_schema.sent_at,
+            "channel_id": channel_id,
+            "channel_telegram_id": channel_telegram_id,
+        }
+        for message_schema, channel_id, channel_telegram_id in rows
+    ]
+
+def _bulk_insert_messages_stmt():
+    return (
+        insert(models.Message)
+        .on_conflict_do_nothing(constraint="uq_messages_channel_message")
+        .returning(models.Message)
+    )
+
 
 class MessageRepo:
     def __init__(self, session: Session):
@@ -27,38 +137,81 @@ class MessageRepo:
         self.session.add(new_message)
         return new_message
 
-    def get_paginated_messages(self, filters: schemas.MessageFilterParams) -> tuple[int, list[models.Message]]:
-        """A powerful query method for messages with filtering and pagination."""
+    def bulk_create_messages(self, rows: list[tuple[schemas.MessageCreate, uuid.UUID, int]]) -> list[models.Message]:
+        """
+        Inserts many messages with a single multi-row INSERT ... RETURNING.
+        Each row is (message schema, channel UUID, channel telegram id).
+        Messages that already exist (same chat and message ID) are skipped with
+        ON CONFLICT DO NOTHING, so only the newly inserted rows are returned.
+        """
+        if not rows:
+            return []
+        return self.session.scalars(_bulk_insert_messages_stmt(), _message_rows(rows)).all()
+
+    def get_paginated_messages(self, filters: schemas.MessageFilterParams) -> Page[dict]:
+        """
+        A powerful query method for messages with filtering and pagination, newest first.
+        Selects only what schemas.MessageResponse needs, with the message's and its
+        channel's tags aggregated in SQL, and returns the items as dicts of it.
+        """
+        stmt, order_by = _message_list_stmt(filters)
+        page = paginate(
+            self.session, stmt, MESSAGE_KEYSET, filters.limit, filters.skip, filters.cursor, filters.count, order_by, scalars=False
+        )
+        page.items = [_message_dict(row) for row in page.items]
+        return page
+
+    def get_search_snippets(self, message_ids: list[uuid.UUID], search: str, mode: schemas.SearchMode) -> dict[uuid.UUID, str]:
+        """
+        Highlighted excerpts (ts_headline) of the given messages for a full-text search.
+        Only meant for one page of results: ts_headline re-parses each message's content.
+        """
+        query = _search_query(search, mode)
+        if query is None or not message_ids:
+            return {}
+        return dict(self.session.execute(_search_snippets_stmt(message_ids, query)).all())
+
+    def get_oldest_sent_at(self) -> datetime.datetime | None:
+        return self.session.scalar(select(func.min(models.Message.sent_at)))
+
+    def stream_for_archive(self, start: datetime.datetime, end: datetime.datetime, batch_size: int) -> Iterator[list[dict]]:
+        """
+        Yields the messages with start <= sent_at < end as plain row dicts (tags as a
+        list of {id, name}), in batches, ordered by (channel_telegram_id, sent_at).
+        The rows come through a server-side cursor, so memory use stays at one batch.
+        """
+        tags = (
+            select(func.json_agg(func.json_build_object("id", models.Tag.id, "name", models.Tag.name)))
+            .where(models.Tag.id == any_(models.Message.tag_ids))
+            .scalar_subquery()
+        )
         stmt = (
-            select(models.Message)
-            .options(
-                selectinload(models.Message.channel), # Eager load channel
-                selectinload(models.Message.tags)     # Eager load tags
+            select(
+                models.Message.id,
+                models.Message.telegram_message_id,
+                models.Message.channel_id,
+                models.Message.channel_telegram_id,
+                models.Message.content,
+                models.Message.sent_at,
+                models.Message.created_at,
+                tags.label("tags"),
             )
-            .order_by(models.Message.sent_at.desc())
+            .where(models.Message.sent_at >= start, models.Message.sent_at < end)
+            .order_by(models.Message.channel_telegram_id, models.Message.sent_at, models.Message.id)
+            .execution_options(yield_per=batch_size)
         )
+        for rows in self.session.execute(stmt).mappings().partitions():
+            yield [dict(row) for row in rows]
 
-        if filters.search:
-            stmt = stmt.where(models.Message.content.ilike(f"%{filters.search}%"))
-        if filters.channel_id:
-            stmt = stmt.where(models.Message.channel_id == filters.channel_id)
-        if filters.channel_telegram_id:
-            stmt = stmt.where(models.Message.channel_telegram_id == filters.channel_telegram_id)
-        if filters.message_id:
-            stmt = stmt.where(models.Message.id == filters.message_id)
-        if filters.start_date:
-            stmt = stmt.where(models.Message.sent_at >= filters.start_date)
-        if filters.end_date:
-            stmt = stmt.where(models.Message.sent_at < filters.end_date + datetime.timedelta(days=1))
-        if filters.tags:
-            stmt = stmt.join(models.Message.tags).where(models.Tag.name.in_(filters.tags))
-
-        total_count = self.session.scalar(select(func.count()).select_from(stmt.subquery()))
-        
-        paginated_stmt = stmt.offset(filters.skip).limit(filters.limit)
-        items = self.session.execute(paginated_stmt).scalars().unique().all()
-        
-        return total_count, items
+    def delete_messages(self, message_ids: list[uuid.UUID], sent_from: datetime.datetime, sent_to: datetime.datetime) -> int:
+        """Deletes messages by ID. The sent_at bounds (inclusive) only let Postgres prune partitions."""
+        result = self.session.execute(
+            delete(models.Message)
+            .where(models.Message.id.in_(message_ids))
+            .where(models.Message.sent_at >= sent_from, models.Message.sent_at <= sent_to)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
 
     def get_message_by_id(self, message_id: uuid.UUID) -> models.Message | None:
         return self.session.get(models.Message, message_id)
@@ -71,3 +224,47 @@ class MessageRepo:
         self.session.delete(message)
 
 
+class AsyncMessageRepo:
+    """Async counterpart of MessageRepo for the ingest path."""
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def bulk_create_messages(self, rows: list[tuple[schemas.MessageCreate, uuid.UUID, int]]) -> list[models.Message]:
+        """See MessageRepo.bulk_create_messages."""
+        if not rows:
+            return []
+        return (await self.session.scalars(_bulk_insert_messages_stmt(), _message_rows(rows))).all()
+
+    async def get_paginated_messages(self, filters: schemas.MessageFilterParams) -> Page[dict]:
+        """See MessageRepo.get_paginated_messages."""
+        stmt, order_by = _message_list_stmt(filters)
+        page = await paginate_async(
+            self.session, stmt, MESSAGE_KEYSET, filters.limit,
+            skip=filters.skip, cursor=filters.cursor, count=filters.count, order_by=order_by, scalars=False,
+        )
+        page.items = [_message_dict(row) for row in page.items]
+        return page
+
+    async def get_search_snippets(self, message_ids: list[uuid.UUID], search: str, mode: schemas.SearchMode) -> dict[uuid.UUID, str]:
+        """See MessageRepo.get_search_snippets."""
+        query = _search_query(search, mode)
+        if query is None or not message_ids:
+            return {}
+        return dict((await self.session.execute(_search_snippets_stmt(message_ids, query))).all())
+
+    async def get_message_by_id(self, message_id: uuid.UUID) -> models.Message | None:
+        """A message with its tags, channel and channel tags loaded, as schemas.MessageResponse needs."""
+        return await self.session.get(
+            models.Message, message_id,
+            options=[selectinload(models.Message.tags), selectinload(models.Message.channel).selectinload(models.Channel.tags)],
+        )
+
+    async def delete_message_by_id(self, message_id: uuid.UUID) -> bool:
+        """
+        Permanently deletes a message with one DELETE; the DB's ON DELETE CASCADE
+        removes its tag links. Returns False if there was no such message.
+        """
+        result = await self.session.execute(
+            delete(models.Message).where(models.Message.id == message_id).execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
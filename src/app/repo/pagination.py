@@ -0,0 +1,214 @@
+# src/app/repo/pagination.py
+
+import base64
+import binascii
+import datetime
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from sqlalchemy import Select, String, Table, and_, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.config.config import settings
+from app.core.cache import LRUCache
+from ..domain.schemas import CountStrategy
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# (compiled count SQL, params) -> (expires_at, total), for CountStrategy.CACHED.
+_count_cache: LRUCache[tuple, tuple[float, int]] = LRUCache(maxsize=settings.COUNT_CACHE_SIZE)
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by this keyset (or was tampered with)."""
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of results. `next_cursor` is None on the last page."""
+    total: int | None
+    items: list[T]
+    next_cursor: str | None = None
+    total_strategy: CountStrategy = CountStrategy.EXACT
+
+
+class Keyset:
+    """
+    A unique sort order that can be resumed from its last row, e.g. (sent_at, id).
+
+    `after` filters with a row-value comparison, `(a, b) < (:a, :b)`, which Postgres
+    answers from a composite index on the same columns, so page N costs the same
+    as page 1. Nullable string columns are compared as '' so the row comparison
+    never meets a NULL; their indexes are built on the same coalesce() expression.
+    """
+    def __init__(self, *columns: InstrumentedAttribute, descending: bool = False):
+        self.columns = columns
+        self.descending = descending
+        self._exprs = [
+            func.coalesce(col, "") if col.nullable and isinstance(col.type, String) else col
+            for col in (c.property.columns[0] for c in columns)
+        ]
+
+    def order_by(self) -> list:
+        return [e.desc() if self.descending else e.asc() for e in self._exprs]
+
+    def after(self, cursor: str):
+        """The WHERE clause for the rows that follow `cursor` in this order."""
+        values = self.decode(cursor)
+        row, last = tuple_(*self._exprs), tuple_(*values)
+        if self.descending:
+            # The bound on the leading column is implied by the row comparison, but
+            # only a plain comparison lets Postgres prune partitions (messages.sent_at).
+            return and_(row < last, self._exprs[0] <= values[0])
+        return and_(row > last, self._exprs[0] >= values[0])
+
+    def encode(self, item) -> str:
+        values = []
+        for column in self.columns:
+            value = getattr(item, column.key)
+            if isinstance(value, (datetime.datetime, uuid.UUID)):
+                value = str(value) if isinstance(value, uuid.UUID) else value.isoformat()
+            values.append("" if value is None else value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> list:
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            if not isinstance(raw, list) or len(raw) != len(self.columns):
+                raise InvalidCursor("Cursor does not match this listing.")
+            return [self._parse(column, value) for column, value in zip(self.columns, raw)]
+        except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, TypeError, ValueError) as e:
+            raise InvalidCursor(f"Invalid cursor: {e}") from e
+
+    @staticmethod
+    def _parse(column: InstrumentedAttribute, value):
+        python_type = column.type.python_type
+        if python_type is datetime.datetime:
+            return datetime.datetime.fromisoformat(value)
+        if python_type is uuid.UUID:
+            return uuid.UUID(value)
+        if not isinstance(value, python_type):
+            raise InvalidCursor(f"Cursor value for '{column.key}' has the wrong type.")
+        return value
+
+
+def paginate(
+    session: Session,
+    stmt: Select,
+    keyset: Keyset,
+    limit: int,
+    skip: int = 0,
+    cursor: str | None = None,
+    count: CountStrategy = CountStrategy.EXACT,
+    order_by: list | None = None,
+    scalars: bool = True,
+) -> Page:
+    """
+    Runs `stmt` (filters applied, no ORDER BY/LIMIT) for one page.
+    With a cursor the page starts right after it and `skip` is ignored; without
+    one this is the classic OFFSET page. Either way the result carries the cursor
+    for the following page. `count` picks how the total is obtained.
+
+    `order_by` replaces the keyset order with one that cannot be resumed from a
+    row (e.g. search relevance); such pages are only reachable with `skip`.
+
+    With scalars=False the items are the result rows themselves, for statements
+    that select columns rather than an entity.
+    """
+    if order_by is not None and cursor:
+        raise InvalidCursor("Cursors are not supported with this ordering, use skip.")
+
+    total, total_strategy = count_rows(session, stmt, count)
+
+    stmt = stmt.order_by(*(keyset.order_by() if order_by is None else order_by))
+    if cursor:
+        stmt = stmt.where(keyset.after(cursor))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    # One extra row tells us whether there is a next page.
+    result = session.execute(stmt.limit(limit + 1))
+    items = list(result.scalars().unique().all() if scalars else result.all())
+    has_more = len(items) > limit
+    next_cursor = keyset.encode(items[limit - 1]) if has_more and order_by is None else None
+    return Page(total=total, items=items[:limit], next_cursor=next_cursor, total_strategy=total_strategy)
+
+
+async def paginate_async(session: AsyncSession, stmt: Select, keyset: Keyset, limit: int, **kwargs) -> Page:
+    """
+    paginate() for an AsyncSession, with the same keyword arguments. It runs the
+    same code through run_sync, where each query is awaited on the event loop.
+    """
+    return await session.run_sync(lambda sync_session: paginate(sync_session, stmt, keyset, limit, **kwargs))
+
+
+def count_rows(session: Session, stmt: Select, strategy: CountStrategy) -> tuple[int | None, CountStrategy]:
+    """Returns the number of rows `stmt` matches, and the strategy that actually produced it."""
+    if strategy == CountStrategy.NONE:
+        return None, strategy
+
+    if strategy == CountStrategy.ESTIMATED:
+        estimate = _estimate_rows(session, stmt)
+        if estimate is not None:
+            return estimate, strategy
+
+    count_stmt = select_count(stmt)
+    if strategy == CountStrategy.CACHED:
+        # The compiled SQL plus its parameters is the normalized filter key.
+        compiled = count_stmt.compile(session.get_bind(), compile_kwargs={"render_postcompile": True})
+        key = (str(compiled), tuple(sorted((k, repr(v)) for k, v in compiled.params.items())))
+        hit = _count_cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            return hit[1], strategy
+        total = session.scalar(count_stmt)
+        _count_cache.set(key, (time.monotonic() + settings.COUNT_CACHE_TTL_SECONDS, total))
+        return total, CountStrategy.EXACT
+
+    return session.scalar(count_stmt), CountStrategy.EXACT
+
+
+def _estimate_rows(session: Session, stmt: Select) -> int | None:
+    """
+    The planner's idea of how many rows `stmt` returns. For an unfiltered listing
+    that is the table statistics (pg_class.reltuples); otherwise the top "Plan Rows"
+    of EXPLAIN. None if Postgres has no statistics for the table yet.
+    """
+    froms = stmt.get_final_froms()
+    if stmt.whereclause is None and len(froms) == 1 and isinstance(froms[0], Table):
+        reltuples = session.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": froms[0].name},
+        )
+        # -1 (or 0 before the first ANALYZE) means "never analyzed".
+        return reltuples if reltuples and reltuples > 0 else None
+
+    plan = session.connection().execute(_Explain(stmt)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, compiled and bound like the statement itself."""
+    inherit_cache = False
+
+    def __init__(self, stmt: Select):
+        self.stmt = stmt
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.stmt, **kw)}"
+
+
+def select_count(stmt: Select) -> Select:
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
@@ -0,0 +1,58 @@
+# src/app/repo/partition_repo.py
+
+import datetime
+import re
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Table names below are never user input: they are the parents listed in
+# app/services/partition_service.py and partition names derived from them.
+
+
+def month_partition_name(parent: str, month: datetime.date) -> str:
+    return f"{parent}_y{month.year}m{month.month:02d}"
+
+
+def partition_month(parent: str, name: str) -> datetime.date | None:
+    """The first day of the month a partition named by month_partition_name covers, else None."""
+    match = re.fullmatch(rf"{re.escape(parent)}_y(\d{{4}})m(\d{{2}})", name)
+    return datetime.date(int(match[1]), int(match[2]), 1) if match else None
+
+
+class AsyncPartitionRepo:
+    """DDL for the monthly range partitions of a partitioned table."""
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_partition_names(self, parent: str) -> list[str]:
+        """The partitions currently attached to `parent`, including its default partition."""
+        result = await self.session.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:parent AS regclass) ORDER BY c.relname"
+            ),
+            {"parent": parent},
+        )
+        return list(result.scalars().all())
+
+    async def create_month_partition(self, parent: str, month: datetime.date, next_month: datetime.date) -> str:
+        """
+        Creates the partition of `parent` for [month, next_month), in UTC.
+        Fails if the default partition already holds rows of that range.
+        """
+        name = month_partition_name(parent, month)
+        await self.session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') TO ('{next_month.isoformat()} 00:00+00')"
+        ))
+        return name
+
+    async def detach_partition(self, parent: str, name: str):
+        """Detaches a partition. Its rows leave `parent` but stay in the now standalone table."""
+        await self.session.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {name}"))
+
+    async def drop_constraint(self, table: str, constraint: str):
+        await self.session.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}"))
+
+    async def drop_table(self, name: str):
+        await self.session.execute(text(f"DROP TABLE IF EXISTS {name}"))
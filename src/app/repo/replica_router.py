@@ -0,0 +1,102 @@
+# src/app/repo/replica_router.py
+
+import logging
+import time
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.config import settings
+from app.config import db
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary. A replica that has replayed
+# everything it received counts as current even if the primary has been idle
+# for a while (pg_last_xact_replay_timestamp alone would say it is lagging),
+# but only while its WAL receiver is streaming: a disconnected replica has
+# replayed all it received too, and is arbitrarily stale. The receiver's status
+# is hidden without pg_read_all_stats; a running receiver is then trusted.
+# A server that is not in recovery is the primary itself.
+_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE coalesce(status, 'streaming') = 'streaming') THEN 'Infinity' "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 'Infinity') END"
+)
+
+
+class ReplicaRouter:
+    """
+    Chooses where a read-only unit of work runs: the replica while it is
+    reachable and at most REPLICA_MAX_LAG_SECONDS behind, otherwise the primary.
+
+    The lag is measured at most once every REPLICA_LAG_CHECK_SECONDS and the
+    result reused by everything in between, so routing costs no extra query
+    on the request path most of the time.
+    """
+    def __init__(self, max_lag: float, check_interval: float):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._use_replica = False
+        self._checked_at: float | None = None
+        self._async_use_replica = False
+        self._async_checked_at: float | None = None
+        self.last_lag: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return db.ReplicaSessionLocal is not None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "using_replica": {"sync": self._use_replica, "async": self._async_use_replica},
+            "last_lag_seconds": self.last_lag,
+        }
+
+    def session(self) -> Session:
+        if self.enabled and self._replica_usable():
+            return db.ReplicaSessionLocal()
+        return db.ReadOnlySessionLocal()
+
+    async def async_session(self) -> AsyncSession:
+        if self.enabled and await self._async_replica_usable():
+            return db.AsyncReplicaSessionLocal()
+        return db.AsyncReadOnlySessionLocal()
+
+    def _replica_usable(self) -> bool:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_interval:
+            try:
+                with db.replica_engine.connect() as conn:
+                    lag = float(conn.execute(_LAG_QUERY).scalar_one())
+            except Exception as e:
+                logger.warning(f"[Replica] Lag check failed, reading from the primary: {e!r}")
+                lag = None
+            self._use_replica = self._accept(lag)
+            self._checked_at = now
+        return self._use_replica
+
+    async def _async_replica_usable(self) -> bool:
+        now = time.monotonic()
+        if self._async_checked_at is None or now - self._async_checked_at >= self.check_interval:
+            try:
+                async with db.async_replica_engine.connect() as conn:
+                    lag = float((await conn.execute(_LAG_QUERY)).scalar_one())
+            except Exception as e:
+                logger.warning(f"[Replica] Lag check failed, reading from the primary: {e!r}")
+                lag = None
+            self._async_use_replica = self._accept(lag)
+            self._async_checked_at = now
+        return self._async_use_replica
+
+    def _accept(self, lag: float | None) -> bool:
+        self.last_lag = lag
+        usable = lag is not None and lag <= self.max_lag
+        if lag is not None and not usable:
+            logger.warning(f"[Replica] Replica is {lag:.1f}s behind (max {self.max_lag}s), reading from the primary.")
+        return usable
+
+
+replica_router = ReplicaRouter(settings.REPLICA_MAX_LAG_SECONDS, settings.REPLICA_LAG_CHECK_SECONDS)
@@ -0,0 +1,51 @@
+# src/app/repo/resolved_entity_repo.py
+
+from datetime import timedelta
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..domain import models
+
+
+class AsyncResolvedEntityRepo:
+    """Reads and writes the identifier resolution cache."""
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_fresh(self, identifier: str) -> models.ResolvedEntity | None:
+        """Returns the cached resolution of `identifier` if it has not expired."""
+        return (await self.session.execute(
+            select(models.ResolvedEntity)
+            .where(models.ResolvedEntity.identifier == identifier)
+            .where(models.ResolvedEntity.expires_at > func.now())
+        )).scalar_one_or_none()
+
+    async def upsert(
+        self,
+        identifier: str,
+        ttl: timedelta,
+        peer_id: int | None = None,
+        access_hash: int | None = None,
+        type: models.ChatType | None = None,
+        title: str | None = None,
+        username: str | None = None,
+    ) -> models.ResolvedEntity:
+        """Stores a resolution (or, with no peer_id, a miss), replacing any earlier one."""
+        values = dict(
+            peer_id=peer_id,
+            access_hash=access_hash,
+            type=type,
+            title=title,
+            username=username,
+            resolved_at=func.now(),
+            expires_at=func.now() + ttl,
+        )
+        stmt = (
+            insert(models.ResolvedEntity)
+            .values(identifier=identifier, **values)
+            .on_conflict_do_update(index_elements=[models.ResolvedEntity.identifier], set_=values)
+            .returning(models.ResolvedEntity)
+        )
+        return (await self.session.execute(
+            stmt, execution_options={"populate_existing": True}
+        )).scalar_one()
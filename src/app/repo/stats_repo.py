@@ -0,0 +1,180 @@
+# src/app/repo/stats_repo.py
+
+import datetime
+import uuid
+from collections import Counter
+from typing import Iterable
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from ..domain import models
+
+# Counts from several channels (or matches) are written in one statement each. Keys
+# are sorted so that concurrent writers lock the counter rows in the same order.
+
+def _channel_activity_upsert_stmt():
+    stmt = insert(models.ChannelActivityHourly)
+    return stmt.on_conflict_do_update(
+        index_elements=[models.ChannelActivityHourly.channel_id, models.ChannelActivityHourly.hour],
+        set_={"message_count": models.ChannelActivityHourly.message_count + stmt.excluded.message_count},
+    )
+
+# Spreads each channel's count over the tags the channel has right now.
+_TAG_ACTIVITY_UPSERT = text("""
+    INSERT INTO tag_activity_daily (tag_id, day, message_count)
+    SELECT t.tag_id, v.day, sum(v.n)
+    FROM unnest(CAST(:channel_ids AS uuid[]), CAST(:days AS date[]), CAST(:counts AS bigint[])) AS v(channel_id, day, n)
+    JOIN channels c ON c.id = v.channel_id
+    CROSS JOIN unnest(c.tag_ids) AS t(tag_id)
+    GROUP BY t.tag_id, v.day
+    ORDER BY t.tag_id, v.day
+    ON CONFLICT (tag_id, day) DO UPDATE SET message_count = tag_activity_daily.message_count + excluded.message_count
+""")
+
+# The join skips subscriptions deleted since their matches were counted.
+_SUBSCRIPTION_MATCHES_UPSERT = text("""
+    INSERT INTO subscription_matches_daily (subscription_id, day, match_count)
+    SELECT v.subscription_id, v.day, v.n
+    FROM unnest(CAST(:subscription_ids AS uuid[]), CAST(:days AS date[]), CAST(:counts AS bigint[])) AS v(subscription_id, day, n)
+    JOIN subscriptions s ON s.id = v.subscription_id
+    ORDER BY v.subscription_id, v.day
+    ON CONFLICT (subscription_id, day) DO UPDATE SET match_count = subscription_matches_daily.match_count + excluded.match_count
+""")
+
+
+def utc_hour(moment: datetime.datetime) -> datetime.datetime:
+    return moment.astimezone(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _top_channels_stmt(start: datetime.datetime, end: datetime.datetime, limit: int):
+    activity = models.ChannelActivityHourly
+    messages = func.sum(activity.message_count).label("messages")
+    return (
+        select(models.Channel.id, models.Channel.name, models.Channel.username, messages)
+        .join(activity, activity.channel_id == models.Channel.id)
+        .where(activity.hour >= start, activity.hour < end)
+        .group_by(models.Channel.id)
+        .order_by(messages.desc(), models.Channel.id)
+        .limit(limit)
+    )
+
+def _channel_hourly_stmt(channel_id: uuid.UUID, start: datetime.datetime, end: datetime.datetime):
+    activity = models.ChannelActivityHourly
+    return (
+        select(activity.hour, activity.message_count.label("messages"))
+        .where(activity.channel_id == channel_id, activity.hour >= start, activity.hour < end)
+        .order_by(activity.hour)
+    )
+
+def _total_messages_stmt(start: datetime.datetime, end: datetime.datetime):
+    activity = models.ChannelActivityHourly
+    return select(func.coalesce(func.sum(activity.message_count), 0)).where(activity.hour >= start, activity.hour < end)
+
+def _tag_volume_stmt(start: datetime.date, end: datetime.date):
+    activity = models.TagActivityDaily
+    messages = func.sum(activity.message_count).label("messages")
+    return (
+        select(models.Tag.id, models.Tag.name, messages)
+        .join(activity, activity.tag_id == models.Tag.id)
+        .where(activity.day >= start, activity.day < end)
+        .group_by(models.Tag.id)
+        .order_by(messages.desc(), models.Tag.name)
+    )
+
+def _user_matches_stmt(start: datetime.date, end: datetime.date, limit: int):
+    activity = models.SubscriptionMatchesDaily
+    matches = func.sum(activity.match_count).label("matches")
+    return (
+        select(models.User.id, models.User.telegram_id, models.User.full_name, matches)
+        .join(models.Subscription, models.Subscription.user_id == models.User.id)
+        .join(activity, activity.subscription_id == models.Subscription.id)
+        .where(activity.day >= start, activity.day < end)
+        .group_by(models.User.id)
+        .order_by(matches.desc(), models.User.id)
+        .limit(limit)
+    )
+
+
+class StatsRepo:
+    """Reads the activity rollups. Every query is bounded by a [start, end) period."""
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_top_channels(self, start: datetime.datetime, end: datetime.datetime, limit: int) -> list:
+        """(id, name, username, messages) of the busiest channels, busiest first."""
+        return self.session.execute(_top_channels_stmt(start, end, limit)).all()
+
+    def get_channel_hourly(self, channel_id: uuid.UUID, start: datetime.datetime, end: datetime.datetime) -> list:
+        """(hour, messages) for one channel, oldest first. Hours without messages are left out."""
+        return self.session.execute(_channel_hourly_stmt(channel_id, start, end)).all()
+
+    def get_total_messages(self, start: datetime.datetime, end: datetime.datetime) -> int:
+        return int(self.session.scalar(_total_messages_stmt(start, end)))
+
+    def get_tag_volume(self, start: datetime.date, end: datetime.date) -> list:
+        """(id, name, messages) per tag with any messages in [start, end), largest first."""
+        return self.session.execute(_tag_volume_stmt(start, end)).all()
+
+    def get_user_matches(self, start: datetime.date, end: datetime.date, limit: int) -> list:
+        """(id, telegram_id, full_name, matches) per user with any matches in [start, end), most first."""
+        return self.session.execute(_user_matches_stmt(start, end, limit)).all()
+
+
+class AsyncStatsRepo:
+    """
+    Async counterpart of StatsRepo, which also writes the rollups for the
+    ingest path and the matcher.
+    """
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_top_channels(self, start: datetime.datetime, end: datetime.datetime, limit: int) -> list:
+        """See StatsRepo.get_top_channels."""
+        return (await self.session.execute(_top_channels_stmt(start, end, limit))).all()
+
+    async def get_channel_hourly(self, channel_id: uuid.UUID, start: datetime.datetime, end: datetime.datetime) -> list:
+        """See StatsRepo.get_channel_hourly."""
+        return (await self.session.execute(_channel_hourly_stmt(channel_id, start, end))).all()
+
+    async def get_total_messages(self, start: datetime.datetime, end: datetime.datetime) -> int:
+        return int(await self.session.scalar(_total_messages_stmt(start, end)))
+
+    async def get_tag_volume(self, start: datetime.date, end: datetime.date) -> list:
+        """See StatsRepo.get_tag_volume."""
+        return (await self.session.execute(_tag_volume_stmt(start, end))).all()
+
+    async def get_user_matches(self, start: datetime.date, end: datetime.date, limit: int) -> list:
+        """See StatsRepo.get_user_matches."""
+        return (await self.session.execute(_user_matches_stmt(start, end, limit))).all()
+
+    async def record_messages(self, messages: Iterable[models.Message]):
+        """Counts newly saved messages into the channel and tag rollups."""
+        hourly = Counter(
+            (message.channel_id, utc_hour(message.sent_at)) for message in messages if message.channel_id is not None
+        )
+        if not hourly:
+            return
+        await self.session.execute(
+            _channel_activity_upsert_stmt(),
+            [{"channel_id": channel_id, "hour": hour, "message_count": n} for (channel_id, hour), n in sorted(hourly.items())],
+        )
+
+        daily = Counter()
+        for (channel_id, hour), n in hourly.items():
+            daily[(channel_id, hour.date())] += n
+        await self.session.execute(_TAG_ACTIVITY_UPSERT, _unnest_params(daily, "channel_ids"))
+
+    async def record_matches(self, matches: Counter[tuple[uuid.UUID, datetime.date]]):
+        """Adds match counts keyed by (subscription ID, day)."""
+        if matches:
+            await self.session.execute(_SUBSCRIPTION_MATCHES_UPSERT, _unnest_params(matches, "subscription_ids"))
+
+
+def _unnest_params(counts: Counter[tuple[uuid.UUID, datetime.date]], ids_name: str) -> dict:
+    keys = sorted(counts)
+    return {
+        ids_name: [key[0] for key in keys],
+        "days": [key[1] for key in keys],
+        "counts": [counts[key] for key in keys],
+    }
@@ -3,11 +3,41 @@
 from re import L
 import uuid
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func, select, update
 from ..domain import models, schemas
 from sqlalchemy.orm import selectinload # <-- Add this import
+from .pagination import Keyset, Page, paginate, paginate_async
+from .tag_repo import has_any_tag
 import datetime
 
+# Newest first; backed by ix_subscriptions_created_at_id.
+SUBSCRIPTION_KEYSET = Keyset(models.Subscription.created_at, models.Subscription.id, descending=True)
+
+# What schemas.SubscriptionResponse reads, since an AsyncSession cannot lazy load.
+_SUBSCRIPTION_RESPONSE_LOADS = [selectinload(models.Subscription.user), selectinload(models.Subscription.tags)]
+
+def _subscription_list_stmt(filters: schemas.SubscriptionFilterParams):
+    """The filtered (unordered) subscription listing."""
+    stmt = select(models.Subscription)
+
+    if filters.search:
+        stmt = stmt.where(models.Subscription.query_text.ilike(f"%{filters.search}%"))
+    if filters.start_date:
+        stmt = stmt.where(models.Subscription.created_at >= filters.start_date)
+    if filters.end_date:
+        # Add one day to end_date to make it inclusive
+        stmt = stmt.where(models.Subscription.created_at < filters.end_date + datetime.timedelta(days=1))
+    if filters.tags:
+        stmt = stmt.where(has_any_tag(models.Subscription.tag_ids, filters.tags))
+    if filters.subscription_id:
+        stmt = stmt.where(models.Subscription.id == filters.subscription_id)
+    if filters.user_id:
+        stmt = stmt.where(models.Subscription.user_id == filters.user_id)
+    if filters.status:
+        stmt = stmt.where(models.Subscription.status == filters.status)
+    return stmt
+
 class SubscriptionRepo:
     def __init__(self, session: Session):
         self.session = session
@@ -53,36 +83,82 @@ class SubscriptionRepo:
     def get_paginated_subscriptions(
         self,
         filters: schemas.SubscriptionFilterParams
-    ) -> tuple[int, list[models.Subscription]]:
+    ) -> Page[models.Subscription]:
         """A powerful query method with filtering and pagination. Results are sorted from newest to oldest."""
         
-        stmt = (
+        # Counts the matches, then fetches the page (by cursor or by offset)
+        stmt = _subscription_list_stmt(filters).options(selectinload(models.Subscription.tags)) # Eager load tags
+        return paginate(self.session, stmt, SUBSCRIPTION_KEYSET, filters.limit, filters.skip, filters.cursor, filters.count)
+
+
+class AsyncSubscriptionRepo:
+    """Async counterpart of SubscriptionRepo."""
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_all_active_subscriptions(self) -> list[models.Subscription]:
+        """The core method for the matching engine. Eagerly loads the user relationship."""
+        return (await self.session.execute(
+            select(models.Subscription)
+            .where(models.Subscription.status == models.Status.ACTIVE)
+            .options(selectinload(models.Subscription.user))
+        )).scalars().all()
+
+    def create_subscription(self, schema: schemas.SubscriptionCreate) -> models.Subscription:
+        new_sub = models.Subscription(**schema.model_dump())
+        self.session.add(new_sub)
+        return new_sub
+
+    async def get_active_subscriptions_for_user(self, user_id: uuid.UUID) -> list[models.Subscription]:
+        """Finds all active subscriptions belonging to a specific user, with the user loaded."""
+        return list(await self.session.scalars(
             select(models.Subscription)
-            .options(selectinload(models.Subscription.tags)) # Eager load tags
-            .order_by(models.Subscription.created_at.desc()) # Newest to oldest
+            .where(models.Subscription.user_id == user_id)
+            .where(models.Subscription.status == models.Status.ACTIVE)
+            .options(selectinload(models.Subscription.user))
+        ))
+
+    async def get_subscription_by_id(self, subscription_id: uuid.UUID) -> models.Subscription | None:
+        """Gets a single subscription by its primary key, with its user and tags loaded."""
+        return await self.session.get(models.Subscription, subscription_id, options=_SUBSCRIPTION_RESPONSE_LOADS)
+
+    def soft_delete_subscription(self, subscription: models.Subscription):
+        """Changes a subscription's status to DELETED instead of removing it."""
+        subscription.status = models.Status.DELETED
+
+    def update_subscription_query(self, subscription: models.Subscription, new_query_text: str):
+        """Updates the query_text of a given subscription object."""
+        subscription.query_text = new_query_text
+        subscription.updated_at = models.func.now()
+
+    async def add_tags(self, subscription: models.Subscription, tags: list[models.Tag]):
+        """
+        Attaches the tags the subscription does not have yet. That alone only writes
+        subscription_tags, so updated_at is bumped too (and read back).
+        """
+        new_tags = [tag for tag in tags if tag not in subscription.tags]
+        if not new_tags:
+            return
+        subscription.tags.extend(new_tags)
+        subscription.updated_at = models.func.now()
+        await self.session.flush()
+        await self.session.refresh(subscription, ["updated_at"])
+
+    async def get_paginated_subscriptions(self, filters: schemas.SubscriptionFilterParams) -> Page[models.Subscription]:
+        """See SubscriptionRepo.get_paginated_subscriptions. Each subscription comes with its user and tags."""
+        stmt = _subscription_list_stmt(filters).options(*_SUBSCRIPTION_RESPONSE_LOADS)
+        return await paginate_async(
+            self.session, stmt, SUBSCRIPTION_KEYSET, filters.limit,
+            skip=filters.skip, cursor=filters.cursor, count=filters.count,
         )
 
-        if filters.search:
-            stmt = stmt.where(models.Subscription.query_text.ilike(f"%{filters.search}%"))
-        if filters.start_date:
-            stmt = stmt.where(models.Subscription.created_at >= filters.start_date)
-        if filters.end_date:
-            # Add one day to end_date to make it inclusive
-            stmt = stmt.where(models.Subscription.created_at < filters.end_date + datetime.timedelta(days=1))
-        if filters.tags:
-            stmt = stmt.join(models.Subscription.tags).where(models.Tag.name.in_(filters.tags))
-        if filters.subscription_id:
-            stmt = stmt.where(models.Subscription.id == filters.subscription_id)
-        if filters.user_id:
-            stmt = stmt.where(models.Subscription.user_id == filters.user_id)
-        if filters.status:
-            stmt = stmt.where(models.Subscription.status == filters.status)
-
-        # First, get the total count of items that match the filter
-        total_count = self.session.scalar(select(func.count()).select_from(stmt.subquery()))
-        
-        # Then, apply pagination to the main query
-        paginated_stmt = stmt.offset(filters.skip).limit(filters.limit)
-        items = self.session.execute(paginated_stmt).scalars().all()
-        
-        return total_count, items
+    async def get_subscriptions_version(self) -> tuple[int, datetime.datetime | None]:
+        """
+        A cheap fingerprint of the subscriptions table: row count and latest updated_at.
+        Creates, cancels, edits and tag changes all change it, since each of them
+        bumps updated_at (tags through add_tags).
+        """
+        count, last_updated = (await self.session.execute(
+            select(func.count(), func.max(models.Subscription.updated_at))
+        )).one()
+        return count, last_updated
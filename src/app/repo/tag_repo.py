@@ -1,10 +1,55 @@
 # src/app/repo/tag_repo.py
 
 import uuid
+from typing import Iterable
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Text, any_, cast, delete, func, select, type_coerce
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, array, insert
 from ..domain import models
 
+def _upsert_tags_stmt():
+    stmt = insert(models.Tag)
+    # A no-op update rather than DO NOTHING, so RETURNING also yields the tags that
+    # already existed (and a concurrent insert of the same name waits instead of failing).
+    return (
+        stmt.on_conflict_do_update(index_elements=[models.Tag.name], set_={"name": stmt.excluded.name})
+        .returning(models.Tag)
+        .execution_options(populate_existing=True)
+    )
+
+def _tag_rows(names: Iterable[str], description: str) -> tuple[list[str], list[dict]]:
+    """Unique names in first-seen order, and the rows to upsert (sorted, so concurrent upserts lock in the same order)."""
+    unique = list(dict.fromkeys(names))
+    return unique, [{"name": name, "description": description} for name in sorted(unique)]
+
+def tag_array(tag_ids):
+    """
+    A correlated scalar subquery for projection queries: the tags whose IDs are in
+    the `tag_ids` column as one 2-D text array of [id, name, description] rows
+    ordered by name, or NULL if there are none. Postgres evaluates it only for
+    the rows that survive ORDER BY ... LIMIT.
+    """
+    row = array([cast(models.Tag.id, Text), models.Tag.name, models.Tag.description])
+    return type_coerce(
+        select(func.array_agg(aggregate_order_by(row, models.Tag.name)))
+        .where(models.Tag.id == any_(tag_ids))
+        .scalar_subquery(),
+        ARRAY(Text, dimensions=2),
+    )
+
+def has_any_tag(tag_ids, names: list[str]):
+    """
+    True for rows whose `tag_ids` column includes a tag named in `names`:
+    `tag_ids && ARRAY(ids)`, which the column's GIN index answers without a join.
+    """
+    ids = select(func.array_agg(models.Tag.id)).where(models.Tag.name.in_(names)).scalar_subquery()
+    return tag_ids.bool_op("&&")(ids)
+
+def tag_dicts(tags: list[list[str]] | None) -> list[dict]:
+    """The value of a tag_array column as schemas.Tag-shaped dicts."""
+    return [{"id": tag_id, "name": name, "description": description} for tag_id, name, description in tags or ()]
+
 class TagRepo:
     def __init__(self, session: Session):
         self.session = session
@@ -16,14 +61,19 @@ class TagRepo:
 
     def get_or_create_tag(self, name: str, description: str) -> models.Tag:
         """Finds a tag by name or creates it if it doesn't exist."""
-        tag = self.get_tag_by_name(name)
-        if tag:
-            return tag
-
-        new_tag = models.Tag(name=name, description=description)
-        self.session.add(new_tag)
-        # NO COMMIT HERE. The service layer will commit.
-        return new_tag
+        return self.get_or_create_tags([name], description)[0]
+
+    def get_or_create_tags(self, names: Iterable[str], description: str = "") -> list[models.Tag]:
+        """
+        Finds or creates all the named tags with a single INSERT ... ON CONFLICT.
+        New tags get `description`; existing ones keep theirs. The result follows
+        the order of `names`, without duplicates. NO COMMIT HERE.
+        """
+        unique, rows = _tag_rows(names, description)
+        if not rows:
+            return []
+        by_name = {tag.name: tag for tag in self.session.scalars(_upsert_tags_stmt(), rows)}
+        return [by_name[name] for name in unique]
     
     def get_tag_by_id(self, tag_id: uuid.UUID) -> models.Tag | None:
         """Fetches a tag by its ID."""
@@ -42,4 +92,46 @@ class TagRepo:
 
     def delete_tag(self, tag: models.Tag):
         """Deletes a tag. The DB's ON DELETE CASCADE will handle associations."""
-        self.session.delete(tag)
\ No newline at end of file
+        self.session.delete(tag)
+
+
+class AsyncTagRepo:
+    """Async counterpart of TagRepo for code running on the event loop."""
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_tag_by_name(self, name: str) -> models.Tag | None:
+        return (await self.session.execute(
+            select(models.Tag).where(models.Tag.name == name)
+        )).scalar_one_or_none()
+
+    async def get_or_create_tag(self, name: str, description: str) -> models.Tag:
+        """Finds a tag by name or creates it if it doesn't exist."""
+        return (await self.get_or_create_tags([name], description))[0]
+
+    async def get_or_create_tags(self, names: Iterable[str], description: str = "") -> list[models.Tag]:
+        """See TagRepo.get_or_create_tags."""
+        unique, rows = _tag_rows(names, description)
+        if not rows:
+            return []
+        by_name = {tag.name: tag for tag in await self.session.scalars(_upsert_tags_stmt(), rows)}
+        return [by_name[name] for name in unique]
+
+    async def get_tag_by_id(self, tag_id: uuid.UUID) -> models.Tag | None:
+        return await self.session.get(models.Tag, tag_id)
+
+    async def get_all_tags(self) -> list[models.Tag]:
+        return list(await self.session.scalars(select(models.Tag).order_by(models.Tag.name)))
+
+    def update_tag_description(self, tag: models.Tag, description: str) -> models.Tag:
+        """Updates the description of a tag; written on the next flush."""
+        tag.description = description
+        return tag
+
+    async def delete_tag_by_id(self, tag_id: uuid.UUID) -> bool:
+        """
+        Deletes a tag with one DELETE; the DB's ON DELETE CASCADE removes its associations.
+        Returns False if there was no such tag.
+        """
+        result = await self.session.execute(delete(models.Tag).where(models.Tag.id == tag_id))
+        return result.rowcount > 0
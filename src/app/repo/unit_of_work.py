@@ -1,23 +1,36 @@
 # src/app/repo/unit_of_work.py
 
+import logging
 from sqlalchemy.orm import Session
-from app.config.db import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.db import SessionLocal, AsyncSessionLocal
 
 # Import all your repository classes
-from .user_repo import UserRepo
-from .channel_repo import ChannelRepo
-from .tag_repo import TagRepo
-from .subscription_repo import SubscriptionRepo
-from .message_repo import MessageRepo
-from .join_request_repo import JoinRequestRepo
+from .user_repo import UserRepo, AsyncUserRepo
+from .channel_repo import ChannelRepo, AsyncChannelRepo
+from .tag_repo import TagRepo, AsyncTagRepo
+from .subscription_repo import SubscriptionRepo, AsyncSubscriptionRepo
+from .message_repo import MessageRepo, AsyncMessageRepo
+from .join_request_repo import JoinRequestRepo, AsyncJoinRequestRepo
+from .resolved_entity_repo import AsyncResolvedEntityRepo
+from .partition_repo import AsyncPartitionRepo
+from .stats_repo import StatsRepo, AsyncStatsRepo
+from .replica_router import replica_router
+
+logger = logging.getLogger(__name__)
 
 class UnitOfWork:
     """
     Manages the session, transactions, and provides access to repositories.
     Acts as a context manager to ensure the session is handled correctly.
+
+    With readonly=True the work runs in a READ ONLY transaction, on the read
+    replica when one is configured and caught up (see replica_router), and
+    nothing is committed on exit. Use it for pure reads such as list endpoints.
     """
-    def __init__(self):
-        self.session: Session = SessionLocal()
+    def __init__(self, readonly: bool = False):
+        self.readonly = readonly
+        self.session: Session = replica_router.session() if readonly else SessionLocal()
         # All repositories created here will share the exact same session object
         self.users = UserRepo(self.session)
         self.channels = ChannelRepo(self.session)
@@ -25,6 +38,7 @@ class UnitOfWork:
         self.subscriptions = SubscriptionRepo(self.session)
         self.messages = MessageRepo(self.session)
         self.join_requests = JoinRequestRepo(self.session)
+        self.stats = StatsRepo(self.session)
 
     def __enter__(self):
         """Called when entering the 'with' statement."""
@@ -35,7 +49,10 @@ class UnitOfWork:
         Called when exiting the 'with' statement.
         Handles commit, rollback, and closing the session.
         """
-        if exc_type:  # If an exception occurred
+        if self.readonly:
+            # Nothing to commit; closing the session ends the transaction.
+            pass
+        elif exc_type:  # If an exception occurred
             print(f"An exception occurred: {exc_val}. Rolling back.")
             self.session.rollback()
         else:
@@ -50,4 +67,57 @@ class UnitOfWork:
 
     def rollback(self):
         """Explicitly rolls back the transaction."""
-        self.session.rollback()
\ No newline at end of file
+        self.session.rollback()
+
+
+class AsyncUnitOfWork:
+    """
+    The async version of UnitOfWork, backed by the asyncpg engine.
+    Use it with 'async with' from code running on the event loop; the sync
+    UnitOfWork remains for scripts and other blocking callers.
+
+    readonly=True works as in UnitOfWork; the session is then only opened
+    on entering the 'async with', since choosing the replica may query it.
+    """
+    def __init__(self, readonly: bool = False):
+        self.readonly = readonly
+        if not readonly:
+            self._open(AsyncSessionLocal())
+
+    def _open(self, session: AsyncSession):
+        self.session: AsyncSession = session
+        self.users = AsyncUserRepo(self.session)
+        self.channels = AsyncChannelRepo(self.session)
+        self.tags = AsyncTagRepo(self.session)
+        self.subscriptions = AsyncSubscriptionRepo(self.session)
+        self.messages = AsyncMessageRepo(self.session)
+        self.join_requests = AsyncJoinRequestRepo(self.session)
+        self.resolved_entities = AsyncResolvedEntityRepo(self.session)
+        self.partitions = AsyncPartitionRepo(self.session)
+        self.stats = AsyncStatsRepo(self.session)
+
+    async def __aenter__(self):
+        if self.readonly:
+            self._open(await replica_router.async_session())
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, traceback):
+        """Commits on success, rolls back on error, and always closes the session."""
+        try:
+            if self.readonly:
+                pass  # Nothing to commit; closing the session ends the transaction.
+            elif exc_type:
+                logger.warning(f"An exception occurred: {exc_val}. Rolling back.")
+                await self.session.rollback()
+            else:
+                await self.session.commit()
+        finally:
+            await self.session.close()
+
+    async def commit(self):
+        """Explicitly commits the transaction."""
+        await self.session.commit()
+
+    async def rollback(self):
+        """Explicitly rolls back the transaction."""
+        await self.session.rollback()
@@ -1,10 +1,54 @@
 # src/app/repo/user_repo.py
 
 import uuid
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from ..domain import models, schemas
-from sqlalchemy import func
+from sqlalchemy import func, case, literal
+from .pagination import Keyset, Page, paginate, paginate_async
+
+# Alphabetical; backed by ix_users_full_name_id.
+USER_KEYSET = Keyset(models.User.full_name, models.User.id)
+
+
+def _upsert_user_stmt(schema: schemas.UserCreate):
+    stmt = insert(models.User).values(**schema.model_dump())
+    return stmt.on_conflict_do_update(
+        index_elements=[models.User.telegram_id],
+        set_={
+            "full_name": stmt.excluded.full_name,
+            "username": stmt.excluded.username,
+            "status": case(
+                (models.User.status == models.Status.DELETED, literal(models.Status.ACTIVE, models.User.status.type)),
+                else_=models.User.status,
+            ),
+            "updated_at": func.now(),
+        },
+    ).returning(models.User)
+
+def _user_list_stmt(filters: schemas.UserFilterParams):
+    """The filtered (unordered) user listing."""
+    query = select(models.User)
+
+    if filters.user_id:
+        query = query.where(models.User.id == filters.user_id)
+    if filters.telegram_id:
+        query = query.where(models.User.telegram_id == filters.telegram_id)
+    if filters.status:
+        query = query.where(models.User.status == filters.status)
+    if filters.name:
+        query = query.where(models.User.full_name.ilike(f"%{filters.name}%"))
+    if filters.username:
+        query = query.where(models.User.username.ilike(f"%{filters.username}%"))
+    if filters.search:
+        search_term = f"%{filters.search}%"
+        query = query.where(
+            models.User.full_name.ilike(search_term) |
+            models.User.username.ilike(search_term)
+        )
+    return query
 
 
 class UserRepo:
@@ -22,50 +66,44 @@ class UserRepo:
         ).scalar_one_or_none()
     
     def get_or_create_user(self, schema: schemas.UserCreate) -> models.User:
-        """Finds a user by telegram_id or creates them."""
-        user = self.get_user_by_telegram_id(schema.telegram_id)
-        if user:
-            # If user was soft-deleted, reactivate them
-            if user.status == models.Status.DELETED:
-                user.status = models.Status.ACTIVE
-            user.full_name = schema.full_name # Update name
-            user.username = schema.username
-            return user
-        
-        new_user = models.User(**schema.model_dump())
-        self.session.add(new_user)
-        return new_user
+        """
+        Finds a user by telegram_id or creates them, in one INSERT ... ON CONFLICT.
+        An existing user gets the current name and username, and is reactivated if soft-deleted.
+        """
+        return self.session.scalars(_upsert_user_stmt(schema), execution_options={"populate_existing": True}).one()
     
-    def get_all_users_paginated(self, filters: schemas.UserFilterParams) -> tuple[int, list[models.User]]:
+    def get_all_users_paginated(self, filters: schemas.UserFilterParams) -> Page[models.User]:
         """
-        Get all users with advanced filtering and pagination.
-        Returns a tuple of total count and a list of User models.
+        Get all users with advanced filtering and pagination, ordered by name.
+        Returns a Page of User models.
         """
-        query = select(models.User)
+        # Apply pagination
+        return paginate(self.session, _user_list_stmt(filters), USER_KEYSET, filters.limit, filters.skip, filters.cursor, filters.count)
 
-        if filters.user_id:
-            query = query.where(models.User.id == filters.user_id)
-        if filters.telegram_id:
-            query = query.where(models.User.telegram_id == filters.telegram_id)
-        if filters.status:
-            query = query.where(models.User.status == filters.status)
-        if filters.name:
-            query = query.where(models.User.full_name.ilike(f"%{filters.name}%"))
-        if filters.username:
-            query = query.where(models.User.username.ilike(f"%{filters.username}%"))
-        if filters.search:
-            search_term = f"%{filters.search}%"
-            query = query.where(
-                models.User.full_name.ilike(search_term) |
-                models.User.username.ilike(search_term)
-            )
 
+class AsyncUserRepo:
+    """Async counterpart of UserRepo."""
+    def __init__(self, session: AsyncSession):
+        self.session = session
 
-        total = self.session.execute(select(func.count()).select_from(query)).scalar_one()
-        
-        # Apply pagination
-        query = query.offset(filters.skip).limit(filters.limit)
-        
-        users = self.session.execute(query).scalars().all()
-        
-        return total, users
\ No newline at end of file
+    async def get_user_by_telegram_id(self, telegram_id: int) -> models.User | None:
+        return (await self.session.execute(
+            select(models.User).where(models.User.telegram_id == telegram_id)
+        )).scalar_one_or_none()
+
+    async def get_user_by_id(self, user_id: uuid.UUID) -> models.User | None:
+        return await self.session.get(models.User, user_id)
+
+    async def get_or_create_user(self, schema: schemas.UserCreate) -> models.User:
+        """See UserRepo.get_or_create_user."""
+        return (await self.session.scalars(_upsert_user_stmt(schema), execution_options={"populate_existing": True})).one()
+
+    async def get_all_users_paginated(self, filters: schemas.UserFilterParams) -> Page[models.User]:
+        """See UserRepo.get_all_users_paginated. Users come with their subscriptions and those subscriptions' tags."""
+        stmt = _user_list_stmt(filters).options(
+            selectinload(models.User.subscriptions).selectinload(models.Subscription.tags)
+        )
+        return await paginate_async(
+            self.session, stmt, USER_KEYSET, filters.limit,
+            skip=filters.skip, cursor=filters.cursor, count=filters.count,
+        )
@@ -1,32 +1,54 @@
 # src/app/routers/channels_api.py
 
+import math
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 from app.domain import schemas
-from app.services import channel_service
+from app.core.bot.bot_utils import normalize_identifier
+from app.core.listener.join_scheduler import JoinDeferred
+from app.services import channel_service, entity_cache_service
 
 channel_router = APIRouter(prefix="/channels", tags=["Channels API"])
 
 @channel_router.get("/", response_model=schemas.PaginatedResponse[schemas.Channel])
-def get_all_channels(filters: schemas.ChannelFilterParams = Depends()):
+async def get_all_channels(filters: schemas.ChannelFilterParams = schemas.async_depends(schemas.ChannelFilterParams)):
     """Get a paginated list of all monitored channels with advanced filtering."""
-    total, channels_dto = channel_service.get_all_channels_paginated(filters)
-    return schemas.PaginatedResponse(total=total, limit=filters.limit, skip=filters.skip, items=channels_dto)
+    page = await channel_service.get_all_channels_paginated(filters)
+    return schemas.PaginatedResponse(total=page.total, limit=filters.limit, skip=filters.skip, items=page.items, next_cursor=page.next_cursor, total_strategy=page.total_strategy)
+
+@channel_router.get("/resolve", response_model=schemas.ResolvedEntity)
+async def resolve_channel(identifier: str = Query(..., description="An @username, t.me link or invite link")):
+    """Looks up what an identifier points to, using the resolution cache before Telegram."""
+    normalized_identifier = normalize_identifier(identifier)
+    if not normalized_identifier:
+        raise HTTPException(status_code=400, detail="Unrecognized identifier format.")
+    try:
+        entity = await entity_cache_service.lookup_identifier(normalized_identifier)
+    except JoinDeferred as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Username resolution is rate limited, try again later.",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    if entity is None:
+        raise HTTPException(status_code=404, detail="Identifier is not known yet.")
+    if not entity.found:
+        raise HTTPException(status_code=404, detail="Identifier does not exist on Telegram.")
+    return entity
 
 @channel_router.delete("/{channel_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def leave_channel(channel_id: uuid.UUID):
     """
     Instructs the listener to leave a channel/group and deletes it from the database.
     """
-    # This endpoint must be async because our service function is now async.
     success = await channel_service.leave_channel(channel_id)
     if not success:
         raise HTTPException(status_code=404, detail="Channel not found in database.")
 
 @channel_router.post("/{channel_id}/tags", response_model=schemas.Channel)
-def add_tags_to_channel(channel_id: uuid.UUID, request: schemas.AddTagsRequest):
+async def add_tags_to_channel(channel_id: uuid.UUID, request: schemas.AddTagsRequest):
     """Adds one or more tags to an existing channel."""
-    updated_channel = channel_service.add_tags_to_channel(channel_id, request.tag_names)
+    updated_channel = await channel_service.add_tags_to_channel(channel_id, request.tag_names)
     if not updated_channel:
         raise HTTPException(status_code=404, detail="Channel not found.")
     return updated_channel
\ No newline at end of file
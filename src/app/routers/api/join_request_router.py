@@ -0,0 +1,18 @@
+# src/app/routers/api/join_request_router.py
+
+from fastapi import APIRouter, HTTPException
+from app.domain import schemas
+from app.services import join_request_service
+
+join_request_router = APIRouter(prefix="/join-requests", tags=["Join Requests API"])
+
+@join_request_router.post("/import", response_model=schemas.JoinImportResult)
+async def import_join_requests(request: schemas.JoinImportRequest):
+    """
+    Queues join requests for many channels at once. Identifiers are normalized like
+    the bot's /addchannel input; ones already requested or joined are skipped.
+    """
+    result = await join_request_service.import_join_requests(request.identifiers, request.tags, request.user_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="User not found.")
+    return result
@@ -0,0 +1,42 @@
+# src/app/routers/api/metrics_router.py
+
+from fastapi import APIRouter
+from app.core.listener.event_handler import ingest_queue, seen_messages
+from app.core.listener.worker import message_writer
+from app.core.bot.notifier import notifier_stats
+from app.core.bot.dispatcher import notification_dispatcher
+from app.core.join_wakeup import join_wakeup
+from app.core.listener.join_scheduler import join_scheduler
+from app.repo.replica_router import replica_router
+from app.services import channel_cache
+from app.services.match_counter import match_counter
+from app.services.subscription_snapshot import subscription_snapshot
+from app.services.join_request_service import count_open_join_requests
+
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics API"])
+
+@metrics_router.get("/")
+async def get_metrics():
+    """Returns runtime counters for the in-process pipeline stages."""
+    return {
+        "ingest": ingest_queue.stats(),
+        "seen_messages": seen_messages.stats(),
+        "message_writer": message_writer.stats(),
+        "channel_cache": channel_cache.stats(),
+        "subscription_snapshot": subscription_snapshot.stats(),
+        "notification_dispatcher": notification_dispatcher.stats(),
+        "notifier": notifier_stats(),
+        "join_wakeup": join_wakeup.stats(),
+        "replica": replica_router.stats(),
+        "match_counter": match_counter.stats(),
+        "join_scheduler": await _join_scheduler_metrics(),
+    }
+
+async def _join_scheduler_metrics() -> dict:
+    pending_public, pending_invites = await count_open_join_requests()
+    return {
+        "budgets": join_scheduler.stats(),
+        "open_public_requests": pending_public,
+        "open_invite_requests": pending_invites,
+        "estimated_drain_seconds": round(join_scheduler.estimate_drain_seconds(pending_public, pending_invites)),
+    }
@@ -0,0 +1,28 @@
+# src/app/routers/api/stats_router.py
+
+import uuid
+from fastapi import APIRouter
+from app.domain import schemas
+from app.services import stats_service
+
+stats_router = APIRouter(prefix="/stats", tags=["Stats API"])
+
+@stats_router.get("/channels", response_model=list[schemas.ChannelActivity])
+async def get_channel_activity(filters: schemas.StatsFilterParams = schemas.async_depends(schemas.StatsFilterParams)):
+    """The channels with the most messages in the period, busiest first."""
+    return await stats_service.get_channel_activity(filters)
+
+@stats_router.get("/channels/{channel_id}/hourly", response_model=list[schemas.HourlyCount])
+async def get_channel_hourly_activity(channel_id: uuid.UUID, filters: schemas.StatsFilterParams = schemas.async_depends(schemas.StatsFilterParams)):
+    """A channel's messages per hour. Hours without messages are left out."""
+    return await stats_service.get_channel_hourly_activity(channel_id, filters)
+
+@stats_router.get("/tags", response_model=list[schemas.TagVolume])
+async def get_tag_volume(filters: schemas.StatsFilterParams = schemas.async_depends(schemas.StatsFilterParams)):
+    """Messages per tag in the period, counted by the tags their channel had when they arrived."""
+    return await stats_service.get_tag_volume(filters)
+
+@stats_router.get("/users", response_model=list[schemas.UserMatchRate])
+async def get_user_match_rates(filters: schemas.StatsFilterParams = schemas.async_depends(schemas.StatsFilterParams)):
+    """The users with the most subscription matches in the period."""
+    return await stats_service.get_user_match_rates(filters)
@@ -5,13 +5,19 @@ from app.routers.api.onboarding import router as onboarding_router
 from app.routers.api.message_router import message_router
 from app.routers.api.tags_router import tag_router
 from app.routers.api.channel_router import channel_router
+from app.routers.api.metrics_router import metrics_router
+from app.routers.api.join_request_router import join_request_router
+from app.routers.api.stats_router import stats_router
 
 routers_list = [
     subscription_router,
     onboarding_router,
     message_router,
     tag_router,
-    channel_router
+    channel_router,
+    metrics_router,
+    join_request_router,
+    stats_router,
 
 ]
 
@@ -0,0 +1,51 @@
+# src/app/services/archive_service.py
+
+import datetime
+import logging
+from pathlib import Path
+from app.config.config import settings
+from app.core.months import add_months, month_start
+from app.repo.unit_of_work import UnitOfWork
+from app.repo.message_archive import message_archive
+
+logger = logging.getLogger(__name__)
+
+
+def archive_old_messages(cutoff: datetime.datetime | None = None) -> dict:
+    """
+    Moves every message sent before `cutoff` (default: ARCHIVE_AFTER_DAYS ago)
+    from Postgres to the Parquet archive, one calendar month at a time.
+
+    A month's rows are streamed into a new file first and only deleted from the
+    database once the file is safely on disk, in ARCHIVE_BATCH_SIZE chunks. A run
+    that dies in between leaves the file pending; the next run finishes the deletes.
+    """
+    cutoff = cutoff or datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    cutoff = cutoff.astimezone(datetime.timezone.utc)
+    deleted = sum(_delete_archived_rows(path) for path in message_archive.pending_files())
+
+    with UnitOfWork() as uow:
+        oldest = uow.messages.get_oldest_sent_at()
+
+    files = []
+    month = month_start(oldest.astimezone(datetime.timezone.utc)) if oldest else cutoff
+    while month < cutoff:
+        end = min(add_months(month_start(month), 1), cutoff)
+        with UnitOfWork() as uow:
+            path = message_archive.write(month, end, uow.messages.stream_for_archive(month, end, settings.ARCHIVE_BATCH_SIZE))
+        if path:
+            files.append(str(path))
+            deleted += _delete_archived_rows(path)
+        month = end
+
+    logger.info(f"[Archive] Archived messages sent before {cutoff:%Y-%m-%d %H:%M}: {len(files)} files, {deleted} rows deleted.")
+    return {"cutoff": cutoff.isoformat(), "files": files, "deleted": deleted}
+
+
+def _delete_archived_rows(path: Path) -> int:
+    deleted = 0
+    for message_ids, sent_from, sent_to in message_archive.id_chunks(path):
+        with UnitOfWork() as uow:
+            deleted += uow.messages.delete_messages(message_ids, sent_from, sent_to)
+    message_archive.mark_done(path)
+    return deleted
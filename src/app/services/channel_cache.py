@@ -0,0 +1,73 @@
+# src/app/services/channel_cache.py
+
+import logging
+import uuid
+from dataclasses import dataclass
+
+from app.config.config import settings
+from app.core.cache import LRUCache
+from app.domain import models, schemas
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedChannel:
+    """The channel fields the ingest hot path needs, detached from any session."""
+    id: uuid.UUID
+    status: models.Status
+    type: models.ChatType | None
+    has_tags: bool
+    name: str | None
+    username: str | None
+
+    def is_current_for(self, schema: schemas.ChannelCreate) -> bool:
+        """
+        True if saving `schema` through get_or_create_channel would not change
+        the stored row, so the cached entry can be used as-is.
+        """
+        return (
+            self.has_tags
+            and (schema.name or self.name) == self.name
+            and (schema.username or self.username) == self.username
+            and (schema.type or self.type) == self.type
+        )
+
+
+# Keyed by the channel's telegram_id.
+_cache: LRUCache[int, CachedChannel] = LRUCache(maxsize=settings.CHANNEL_CACHE_SIZE)
+
+
+def get(telegram_id: int) -> CachedChannel | None:
+    return _cache.get(telegram_id)
+
+
+def entry_for(channel: models.Channel) -> CachedChannel:
+    """A cache entry for a loaded (and flushed) Channel ORM object. Not cached yet."""
+    return CachedChannel(
+        id=channel.id,
+        status=channel.status,
+        type=channel.type,
+        has_tags=bool(channel.tags),
+        name=channel.name,
+        username=channel.username,
+    )
+
+
+def put(telegram_id: int, entry: CachedChannel):
+    """Caches an entry. Only call this once the channel row is committed."""
+    _cache.set(telegram_id, entry)
+
+
+def invalidate(telegram_id: int):
+    """Drops a channel from the cache. Call this after any write to the channel or its tags."""
+    if _cache.pop(telegram_id) is not None:
+        logger.debug(f"Channel cache: invalidated {telegram_id}")
+
+
+def clear():
+    _cache.clear()
+
+
+def stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,97 @@
+# src/app/services/entity_cache_service.py
+
+import logging
+import time
+from datetime import timedelta
+
+from telethon import TelegramClient
+from telethon.errors.rpcerrorlist import UsernameInvalidError, UsernameNotOccupiedError
+from telethon.tl.functions.contacts import ResolveUsernameRequest
+from telethon.tl.types import Channel as TelethonChannel, Chat as TelethonChat
+
+from app.config.config import settings
+from app.core.listener.join_scheduler import join_scheduler
+from app.core.listener.telethon_client import ACTIVE_CLIENTS
+from app.domain import schemas
+from app.domain.models import ChatType
+from app.repo.join_request_repo import identifier_key
+from app.repo.unit_of_work import AsyncUnitOfWork
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_TTL = timedelta(hours=settings.ENTITY_CACHE_TTL_HOURS)
+NEGATIVE_TTL = timedelta(hours=settings.ENTITY_CACHE_NEGATIVE_TTL_HOURS)
+
+
+async def get_cached_entity(identifier: str) -> schemas.ResolvedEntity | None:
+    """
+    Returns the unexpired cache entry for a normalized identifier, positive or
+    negative. Entries are keyed by identifier_key, so @Foo and @foo share one.
+    """
+    async with AsyncUnitOfWork() as uow:
+        entry = await uow.resolved_entities.get_fresh(identifier_key(identifier))
+        return schemas.ResolvedEntity.model_validate(entry) if entry else None
+
+
+async def remember_entity(identifier: str, entity) -> schemas.ResolvedEntity:
+    """Caches a Telethon Channel, Chat or User that `identifier` resolved to."""
+    if isinstance(entity, TelethonChannel):
+        chat_type = ChatType.SUPERGROUP if entity.megagroup else ChatType.CHANNEL
+    elif isinstance(entity, TelethonChat):
+        chat_type = ChatType.BASIC_GROUP
+    else:
+        chat_type = None
+
+    async with AsyncUnitOfWork() as uow:
+        entry = await uow.resolved_entities.upsert(
+            identifier_key(identifier),
+            ttl=POSITIVE_TTL,
+            peer_id=entity.id,
+            access_hash=getattr(entity, "access_hash", None),
+            type=chat_type,
+            title=getattr(entity, "title", None),
+            username=getattr(entity, "username", None),
+        )
+        return schemas.ResolvedEntity.model_validate(entry)
+
+
+async def remember_missing(identifier: str) -> schemas.ResolvedEntity:
+    """Records that `identifier` does not resolve, so it is not retried for a while."""
+    logger.info(f"Entity cache: '{identifier}' does not exist, caching the miss.")
+    async with AsyncUnitOfWork() as uow:
+        entry = await uow.resolved_entities.upsert(identifier_key(identifier), ttl=NEGATIVE_TTL)
+        return schemas.ResolvedEntity.model_validate(entry)
+
+
+async def resolve_username(client: TelegramClient, identifier: str, deadline: float | None = None) -> schemas.ResolvedEntity:
+    """
+    Resolves an @username, from the cache if possible and otherwise through
+    Telegram (charged to the scheduler's resolve budget, so it may raise JoinDeferred;
+    see JoinScheduler.call for `deadline`).
+    Check `.found` on the result: misses are returned, not raised.
+    """
+    cached = await get_cached_entity(identifier)
+    if cached:
+        logger.debug(f"Entity cache: hit for '{identifier}'.")
+        return cached
+
+    try:
+        resolved = await join_scheduler.call(client, ResolveUsernameRequest(identifier.lstrip("@")), deadline=deadline)
+    except (UsernameNotOccupiedError, UsernameInvalidError):
+        return await remember_missing(identifier)
+    return await remember_entity(identifier, (resolved.chats or resolved.users)[0])
+
+
+async def lookup_identifier(identifier: str) -> schemas.ResolvedEntity | None:
+    """
+    Resolution for API callers. Usernames are resolved live (cache first) while a
+    Telethon client is connected; invite links, which cannot be resolved without
+    joining, are answered from the cache only. None means nothing is known yet.
+    Never waits for the resolve budget: if a call cannot be made right away this
+    raises JoinDeferred, so an HTTP request is not held open.
+    """
+    if identifier.startswith("@"):
+        client = next(iter(ACTIVE_CLIENTS.values()), None)
+        if client is not None and client.is_connected():
+            return await resolve_username(client, identifier, deadline=time.monotonic())
+    return await get_cached_entity(identifier)
@@ -2,27 +2,116 @@
 
 import logging
 import uuid # Use the standard uuid library for type hinting
-from app.repo.unit_of_work import UnitOfWork
-from app.domain import models
+from itertools import islice
+from typing import Iterable
+from sqlalchemy import select, func
+from app.config.config import settings
+from app.core.join_wakeup import join_wakeup
+from app.core.bot.bot_utils import normalize_identifier
+from app.repo.join_request_repo import identifier_key
+from app.repo.unit_of_work import AsyncUnitOfWork
+from app.domain import models, schemas
 
 logger = logging.getLogger(__name__)
 
-def create_join_request(identifier: str, tags: list[str], user_id: uuid.UUID) -> tuple[models.ChannelJoinRequest, bool]:
+async def create_join_request(identifier: str, tags: list[str], user_id: uuid.UUID) -> tuple[models.ChannelJoinRequest, bool]:
     """
     Service to create a channel join request.
     Now directly returns the tuple from the repository.
     """
     logger.info(f"Service: Processing join request for '{identifier}' with tags: {tags}")
     
-    with UnitOfWork() as uow:
+    async with AsyncUnitOfWork() as uow:
         # The repo now handles all logic and returns the tuple.
-        join_req, was_newly_created = uow.join_requests.create_request(identifier, tags, user_id)
+        join_req, was_newly_created = await uow.join_requests.create_request(identifier, tags, user_id)
         
         # If a request was created or found, we need to load its data before the session closes.
         if join_req:
-            uow.session.flush()
+            await uow.session.flush()
             # If you need to access relationships, you might need to refresh.
             # For now, this is sufficient.
 
+        if was_newly_created:
+            # Postgres delivers the notification when this transaction commits,
+            # waking join workers in other processes (e.g. when called from the bot).
+            await uow.session.execute(select(func.pg_notify(settings.JOIN_NOTIFY_CHANNEL, str(join_req.id))))
+
+    if was_newly_created:
+        # Same-process workers are woken directly.
+        join_wakeup.notify()
+
     return join_req, was_newly_created
 
+async def count_open_join_requests() -> tuple[int, int]:
+    """Returns how many public-username and invite-link join requests are still open."""
+    async with AsyncUnitOfWork(readonly=True) as uow:
+        return await uow.join_requests.count_open_requests()
+
+
+async def import_join_requests(
+    identifiers: Iterable[str],
+    tags: list[str],
+    user_id: uuid.UUID,
+    chunk_size: int = settings.JOIN_IMPORT_CHUNK_SIZE,
+) -> schemas.JoinImportResult | None:
+    """
+    Creates join requests for a large list of raw identifiers (usernames, t.me links, invite links).
+
+    The input is consumed lazily, one chunk at a time, so a file can be streamed
+    straight in. Each chunk is normalized, deduplicated against the input seen so
+    far, existing requests and known channels with one query each, and the rest
+    is inserted with one bulk statement and committed.
+    Returns None if the requesting user does not exist.
+    """
+    async with AsyncUnitOfWork() as uow:
+        if not await uow.users.get_user_by_id(user_id):
+            logger.warning(f"Service: Bulk import requested by unknown user {user_id}.")
+            return None
+
+    result = schemas.JoinImportResult()
+    seen: set[str] = set()
+    lines = (line.strip() for line in identifiers)
+    lines = (line for line in lines if line and not line.startswith("#"))
+
+    while chunk := list(islice(lines, chunk_size)):
+        result.total += len(chunk)
+
+        candidates = []
+        for raw in chunk:
+            normalized = normalize_identifier(raw)
+            if not normalized:
+                result.invalid += 1
+                continue
+            key = identifier_key(normalized)
+            if key in seen:
+                result.duplicates += 1
+            else:
+                seen.add(key)
+                candidates.append(normalized)
+
+        async with AsyncUnitOfWork() as uow:
+            requested = await uow.join_requests.find_existing_identifiers(candidates)
+            joined = await uow.channels.find_existing_usernames(
+                [c[1:] for c in candidates if c.startswith("@")]
+            )
+
+            new_identifiers = []
+            for identifier in candidates:
+                if identifier in requested:
+                    result.already_requested += 1
+                elif identifier.startswith("@") and identifier[1:].lower() in joined:
+                    result.already_joined += 1
+                else:
+                    new_identifiers.append(identifier)
+
+            result.created += await uow.join_requests.bulk_create_requests(new_identifiers, tags, user_id)
+            if new_identifiers:
+                # One wakeup per chunk is enough; woken workers keep claiming until the queue is empty.
+                await uow.session.execute(select(func.pg_notify(settings.JOIN_NOTIFY_CHANNEL, "bulk")))
+
+        logger.info(f"Service: Imported chunk of {len(chunk)} identifiers, {len(new_identifiers)} new requests.")
+
+    if result.created:
+        join_wakeup.notify()
+    logger.info(f"Service: Bulk import finished: {result.model_dump()}")
+    return result
@@ -0,0 +1,116 @@
+# src/app/services/keyword_matcher.py
+
+from collections import deque
+from typing import Hashable, Iterable
+
+
+class AhoCorasick:
+    """
+    A multi-pattern substring automaton (Aho-Corasick).
+
+    It is built once from a set of patterns and then finds every pattern that
+    occurs anywhere in a text in a single left-to-right pass, regardless of how
+    many patterns there are.
+    """
+    def __init__(self, patterns: Iterable[str]):
+        # Node 0 is the root. Each node has its transitions, a failure link,
+        # and the indices of the patterns that end at it (own + inherited via failure links).
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+        self.patterns: list[str] = []
+
+        for pattern in patterns:
+            if pattern:
+                self._insert(pattern)
+        self._build_failure_links()
+
+    def _insert(self, pattern: str):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = next_node
+        self._out[node] += (len(self.patterns),)
+        self.patterns.append(pattern)
+
+    def _build_failure_links(self):
+        # Breadth-first, so a node's failure target is always finished before the node.
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] += self._out[self._fail[child]]
+
+    def output_nodes(self) -> Iterable[tuple[int, tuple[int, ...]]]:
+        """Yields (node, pattern indices) for every node at which at least one pattern ends."""
+        for node, pattern_ids in enumerate(self._out):
+            if pattern_ids:
+                yield node, pattern_ids
+
+    def matching_nodes(self, text: str) -> set[int]:
+        """Returns the automaton nodes with output that were reached while scanning `text`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        hits = set()
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                hits.add(node)
+        return hits
+
+    def find(self, text: str) -> set[int]:
+        """Returns the indices (into `self.patterns`) of all patterns found in `text`."""
+        found = set()
+        for node in self.matching_nodes(text):
+            found.update(self._out[node])
+        return found
+
+
+class KeywordMatcher:
+    """
+    Matches a text against many keyword queries at once.
+
+    Each query is an owner key (e.g. a subscription ID) plus a query text. A
+    query matches when ANY of its whitespace-separated keywords occurs in the
+    text as a case-insensitive substring, which is exactly
+    `any(keyword in text.lower() for keyword in query_text.lower().split())`.
+    """
+    def __init__(self, queries: Iterable[tuple[Hashable, str]]):
+        keyword_owners: dict[str, set[Hashable]] = {}
+        for owner, query_text in queries:
+            for keyword in query_text.lower().split():
+                keyword_owners.setdefault(keyword, set()).add(owner)
+
+        self._automaton = AhoCorasick(keyword_owners)
+        owners_by_pattern = [frozenset(keyword_owners[p]) for p in self._automaton.patterns]
+
+        # Pre-merge the owners of every output node, so a scan only needs one union per node hit.
+        self._owners_by_node: dict[int, frozenset] = {
+            node: frozenset().union(*(owners_by_pattern[i] for i in pattern_ids))
+            for node, pattern_ids in self._automaton.output_nodes()
+        }
+
+    @property
+    def keyword_count(self) -> int:
+        return len(self._automaton.patterns)
+
+    def match(self, text: str) -> set[Hashable]:
+        """Returns the owner keys of every query that matches `text`."""
+        matched = set()
+        for node in self._automaton.matching_nodes(text.lower()):
+            matched |= self._owners_by_node[node]
+        return matched
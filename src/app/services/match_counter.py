@@ -0,0 +1,54 @@
+# src/app/services/match_counter.py
+
+import datetime
+import logging
+import uuid
+from collections import Counter
+
+from app.repo.unit_of_work import AsyncUnitOfWork
+
+logger = logging.getLogger(__name__)
+
+
+class MatchCounter:
+    """
+    Counts matches per subscription per day in memory, for the matcher's hot path,
+    and adds them to subscription_matches_daily in one upsert per flush.
+    Flushed every STATS_FLUSH_SECONDS by stats_flush_task and once more on shutdown.
+    """
+    def __init__(self):
+        self._counts: Counter[tuple[uuid.UUID, datetime.date]] = Counter()
+
+        # --- Metrics ---
+        self.counted = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    def add(self, subscription_id: uuid.UUID, sent_at: datetime.datetime):
+        self._counts[(subscription_id, sent_at.astimezone(datetime.timezone.utc).date())] += 1
+        self.counted += 1
+
+    async def flush(self):
+        """Writes the counts gathered so far. On failure they are kept for the next flush."""
+        if not self._counts:
+            return
+        counts, self._counts = self._counts, Counter()
+        try:
+            async with AsyncUnitOfWork() as uow:
+                await uow.stats.record_matches(counts)
+        except Exception:
+            self._counts.update(counts)
+            self.failed_flushes += 1
+            raise
+        self.flushes += 1
+
+    def stats(self) -> dict:
+        return {
+            "pending": sum(self._counts.values()),
+            "counted": self.counted,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+match_counter = MatchCounter()
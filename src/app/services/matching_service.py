@@ -1,9 +1,10 @@
 # src/app/services/matching_service.py
 
 import logging
-from app.repo.unit_of_work import UnitOfWork
 from app.domain import models, schemas
-from app.core.bot.notifier import send_telegram_notification
+from app.core.bot.dispatcher import notification_dispatcher
+from app.services.subscription_snapshot import subscription_snapshot
+from app.services.match_counter import match_counter
 
 logger = logging.getLogger(__name__)
 
@@ -16,31 +17,26 @@ async def run_matching_for_message(message_schema: schemas.Message, channel_data
     """
     logger.info(f"Matcher: Running for message {message_schema.id} from '{channel_data.name}'")
 
-    # We still need the UoW to fetch subscriptions.
-    active_subscriptions: list[schemas.Subscription] = []
-    with UnitOfWork() as uow:
-        # The repo now eagerly loads the user data in one query
-        subs_orm = uow.subscriptions.get_all_active_subscriptions()
-        active_subscriptions = [schemas.Subscription.model_validate(sub) for sub in subs_orm]
+    # The snapshot only hits the DB when subscriptions have changed.
+    active_subscriptions, matcher = await subscription_snapshot.get()
 
     if not active_subscriptions:
         logger.info("Matcher: No active subscriptions. Nothing to do.")
         return
 
+    # --- Matching Logic (V1 - Keywords) ---
+    # In the future, this block will be replaced with a call to a semantic search model.
+    # One pass over the message finds every subscription with a keyword in it.
+    matched_ids = matcher.match(message_schema.content or "")
+    # --- End of Matching Logic ---
+
     # notified_users = set()
     for sub in active_subscriptions:
-        
-        # --- Matching Logic (V1 - Keywords) ---
-        # In the future, this block will be replaced with a call to a semantic search model.
-        is_match = False
-        keywords = sub.query_text.lower().split()
-        message_lower = message_schema.content.lower()
-        if any(keyword in message_lower for keyword in keywords):
-            is_match = True
-        # --- End of Matching Logic ---
+        is_match = sub.id in matched_ids
 
         if is_match:
             logger.info(f"MATCH FOUND! User: {sub.user.telegram_id}, Sub ID: {sub.id}, Msg ID: {message_schema.id}")
+            match_counter.add(sub.id, message_schema.sent_at)
             
             notification_text = (
                 f"🔥 <b>New Match Found!</b>\n\n"
@@ -50,7 +46,8 @@ async def run_matching_for_message(message_schema: schemas.Message, channel_data
                 f"<a href='{message_schema.clickable_link}'>Go to Message</a>"
             )
             
-            await send_telegram_notification(
-                user_telegram_id=sub.user.telegram_id,
-                message=notification_text
+            # Queued, not sent: the dispatcher paces delivery to the Bot API limits.
+            notification_dispatcher.enqueue(
+                chat_id=sub.user.telegram_id,
+                text=notification_text
             )
\ No newline at end of file
@@ -1,66 +1,164 @@
 # src/app/services/message_service.py
 
+import asyncio
+import copy
 import logging
-from app.repo.unit_of_work import UnitOfWork
+from pydantic import TypeAdapter
+from app.repo.unit_of_work import AsyncUnitOfWork
+from app.repo.pagination import Page
+from app.repo.message_repo import MESSAGE_KEYSET
+from app.repo.message_archive import message_archive
 from app.domain import models, schemas
+from app.services import channel_cache
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# Built once: validates a whole page of repository dicts in a single call.
+_MESSAGE_RESPONSES = TypeAdapter(list[schemas.MessageResponse])
+
 # --- THIS IS THE UPDATED FUNCTION SIGNATURE ---
-def save_new_message(message_schema: schemas.MessageCreate, channel_schema: schemas.ChannelCreate) -> schemas.Message | None:
+async def save_new_message(message_schema: schemas.MessageCreate, channel_schema: schemas.ChannelCreate) -> schemas.Message | None:
     """
     Saves a new message and ensures its parent channel exists with full details.
+    Returns None if the message was already stored.
+    """
+    return (await save_new_messages([(message_schema, channel_schema)]))[0]
+
+async def save_new_messages(items: list[tuple[schemas.MessageCreate, schemas.ChannelCreate]]) -> list[schemas.Message | None]:
+    """
+    Saves a batch of messages in one transaction, making sure every parent
+    channel exists first. The messages are written with a single multi-row
+    INSERT. The result lines up with `items`; messages that were already
+    stored (duplicates) come back as None.
     """
-    logger.info(f"Service: Saving message for channel '{channel_schema.name or channel_schema.telegram_id}'")
+    logger.info(f"Service: Saving a batch of {len(items)} messages")
+
+    # Step 1: Resolve channel IDs from the cache. Only unknown or changed
+    # channels need to touch the channels table.
+    channel_ids: dict[int, uuid.UUID] = {}
+    uncached: dict[int, schemas.ChannelCreate] = {}
+    # Cached only after the commit: a rolled-back channel row must not stay in the cache.
+    fresh: dict[int, channel_cache.CachedChannel] = {}
+    for _, channel_schema in items:
+        telegram_id = channel_schema.telegram_id
+        if telegram_id in channel_ids or telegram_id in uncached:
+            continue
+        cached = channel_cache.get(telegram_id)
+        if cached and cached.is_current_for(channel_schema):
+            channel_ids[telegram_id] = cached.id
+        else:
+            uncached[telegram_id] = channel_schema
     
-    with UnitOfWork() as uow:
-        # Step 1: Get or create the channel ORM object.
-        channel_orm = uow.channels.get_or_create_channel(channel_schema)
+    async with AsyncUnitOfWork() as uow:
+        if uncached:
+            # One upsert for every unknown or changed channel in the batch.
+            channels = await uow.channels.get_or_create_channels(list(uncached.values()))
 
-        if not channel_orm.tags:
-            tag = uow.tags.get_or_create_tag(name="others", description="Default tag")
-            channel_orm.tags.append(tag)
+            untagged = [channel_orm for channel_orm in channels if not channel_orm.tags]
+            if untagged:
+                default_tag = await uow.tags.get_or_create_tag(name="others", description="Default tag")
+                for channel_orm in untagged:
+                    channel_orm.tags.append(default_tag)
+                await uow.session.flush()
+            for channel_orm in channels:
+                fresh[channel_orm.telegram_id] = channel_cache.entry_for(channel_orm)
+                channel_ids[channel_orm.telegram_id] = channel_orm.id
 
-        # --- THIS IS THE FIX ---
-        # Step 2: Pass the message schema AND the channel ORM object to the repo.
-        # The repo no longer needs to look up the channel itself.
-        db_message = uow.messages.create_message(
-            message_schema=message_schema,
-            channel_orm=channel_orm
-        )
+        # Step 2: Insert all messages in one statement. Duplicates are skipped by the DB.
+        rows = [
+            (message_schema, channel_ids[channel_schema.telegram_id], channel_schema.telegram_id)
+            for message_schema, channel_schema in items
+        ]
+        db_messages = await uow.messages.bulk_create_messages(rows)
+        # Same transaction, so only messages that were really inserted are counted, exactly once.
+        await uow.stats.record_messages(db_messages)
+        # Built field by field so the channel relationship is never loaded.
+        inserted = {
+            (m.channel_telegram_id, m.telegram_message_id): schemas.Message(
+                id=m.id,
+                telegram_message_id=m.telegram_message_id,
+                content=m.content,
+                sent_at=m.sent_at,
+                clickable_link=m.clickable_link,
+            )
+            for m in db_messages
+        }
 
-        uow.session.flush()
-        message_dto = schemas.Message.model_validate(db_message)
+    for telegram_id, entry in fresh.items():
+        channel_cache.put(telegram_id, entry)
 
-    return message_dto
+    # pop() so a message repeated within the batch is only reported once.
+    return [
+        inserted.pop((channel_schema.telegram_id, message_schema.telegram_message_id), None)
+        for message_schema, channel_schema in items
+    ]
 
-def get_all_messages_paginated(filters: schemas.MessageFilterParams) -> tuple[int, list[schemas.MessageResponse]]:
+async def get_all_messages_paginated(filters: schemas.MessageFilterParams) -> Page[schemas.MessageResponse]:
     """Service to fetch all messages with filtering and pagination."""
     logger.info("Service: Fetching all paginated messages.")
-    with UnitOfWork() as uow:
-        total, messages_orm = uow.messages.get_paginated_messages(filters)
-        messages_dto = [schemas.MessageResponse.model_validate(m) for m in messages_orm]
-    return total, messages_dto
+    async with AsyncUnitOfWork(readonly=True) as uow:
+        # Ranked results cannot be merged by date, so relevance search stays in Postgres.
+        if not filters.rank and message_archive.overlaps(filters.start_date, filters.end_date):
+            page = await _paginate_with_archive(uow, filters)
+        else:
+            page = await uow.messages.get_paginated_messages(filters)
+            page.items = _MESSAGE_RESPONSES.validate_python(page.items)
+        if filters.search and filters.highlight:
+            snippets = await uow.messages.get_search_snippets([m.id for m in page.items], filters.search, filters.search_mode)
+            for item in page.items:
+                item.snippet = snippets.get(item.id)
+    return page
+
+async def _paginate_with_archive(uow: AsyncUnitOfWork, filters: schemas.MessageFilterParams) -> Page:
+    """
+    One page over Postgres and the Parquet archive together, newest first.
+    Both sides return their first skip + limit rows in the same (sent_at, id)
+    order, which is enough to cut the page from the merged list.
+    """
+    skip = 0 if filters.cursor else filters.skip
+    window = skip + filters.limit
+
+    db_filters = copy.copy(filters)
+    db_filters.skip, db_filters.limit = 0, window
+    db_page = await uow.messages.get_paginated_messages(db_filters)
+    db_items = _MESSAGE_RESPONSES.validate_python(db_page.items)
+
+    cursor = tuple(MESSAGE_KEYSET.decode(filters.cursor)) if filters.cursor else None
+    # Scanning Parquet files blocks, so it runs in a worker thread rather than on the event loop.
+    archived = await asyncio.to_thread(message_archive.find_messages, filters, cursor, window + 1)
+    channels = {c.id: c for c in await uow.channels.get_channels_by_ids({m.channel_id for m in archived.items if m.channel_id})}
+    for message in archived.items:
+        message.channel = channels.get(message.channel_id)
 
-def add_tags_to_message(message_id: uuid.UUID, tag_names: list[str]) -> schemas.MessageResponse | None:
+    archived_items = [schemas.MessageResponse.model_validate(m) for m in archived.items]
+
+    # A message is in both while its archive file is still pending; the database copy wins.
+    merged = {m.id: m for m in archived_items} | {m.id: m for m in db_items}
+    rows = sorted(merged.values(), key=lambda m: (m.sent_at, m.id), reverse=True)
+    items = rows[skip:window]
+    has_more = len(rows) > window or db_page.next_cursor is not None
+
+    return Page(
+        total=None if db_page.total is None or archived.total is None else db_page.total + archived.total,
+        items=items,
+        next_cursor=MESSAGE_KEYSET.encode(items[-1]) if has_more and items else None,
+        total_strategy=db_page.total_strategy,
+    )
+
+async def add_tags_to_message(message_id: uuid.UUID, tag_names: list[str]) -> schemas.MessageResponse | None:
     """Service to add tags to a message."""
     logger.info(f"Service: Adding tags {tag_names} to message {message_id}")
-    with UnitOfWork() as uow:
-        message = uow.messages.get_message_by_id(message_id)
+    async with AsyncUnitOfWork() as uow:
+        message = await uow.messages.get_message_by_id(message_id)
         if not message:
             return None
 
-        tags_to_add = []
         if tag_names:
-            for tag_name in tag_names:
-                tag = uow.tags.get_or_create_tag(tag_name, description="")
-                if tag:
-                    tags_to_add.append(tag)
+            tags_to_add = await uow.tags.get_or_create_tags(tag_names, description="")
         else:
             # If no tags were specified, we can add a default tag.
-            tag = uow.tags.get_or_create_tag(name="others", description="Default tag")
-            tags_to_add.append(tag)
+            tags_to_add = [await uow.tags.get_or_create_tag(name="others", description="Default tag")]
             
         if tags_to_add:
             for tag in tags_to_add:
@@ -68,17 +166,12 @@ def add_tags_to_message(message_id: uuid.UUID, tag_names: list[str]) -> schemas.
                     message.tags.append(tag)
 
 
-        uow.session.flush()
+        await uow.session.flush()
         response_dto = schemas.MessageResponse.model_validate(message)
     return response_dto
 
-def delete_message_by_id(message_id: uuid.UUID) -> bool:
+async def delete_message_by_id(message_id: uuid.UUID) -> bool:
     """Service to delete a message by its ID."""
     logger.info(f"Service: Deleting message {message_id}")
-    with UnitOfWork() as uow:
-        message = uow.messages.get_message_by_id(message_id)
-        if not message:
-            return False
-        
-        uow.messages.delete_message(message)
-    return True
+    async with AsyncUnitOfWork() as uow:
+        return await uow.messages.delete_message_by_id(message_id)
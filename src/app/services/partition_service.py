@@ -0,0 +1,63 @@
+# src/app/services/partition_service.py
+
+import datetime
+import logging
+from sqlalchemy.exc import DBAPIError
+from app.config.config import settings
+from app.core.months import add_months
+from app.repo.unit_of_work import AsyncUnitOfWork
+from app.repo.partition_repo import month_partition_name, partition_month
+
+logger = logging.getLogger(__name__)
+
+# Tables partitioned by month on the message's sent_at. message_tags references
+# messages, so its partitions are expired first.
+PARTITIONED_TABLES = ("messages", "message_tags")
+MESSAGE_TAGS_FK = "message_tags_message_id_fkey"
+
+
+async def maintain_message_partitions(today: datetime.date | None = None) -> dict:
+    """
+    Creates the monthly partitions from the current month up to
+    MESSAGE_PARTITION_PREMAKE_MONTHS ahead, and, if MESSAGE_RETENTION_MONTHS is
+    set, detaches (or drops, with MESSAGE_RETENTION_DROP) the ones that fell out
+    of the retention window. Safe to run any number of times.
+    """
+    today = today or datetime.datetime.now(datetime.timezone.utc).date()
+    current = today.replace(day=1)
+    created, expired = [], []
+
+    async with AsyncUnitOfWork() as uow:
+        for parent in PARTITIONED_TABLES:
+            existing = set(await uow.partitions.get_partition_names(parent))
+            for offset in range(settings.MESSAGE_PARTITION_PREMAKE_MONTHS + 1):
+                month = add_months(current, offset)
+                if month_partition_name(parent, month) in existing:
+                    continue
+                try:
+                    # A savepoint, so one failed month does not undo the others.
+                    async with uow.session.begin_nested():
+                        created.append(await uow.partitions.create_month_partition(parent, month, add_months(month, 1)))
+                except DBAPIError as e:
+                    # Usually rows for that month already sit in the default partition.
+                    logger.error(f"[Partitions] Could not create the {month:%Y-%m} partition of {parent}: {e}")
+
+        if settings.MESSAGE_RETENTION_MONTHS > 0:
+            oldest_kept = add_months(current, 1 - settings.MESSAGE_RETENTION_MONTHS)
+            for parent in reversed(PARTITIONED_TABLES):
+                for name in await uow.partitions.get_partition_names(parent):
+                    month = partition_month(parent, name)
+                    if month is None or month >= oldest_kept:
+                        continue
+                    await uow.partitions.detach_partition(parent, name)
+                    if parent == "message_tags":
+                        # A detached partition keeps the foreign key, now pointing at rows that are leaving too.
+                        await uow.partitions.drop_constraint(name, MESSAGE_TAGS_FK)
+                    if settings.MESSAGE_RETENTION_DROP:
+                        await uow.partitions.drop_table(name)
+                    expired.append(name)
+
+    if created or expired:
+        action = "dropped" if settings.MESSAGE_RETENTION_DROP else "detached"
+        logger.info(f"[Partitions] Created {created or 'none'}; {action} {expired or 'none'}.")
+    return {"created": created, "expired": expired}
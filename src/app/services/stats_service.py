@@ -0,0 +1,61 @@
+# src/app/services/stats_service.py
+
+import datetime
+import logging
+import uuid
+from app.repo.unit_of_work import AsyncUnitOfWork
+from app.domain import schemas
+
+logger = logging.getLogger(__name__)
+
+
+def _period(filters: schemas.StatsFilterParams) -> tuple[datetime.datetime, datetime.datetime]:
+    """The filter's days as a [start, end) range of UTC timestamps."""
+    start = datetime.datetime.combine(filters.start_date, datetime.time(), tzinfo=datetime.timezone.utc)
+    end = datetime.datetime.combine(filters.end_date + datetime.timedelta(days=1), datetime.time(), tzinfo=datetime.timezone.utc)
+    return start, end
+
+
+async def get_channel_activity(filters: schemas.StatsFilterParams) -> list[schemas.ChannelActivity]:
+    """Service to fetch the busiest channels of a period."""
+    logger.info(f"Service: Fetching channel activity from {filters.start_date} to {filters.end_date}.")
+    async with AsyncUnitOfWork(readonly=True) as uow:
+        rows = await uow.stats.get_top_channels(*_period(filters), filters.limit)
+    return [
+        schemas.ChannelActivity(channel_id=row.id, name=row.name, username=row.username, messages=row.messages)
+        for row in rows
+    ]
+
+
+async def get_channel_hourly_activity(channel_id: uuid.UUID, filters: schemas.StatsFilterParams) -> list[schemas.HourlyCount]:
+    """Service to fetch one channel's messages per hour."""
+    logger.info(f"Service: Fetching hourly activity of channel {channel_id}.")
+    async with AsyncUnitOfWork(readonly=True) as uow:
+        rows = await uow.stats.get_channel_hourly(channel_id, *_period(filters))
+    return [schemas.HourlyCount(hour=row.hour, messages=row.messages) for row in rows]
+
+
+async def get_tag_volume(filters: schemas.StatsFilterParams) -> list[schemas.TagVolume]:
+    """Service to fetch the message volume per tag."""
+    logger.info(f"Service: Fetching tag volume from {filters.start_date} to {filters.end_date}.")
+    async with AsyncUnitOfWork(readonly=True) as uow:
+        rows = await uow.stats.get_tag_volume(filters.start_date, filters.end_date + datetime.timedelta(days=1))
+    return [schemas.TagVolume(tag_id=row.id, name=row.name, messages=row.messages) for row in rows]
+
+
+async def get_user_match_rates(filters: schemas.StatsFilterParams) -> list[schemas.UserMatchRate]:
+    """Service to fetch the users with the most matches, and their matches per saved message."""
+    logger.info(f"Service: Fetching user match rates from {filters.start_date} to {filters.end_date}.")
+    async with AsyncUnitOfWork(readonly=True) as uow:
+        rows = await uow.stats.get_user_matches(filters.start_date, filters.end_date + datetime.timedelta(days=1), filters.limit)
+        total = await uow.stats.get_total_messages(*_period(filters))
+    return [
+        schemas.UserMatchRate(
+            user_id=row.id,
+            telegram_id=row.telegram_id,
+            full_name=row.full_name,
+            matches=row.matches,
+            match_rate=row.matches / total if total else 0.0,
+        )
+        for row in rows
+    ]
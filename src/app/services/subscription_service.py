@@ -2,14 +2,16 @@
 
 import logging
 import uuid
-from app.repo.unit_of_work import UnitOfWork
+from app.repo.unit_of_work import AsyncUnitOfWork
+from app.repo.pagination import Page
 from app.domain import models, schemas
+from app.services.subscription_snapshot import subscription_snapshot
 from typing import List
 import datetime
 
 logger = logging.getLogger(__name__)
 
-def add_subscription_for_user(user_id: uuid.UUID, query_text: str, tag_names: List[str]) -> models.Subscription:
+async def add_subscription_for_user(user_id: uuid.UUID, query_text: str, tag_names: List[str]) -> models.Subscription:
     """
     Core business logic to create a new subscription for a given user.
     
@@ -22,18 +24,15 @@ def add_subscription_for_user(user_id: uuid.UUID, query_text: str, tag_names: Li
     """
     logger.info(f"Service: Adding subscription '{query_text}' for user_id {user_id}")
 
-    with UnitOfWork() as uow:
+    async with AsyncUnitOfWork() as uow:
         # Create the Pydantic schema for the new subscription
 
         tags_to_add = []
         if tag_names:
-            for tag_name in tag_names:
-                tag = uow.tags.get_or_create_tag(name=tag_name, description="")
-                if tag:
-                    tags_to_add.append(tag)
+            tags_to_add = await uow.tags.get_or_create_tags(tag_names, description="")
         
         else:
-            tag = uow.tags.get_or_create_tag(name="others", description="default tag")
+            tag = await uow.tags.get_or_create_tag(name="others", description="default tag")
                 
         
         sub_schema = schemas.SubscriptionCreate(
@@ -50,19 +49,20 @@ def add_subscription_for_user(user_id: uuid.UUID, query_text: str, tag_names: Li
 
 
         # Flush the session to get the DB-generated defaults (id, created_at, etc.)
-        uow.session.flush()
-        uow.session.refresh(subscription_orm)
+        await uow.session.flush()
+        await uow.session.refresh(subscription_orm)
 
     # The UoW commits automatically upon exiting the 'with' block.
+    subscription_snapshot.invalidate()
     return subscription_orm
 
-def get_user_subscriptions(user_id: uuid.UUID) -> list[schemas.Subscription]:
+async def get_user_subscriptions(user_id: uuid.UUID) -> list[schemas.Subscription]:
     """Service to fetch all active subscriptions for a user, returning Pydantic models."""
     logger.info(f"Service: Fetching subscriptions for user_id {user_id}")
     
-    with UnitOfWork() as uow:
+    async with AsyncUnitOfWork() as uow:
         # Get the list of ORM objects
-        subs_orm = uow.subscriptions.get_active_subscriptions_for_user(user_id)
+        subs_orm = await uow.subscriptions.get_active_subscriptions_for_user(user_id)
         
         # --- THE FIX ---
         # Convert each ORM object into a Pydantic schema WHILE THE SESSION IS OPEN.
@@ -71,7 +71,7 @@ def get_user_subscriptions(user_id: uuid.UUID) -> list[schemas.Subscription]:
     # Return the list of safe, detached Pydantic objects.
     return subs_dto
 
-def cancel_subscription(user_id: uuid.UUID, subscription_id: uuid.UUID) -> bool:
+async def cancel_subscription(user_id: uuid.UUID, subscription_id: uuid.UUID) -> bool:
     """
     Core business logic to cancel a subscription.
     Ensures that the user owns the subscription they are trying to cancel.
@@ -80,9 +80,9 @@ def cancel_subscription(user_id: uuid.UUID, subscription_id: uuid.UUID) -> bool:
         True if cancellation was successful, False otherwise.
     """
     logger.info(f"Service: Attempting to cancel subscription {subscription_id} for user {user_id}")
-    with UnitOfWork() as uow:
+    async with AsyncUnitOfWork() as uow:
         # Step 1: Fetch the subscription by its ID
-        subscription = uow.subscriptions.get_subscription_by_id(subscription_id)
+        subscription = await uow.subscriptions.get_subscription_by_id(subscription_id)
 
         # Step 2: Validate ownership and status
         if not subscription:
@@ -100,10 +100,11 @@ def cancel_subscription(user_id: uuid.UUID, subscription_id: uuid.UUID) -> bool:
         
         # UoW will commit the status change upon exit.
     
+    subscription_snapshot.invalidate()
     return True
 
 
-def edit_subscription(user_id: uuid.UUID, subscription_id: uuid.UUID, new_query_text: str) -> bool:
+async def edit_subscription(user_id: uuid.UUID, subscription_id: uuid.UUID, new_query_text: str) -> bool:
     """
     Core business logic to edit a subscription's query text.
     Ensures the user owns the subscription they are trying to edit.
@@ -117,9 +118,9 @@ def edit_subscription(user_id: uuid.UUID, subscription_id: uuid.UUID, new_query_
         logger.warning("Edit failed: New query text is too short.")
         return False
 
-    with UnitOfWork() as uow:
+    async with AsyncUnitOfWork() as uow:
         # Step 1: Fetch the subscription
-        subscription = uow.subscriptions.get_subscription_by_id(subscription_id)
+        subscription = await uow.subscriptions.get_subscription_by_id(subscription_id)
 
         # Step 2: Validate ownership and status
         if not subscription:
@@ -136,57 +137,50 @@ def edit_subscription(user_id: uuid.UUID, subscription_id: uuid.UUID, new_query_
         uow.subscriptions.update_subscription_query(subscription, new_query_text)
         # UoW will commit the changes upon exit.
     
+    subscription_snapshot.invalidate()
     return True
 
-def get_all_subscriptions_paginated(
+async def get_all_subscriptions_paginated(
     filters: schemas.SubscriptionFilterParams
-) -> tuple[int, list[schemas.SubscriptionResponse]]:
+) -> Page[schemas.SubscriptionResponse]:
     """
     Service to fetch all subscriptions with filtering and pagination.
     Accepts a filter parameter object.
     """
     logger.info("Service: Fetching all paginated subscriptions.")
-    with UnitOfWork() as uow:
-        total, subs_orm = uow.subscriptions.get_paginated_subscriptions(
+    async with AsyncUnitOfWork(readonly=True) as uow:
+        page = await uow.subscriptions.get_paginated_subscriptions(
             filters=filters
         )
-        subs_dto = [schemas.SubscriptionResponse.model_validate(s) for s in subs_orm]
-    return total, subs_dto
+        page.items = [schemas.SubscriptionResponse.model_validate(s) for s in page.items]
+    return page
 
 
 
 # --- NEW SERVICE FUNCTION FOR THE API ---
-def add_tags_to_subscription(sub_id: uuid.UUID, tag_names: list[str]) -> schemas.SubscriptionResponse | None:
+async def add_tags_to_subscription(sub_id: uuid.UUID, tag_names: list[str]) -> schemas.SubscriptionResponse | None:
     """
     Service to add tags to a subscription. It orchestrates both the
     SubscriptionRepo and the TagRepo.
     """
     logger.info(f"Service: Adding tags {tag_names} to subscription {sub_id}")
-    with UnitOfWork() as uow:
+    async with AsyncUnitOfWork() as uow:
         # Step 1: Get the subscription
-        subscription = uow.subscriptions.get_subscription_by_id(sub_id)
+        subscription = await uow.subscriptions.get_subscription_by_id(sub_id)
         if not subscription:
             return None
 
         # Step 2: Get the tag objects
-        tags_to_add = []
         if tag_names:
-            for tag_name in tag_names:
-                tag = uow.tags.get_or_create_tag(tag_name, description="")
-                if tag:
-                    tags_to_add.append(tag)
+            tags_to_add = await uow.tags.get_or_create_tags(tag_names, description="")
         
         else:
             # If no tags were specified, we can add a default tag.
-            tag = uow.tags.get_or_create_tag(name="others", description="Default tag")
-            tags_to_add.append(tag)
+            tags_to_add = [await uow.tags.get_or_create_tag(name="others", description="Default tag")]
 
         # Step 3: Append the new tags
-        for tag in tags_to_add:
-            if tag not in subscription.tags:
-                subscription.tags.append(tag)
-        
-        uow.session.flush()
+        await uow.subscriptions.add_tags(subscription, tags_to_add)
         response_dto = schemas.SubscriptionResponse.model_validate(subscription)
 
+    subscription_snapshot.invalidate()
     return response_dto
@@ -0,0 +1,102 @@
+# src/app/services/subscription_snapshot.py
+
+import asyncio
+import logging
+import time
+
+from app.config.config import settings
+from app.domain import schemas
+from app.repo.unit_of_work import AsyncUnitOfWork
+from app.services.keyword_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionSnapshot:
+    """
+    A resident copy of all active subscriptions plus their compiled KeywordMatcher.
+
+    The matcher reads it for every message. It is rebuilt only when the
+    subscriptions change: `invalidate()` forces a reload on the next read (used
+    by subscription_service in this process), and a cheap version query, run at
+    most every `check_interval` seconds, picks up changes made by other
+    processes such as the bot.
+    """
+    def __init__(
+        self,
+        check_interval: float = settings.SUBSCRIPTION_SNAPSHOT_CHECK_SECONDS,
+        max_age: float = settings.SUBSCRIPTION_SNAPSHOT_MAX_AGE_SECONDS,
+    ):
+        self.check_interval = check_interval
+        self.max_age = max_age
+
+        self.subscriptions: list[schemas.Subscription] = []
+        self.matcher = KeywordMatcher([])
+        self.version: tuple | None = None
+
+        self._dirty = True
+        self._checked_at = 0.0
+        self._loaded_at = 0.0
+        self._lock: asyncio.Lock | None = None
+
+        # --- Metrics ---
+        self.reloads = 0
+        self.version_checks = 0
+
+    def invalidate(self):
+        """Marks the snapshot stale so the next read reloads it. Safe to call from any thread."""
+        self._dirty = True
+
+    async def get(self) -> tuple[list[schemas.Subscription], KeywordMatcher]:
+        """Returns the current subscriptions and matcher, refreshing them first if needed."""
+        now = time.monotonic()
+        if self._dirty or now - self._checked_at >= self.check_interval:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                # Another caller may have refreshed while we waited for the lock.
+                if self._dirty or time.monotonic() - self._checked_at >= self.check_interval:
+                    await self._refresh()
+        return self.subscriptions, self.matcher
+
+    async def _refresh(self):
+        force = self._dirty or time.monotonic() - self._loaded_at >= self.max_age
+        # Clear the flag first: an invalidate() during the reload must trigger another one.
+        self._dirty = False
+
+        try:
+            async with AsyncUnitOfWork() as uow:
+                version = await uow.subscriptions.get_subscriptions_version()
+                self.version_checks += 1
+                if force or version != self.version:
+                    subs_orm = await uow.subscriptions.get_all_active_subscriptions()
+                    subscriptions = [schemas.Subscription.model_validate(sub) for sub in subs_orm]
+                else:
+                    subscriptions = None
+        except Exception:
+            # Keep serving the old snapshot, but make sure the next read tries again.
+            self._dirty = self._dirty or force
+            raise
+
+        self._checked_at = time.monotonic()
+        if subscriptions is None:
+            return
+
+        self.subscriptions = subscriptions
+        self.matcher = KeywordMatcher((sub.id, sub.query_text) for sub in subscriptions)
+        self.version = version
+        self._loaded_at = self._checked_at
+        self.reloads += 1
+        logger.info(f"Matcher: Loaded {len(subscriptions)} active subscriptions ({self.matcher.keyword_count} keywords).")
+
+    def stats(self) -> dict:
+        return {
+            "subscriptions": len(self.subscriptions),
+            "keywords": self.matcher.keyword_count,
+            "reloads": self.reloads,
+            "version_checks": self.version_checks,
+            "seconds_since_reload": time.monotonic() - self._loaded_at if self._loaded_at else None,
+        }
+
+
+subscription_snapshot = SubscriptionSnapshot()
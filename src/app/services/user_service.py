@@ -2,18 +2,19 @@
 
 import logging
 from telegram import User as TelegramUser # Use an alias to avoid name clashes
-from app.repo.unit_of_work import UnitOfWork
+from app.repo.unit_of_work import AsyncUnitOfWork
+from app.repo.pagination import Page
 from app.domain import models, schemas
 import uuid
 logger = logging.getLogger(__name__)
 
-def get_or_create_user(telegram_user: TelegramUser) -> models.User:
+async def get_or_create_user(telegram_user: TelegramUser) -> schemas.User:
     """
     The single, reusable service for getting or creating a user.
     Takes a telegram.User object and returns our database User model.
     """
     logger.info(f"Service: Getting or creating user {telegram_user.id} ({telegram_user.full_name})")
-    
+
     # Create the Pydantic schema from the Telegram User object
     user_schema = schemas.UserCreate(
         telegram_id=telegram_user.id,
@@ -21,45 +22,42 @@ def get_or_create_user(telegram_user: TelegramUser) -> models.User:
         username=telegram_user.username,
     )
 
-    with UnitOfWork() as uow:
-        db_user = uow.users.get_or_create_user(user_schema)
-        # We need to make a copy of the data before the session closes
-        # Using a Pydantic model is the cleanest way.
-        uow.session.flush()
-
+    async with AsyncUnitOfWork() as uow:
+        db_user = await uow.users.get_or_create_user(user_schema)
+        # Using a Pydantic model is the cleanest way to copy the data out of the session.
         user_dto = schemas.User.model_validate(db_user)
 
     # Return the Pydantic model, which is a safe, detached copy of the data.
     return user_dto
 
-def get_all_users_paginated(filters: schemas.UserFilterParams) -> tuple[int, list[schemas.UserResponse]]:
+async def get_all_users_paginated(filters: schemas.UserFilterParams) -> Page[schemas.UserResponse]:
     """
     Get all users with advanced filtering and pagination.
-    Returns a tuple of total count and a list of UserResponse schemas.
+    Returns a Page of UserResponse schemas.
     """
     logger.info(f"Service: Getting all users with filters {filters}")
 
-    with UnitOfWork() as uow:
-        total, users_dto = uow.users.get_all_users_paginated(filters)
+    async with AsyncUnitOfWork(readonly=True) as uow:
+        page = await uow.users.get_all_users_paginated(filters)
 
         # Convert the list of database models to Pydantic schemas
-        users_schemas = [schemas.UserResponse.model_validate(user) for user in users_dto]
+        page.items = [schemas.UserResponse.model_validate(user) for user in page.items]
 
-    return total, users_schemas
+    return page
 
-def delete_user(user_id: uuid.UUID):
+async def delete_user(user_id: uuid.UUID):
     """
     Delete a user by their ID.
     This will soft-delete the user by setting their status to DELETED.
     """
     logger.info(f"Service: Deleting user {user_id}")
 
-    with UnitOfWork() as uow:
-        user = uow.users.get_user_by_id(user_id)
+    async with AsyncUnitOfWork() as uow:
+        user = await uow.users.get_user_by_id(user_id)
         if not user:
             raise ValueError(f"User with ID {user_id} not found")
 
         # Soft delete the user
         user.status = models.Status.DELETED
 
-    return True
\ No newline at end of file
+    return True
@@ -0,0 +1,32 @@
+# src/app/tools/archive_messages.py
+"""
+Moves old messages from Postgres to the Parquet archive (ARCHIVE_DIR) right away,
+instead of waiting for the background archival task.
+
+    python -m app.tools.archive_messages --older-than-days 365
+"""
+
+import argparse
+import datetime
+import json
+import logging
+
+from app.config.config import settings
+from app.services.archive_service import archive_old_messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old messages to Parquet files.")
+    parser.add_argument("--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS, help="Archive messages sent more than this many days ago")
+    args = parser.parse_args()
+    if args.older_than_days <= 0:
+        raise SystemExit("Pass --older-than-days (or set ARCHIVE_AFTER_DAYS) to a positive number of days.")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=args.older_than_days)
+    print(json.dumps(archive_old_messages(cutoff), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# src/app/tools/import_join_requests.py
+"""
+Bulk-imports channels into the join queue from a text file, one identifier per line
+(@username, t.me link or invite link; blank lines and lines starting with '#' are skipped).
+
+    python -m app.tools.import_join_requests join_queue.txt --user-telegram-id 123456 --tags jobs,others
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.config.config import settings
+from app.config.db import async_engine
+from app.domain import schemas
+from app.repo.unit_of_work import AsyncUnitOfWork
+from app.services.join_request_service import import_join_requests
+
+logger = logging.getLogger(__name__)
+
+
+async def run_import(args: argparse.Namespace) -> schemas.JoinImportResult:
+    """The whole import, on one event loop; the engine's connections are closed before it ends."""
+    try:
+        async with AsyncUnitOfWork() as uow:
+            user = await uow.users.get_user_by_telegram_id(args.user_telegram_id)
+            user_id = user.id if user else None
+        if not user_id:
+            raise SystemExit(f"No user with Telegram ID {args.user_telegram_id}; they must /start the bot first.")
+
+        tags = [tag.strip() for tag in args.tags.split(",") if tag.strip()]
+        with open(args.file, encoding="utf-8") as f:
+            return await import_join_requests(f, tags=tags, user_id=user_id, chunk_size=args.chunk_size)
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import channels into the join queue.")
+    parser.add_argument("file", nargs="?", default="join_queue.txt", help="File with one identifier per line")
+    parser.add_argument("--user-telegram-id", type=int, required=True, help="Telegram ID of the user the requests are filed under")
+    parser.add_argument("--tags", default="others", help="Comma-separated tag names for every request")
+    parser.add_argument("--chunk-size", type=int, default=settings.JOIN_IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    result = asyncio.run(run_import(args))
+    print(result.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# tests/conftest.py
+
+import os
+
+# Settings are read at import time. The engines in app.config.db are lazy, so
+# nothing here ever connects to this database.
+os.environ.setdefault("API_ID", "1")
+os.environ.setdefault("API_HASH", "test")
+os.environ.setdefault("DB_URL", "postgresql://test@localhost/test")
+
+import pytest
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+# A Postgres database migrated to head (alembic upgrade head), for the few tests
+# that need the real thing. They are skipped when it is not set.
+TEST_DB_URL = os.environ.get("TEST_DB_URL")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db_session():
+    """An AsyncSession on TEST_DB_URL inside a transaction that is rolled back afterwards."""
+    if not TEST_DB_URL:
+        pytest.skip("TEST_DB_URL is not set")
+    engine = create_async_engine(make_url(TEST_DB_URL).set(drivername="postgresql+asyncpg"))
+    try:
+        async with engine.connect() as connection:
+            transaction = await connection.begin()
+            session = AsyncSession(bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint")
+            try:
+                yield session
+            finally:
+                await session.close()
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
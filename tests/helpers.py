@@ -0,0 +1,24 @@
+# tests/helpers.py
+
+import datetime
+import uuid
+
+from app.domain import schemas
+
+
+def message_filters(**overrides) -> schemas.MessageFilterParams:
+    """MessageFilterParams as the endpoint would build them, with nothing filtered."""
+    common = dict(skip=0, limit=25, search=None, start_date=None, end_date=None, tags=None, cursor=None, count=schemas.CountStrategy.EXACT)
+    specific = dict(channel_id=None, channel_telegram_id=None, message_id=None, search_mode=schemas.SearchMode.WEB, rank=False, highlight=False)
+    for key, value in overrides.items():
+        (common if key in common else specific)[key] = value
+    return schemas.MessageFilterParams(common_filters=schemas.BaseFilterParams(**common), **specific)
+
+
+def utc(*args) -> datetime.datetime:
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc)
+
+
+def uuid_n(n: int) -> uuid.UUID:
+    """A UUID that sorts by `n`."""
+    return uuid.UUID(int=n)
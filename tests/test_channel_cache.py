@@ -0,0 +1,168 @@
+# tests/test_channel_cache.py
+
+import datetime
+import uuid
+
+import pytest
+
+from app.domain import models, schemas
+from app.services import channel_cache, channel_service, message_service
+from app.services.channel_cache import CachedChannel
+
+TELEGRAM_ID = -1001000000001
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    channel_cache.clear()
+    yield
+    channel_cache.clear()
+
+
+def entry(**overrides) -> CachedChannel:
+    fields = dict(id=uuid.UUID(int=1), status=models.Status.ACTIVE, type=models.ChatType.CHANNEL, has_tags=True, name="News", username="news")
+    return CachedChannel(**{**fields, **overrides})
+
+
+def channel(**overrides) -> models.Channel:
+    fields = dict(id=uuid.UUID(int=1), telegram_id=TELEGRAM_ID, name="News", username="news", type=models.ChatType.CHANNEL, status=models.Status.ACTIVE, tags=[models.Tag(id=uuid.UUID(int=9), name="others")])
+    return models.Channel(**{**fields, **overrides})
+
+
+@pytest.mark.parametrize("schema, current", [
+    (schemas.ChannelCreate(telegram_id=TELEGRAM_ID), True),
+    (schemas.ChannelCreate(telegram_id=TELEGRAM_ID, name="News", username="news", type=models.ChatType.CHANNEL), True),
+    (schemas.ChannelCreate(telegram_id=TELEGRAM_ID, name="Renamed"), False),
+    (schemas.ChannelCreate(telegram_id=TELEGRAM_ID, username="other"), False),
+    (schemas.ChannelCreate(telegram_id=TELEGRAM_ID, type=models.ChatType.SUPERGROUP), False),
+])
+def test_is_current_for(schema, current):
+    assert entry().is_current_for(schema) is current
+
+
+def test_an_untagged_channel_is_never_current():
+    # Saving it would attach the default tag.
+    assert not entry(has_tags=False).is_current_for(schemas.ChannelCreate(telegram_id=TELEGRAM_ID))
+
+
+def test_entry_for_copies_the_loaded_channel():
+    cached = channel_cache.entry_for(channel())
+    assert cached == entry()
+    assert channel_cache.get(TELEGRAM_ID) is None
+
+    channel_cache.put(TELEGRAM_ID, cached)
+    assert channel_cache.get(TELEGRAM_ID) is cached
+    channel_cache.invalidate(TELEGRAM_ID)
+    assert channel_cache.get(TELEGRAM_ID) is None
+
+
+# --- Services: invalidation, and caching only what was committed ---
+
+class FakeChannels:
+    upserts = 0
+
+    def __init__(self, stored: models.Channel | None):
+        self.stored = stored
+
+    async def get_channel_by_id(self, channel_id):
+        return self.stored
+
+    async def get_or_create_channel(self, schema):
+        return self.stored
+
+    async def get_or_create_channels(self, schemas):
+        FakeChannels.upserts += 1
+        return [self.stored]
+
+
+class FakeTags:
+    async def get_or_create_tags(self, names, description=""):
+        return [models.Tag(id=uuid.uuid4(), name=name) for name in names]
+
+    async def get_or_create_tag(self, name, description):
+        return models.Tag(id=uuid.uuid4(), name=name)
+
+
+class FakeMessages:
+    async def bulk_create_messages(self, rows):
+        return [
+            models.Message(id=uuid.uuid4(), telegram_message_id=message.telegram_message_id, channel_telegram_id=telegram_id, content=message.content, sent_at=message.sent_at)
+            for message, _, telegram_id in rows
+        ]
+
+
+class FakeStats:
+    async def record_messages(self, messages):
+        pass
+
+
+class FakeSession:
+    async def flush(self):
+        pass
+
+
+class FakeUnitOfWork:
+    """Stands in for AsyncUnitOfWork. With `commit_error` set, leaving the block fails like a failed COMMIT."""
+    stored: models.Channel | None = None
+    commit_error: Exception | None = None
+
+    def __init__(self, readonly: bool = False):
+        self.channels = FakeChannels(self.stored)
+        self.tags = FakeTags()
+        self.messages = FakeMessages()
+        self.stats = FakeStats()
+        self.session = FakeSession()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        if exc_type is None and self.commit_error:
+            raise self.commit_error
+        return False
+
+
+@pytest.fixture
+def uow(monkeypatch):
+    FakeUnitOfWork.stored = channel()
+    FakeUnitOfWork.commit_error = None
+    FakeChannels.upserts = 0
+    monkeypatch.setattr(channel_service, "AsyncUnitOfWork", FakeUnitOfWork)
+    monkeypatch.setattr(message_service, "AsyncUnitOfWork", FakeUnitOfWork)
+    return FakeUnitOfWork
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("change", [
+    lambda: channel_service.add_channel_with_tags(schemas.ChannelCreate(telegram_id=TELEGRAM_ID, name="News"), ["jobs"]),
+    lambda: channel_service.add_tags_to_channel(uuid.UUID(int=1), ["jobs"]),
+    lambda: channel_service.leave_channel(uuid.UUID(int=1)),
+])
+async def test_channel_changes_invalidate_the_entry(uow, change):
+    channel_cache.put(TELEGRAM_ID, entry())
+    assert await change()
+    assert channel_cache.get(TELEGRAM_ID) is None
+
+
+def new_message(n: int, schema: schemas.ChannelCreate) -> tuple[schemas.MessageCreate, schemas.ChannelCreate]:
+    return schemas.MessageCreate(telegram_message_id=n, content="", sent_at=datetime.datetime(2025, 3, 1, tzinfo=datetime.timezone.utc)), schema
+
+
+@pytest.mark.anyio
+async def test_saving_messages_caches_the_channel_after_the_commit(uow):
+    schema = schemas.ChannelCreate(telegram_id=TELEGRAM_ID, name="News")
+    saved = await message_service.save_new_messages([new_message(1, schema)])
+    assert saved[0].telegram_message_id == 1
+    assert channel_cache.get(TELEGRAM_ID) == entry()
+
+    # The next batch takes the channel from the cache.
+    await message_service.save_new_messages([new_message(2, schema)])
+    assert FakeChannels.upserts == 1
+
+
+@pytest.mark.anyio
+async def test_a_failed_commit_caches_nothing(uow):
+    uow.commit_error = RuntimeError("commit failed")
+    with pytest.raises(RuntimeError):
+        await message_service.save_new_messages([new_message(1, schemas.ChannelCreate(telegram_id=TELEGRAM_ID))])
+    assert channel_cache.get(TELEGRAM_ID) is None
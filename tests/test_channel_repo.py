@@ -0,0 +1,45 @@
+# tests/test_channel_repo.py
+
+import uuid
+
+import pytest
+
+from app.domain import models, schemas
+from app.repo.channel_repo import AsyncChannelRepo
+
+
+def new_telegram_id() -> int:
+    return -1_000_000_000_000 - uuid.uuid4().int % 10**12
+
+
+@pytest.mark.anyio
+async def test_upserted_channels_come_with_their_tags_loaded(db_session):
+    repo = AsyncChannelRepo(db_session)
+    tagged, untagged = new_telegram_id(), new_telegram_id()
+    [channel] = await repo.get_or_create_channels([schemas.ChannelCreate(telegram_id=tagged, name="Before")])
+    assert channel.tags == []
+    channel.tags.append(models.Tag(name=f"test-{uuid.uuid4()}"))
+    await db_session.flush()
+    db_session.expunge_all()
+
+    channels = await repo.get_or_create_channels([
+        schemas.ChannelCreate(telegram_id=tagged, name="After"),
+        schemas.ChannelCreate(telegram_id=untagged),
+        schemas.ChannelCreate(telegram_id=tagged, name="After"),
+    ])
+    by_telegram_id = {c.telegram_id: c for c in channels}
+    assert len(channels) == 2
+    # Read without any lazy load: on an AsyncSession that would raise.
+    assert by_telegram_id[tagged].name == "After"
+    assert [tag.name for tag in by_telegram_id[tagged].tags] == [channel.tags[0].name]
+    assert by_telegram_id[untagged].tags == []
+
+
+@pytest.mark.anyio
+async def test_upsert_refreshes_a_channel_already_in_the_session(db_session):
+    repo = AsyncChannelRepo(db_session)
+    telegram_id = new_telegram_id()
+    [channel] = await repo.get_or_create_channels([schemas.ChannelCreate(telegram_id=telegram_id, name="Before")])
+    [again] = await repo.get_or_create_channels([schemas.ChannelCreate(telegram_id=telegram_id, username=f"u{uuid.uuid4().hex[:12]}")])
+    assert again is channel
+    assert channel.name == "Before" and channel.username.startswith("u")
@@ -0,0 +1,132 @@
+# tests/test_ingest_queue.py
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.listener.ingest_queue import IngestQueue
+
+
+def event(n: int) -> SimpleNamespace:
+    return SimpleNamespace(chat_id=-1001000000001, message=SimpleNamespace(id=n))
+
+
+class Handler:
+    """Records the events it handles. Blocks while `gate` is clear; fails on the IDs in `fail`."""
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.handled = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self, event):
+        await self.gate.wait()
+        if event.message.id in self.fail:
+            raise ValueError("bad event")
+        self.handled.append(event.message.id)
+
+
+@pytest.mark.anyio
+async def test_put_before_start_is_refused():
+    with pytest.raises(RuntimeError):
+        await IngestQueue(Handler(), maxsize=1, workers=1).put(event(1))
+
+
+@pytest.mark.anyio
+async def test_full_queue_blocks_put_until_there_is_room():
+    handler = Handler()
+    handler.gate.clear()
+    queue = IngestQueue(handler, maxsize=1, workers=1, enqueue_timeout=5)
+    queue.start()
+    await queue.put(event(1))
+    await asyncio.sleep(0)  # The worker takes 1 and blocks in the handler.
+    await queue.put(event(2))
+
+    blocked = asyncio.create_task(queue.put(event(3)))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    handler.gate.set()
+    assert await blocked is True
+    await queue.stop()
+    assert handler.handled == [1, 2, 3]
+
+
+@pytest.mark.anyio
+async def test_put_drops_the_event_when_the_queue_stays_full():
+    handler = Handler()
+    handler.gate.clear()
+    queue = IngestQueue(handler, maxsize=1, workers=1, enqueue_timeout=0.01)
+    queue.start()
+    assert await queue.put(event(1)) is True
+    await asyncio.sleep(0)
+    assert await queue.put(event(2)) is True
+    assert await queue.put(event(3)) is False
+    assert queue.stats()["dropped"] == 1
+
+    handler.gate.set()
+    await queue.stop()
+    assert handler.handled == [1, 2]
+
+
+@pytest.mark.anyio
+async def test_metrics_track_depth_and_wait():
+    handler = Handler()
+    handler.gate.clear()
+    queue = IngestQueue(handler, maxsize=10, workers=1)
+    queue.start()
+    for n in range(4):
+        await queue.put(event(n))
+    assert queue.depth == 4
+    await asyncio.sleep(0.02)
+    handler.gate.set()
+    await queue.stop()
+
+    stats = queue.stats()
+    assert (stats["depth"], stats["max_depth"], stats["enqueued"], stats["processed"]) == (0, 4, 4, 4)
+    assert stats["max_wait_seconds"] >= 0.02
+    assert 0 < stats["avg_wait_seconds"] <= stats["max_wait_seconds"]
+
+
+@pytest.mark.anyio
+async def test_worker_survives_a_failing_handler():
+    handler = Handler(fail={2})
+    queue = IngestQueue(handler, maxsize=10, workers=1)
+    queue.start()
+    for n in (1, 2, 3):
+        await queue.put(event(n))
+    await queue.stop()
+    assert handler.handled == [1, 3]
+    assert (queue.failed, queue.processed) == (1, 2)
+
+
+@pytest.mark.anyio
+async def test_stop_handles_every_queued_event_first():
+    handler = Handler()
+    handler.gate.clear()
+    queue = IngestQueue(handler, maxsize=100, workers=3)
+    queue.start()
+    for n in range(50):
+        await queue.put(event(n))
+
+    stopping = asyncio.create_task(queue.stop())
+    await asyncio.sleep(0)
+    assert await queue.put(event(99)) is False  # No new events once stop() began.
+    handler.gate.set()
+    await stopping
+    assert sorted(handler.handled) == list(range(50))
+    assert queue.stats()["workers"] == 0
+
+
+@pytest.mark.anyio
+async def test_stop_gives_up_on_workers_after_the_timeout():
+    handler = Handler()
+    handler.gate.clear()
+    queue = IngestQueue(handler, maxsize=10, workers=1)
+    queue.start()
+    for n in range(3):
+        await queue.put(event(n))
+    await queue.stop(timeout=0.01)
+    assert handler.handled == []
+    assert queue.stats()["workers"] == 0
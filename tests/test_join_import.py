@@ -0,0 +1,157 @@
+# tests/test_join_import.py
+
+import uuid
+
+import pytest
+
+from app.domain import models
+from app.repo.join_request_repo import AsyncJoinRequestRepo, _existing_in
+from app.services import join_request_service
+
+USER_ID = uuid.UUID(int=1)
+
+
+class FakeJoinRequests:
+    """Open requests by identifier; matched like the real query (see the database test below)."""
+    def __init__(self, stored: set[str]):
+        self.stored = stored
+        self.lookups: list[list[str]] = []
+        self.created: list[str] = []
+
+    async def find_existing_identifiers(self, identifiers):
+        self.lookups.append(list(identifiers))
+        return _existing_in(identifiers, self.stored)
+
+    async def bulk_create_requests(self, identifiers, tags, user_id):
+        self.created += identifiers
+        self.stored |= set(identifiers)
+        return len(identifiers)
+
+
+class FakeChannels:
+    def __init__(self, usernames: set[str]):
+        self.usernames = usernames
+
+    async def find_existing_usernames(self, usernames):
+        return {u.lower() for u in usernames} & self.usernames
+
+
+class FakeUsers:
+    async def get_user_by_id(self, user_id):
+        return user_id == USER_ID
+
+
+class FakeSession:
+    def __init__(self):
+        self.notifications = 0
+
+    async def execute(self, stmt):
+        self.notifications += 1
+
+
+class FakeUnitOfWork:
+    """Stands in for AsyncUnitOfWork; every instance shares the same fake repositories."""
+    join_requests: FakeJoinRequests
+    channels: FakeChannels
+    users = FakeUsers()
+    session: FakeSession
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def uow(monkeypatch):
+    FakeUnitOfWork.join_requests = FakeJoinRequests({"@Queued", "+AbCdEf"})
+    FakeUnitOfWork.channels = FakeChannels({"joined"})
+    FakeUnitOfWork.session = FakeSession()
+    monkeypatch.setattr(join_request_service, "AsyncUnitOfWork", FakeUnitOfWork)
+    monkeypatch.setattr(join_request_service.join_wakeup, "notify", lambda: None)
+    return FakeUnitOfWork
+
+
+async def run(lines: list[str], chunk_size: int = 1000, user_id: uuid.UUID = USER_ID):
+    return await join_request_service.import_join_requests(lines, tags=["jobs"], user_id=user_id, chunk_size=chunk_size)
+
+
+@pytest.mark.anyio
+async def test_counts_every_kind_of_line(uow):
+    result = await run([
+        "@NewOne",
+        "https://t.me/newtwo",
+        "@newone",  # Same username as the first line
+        "@queued",  # Matches the stored @Queued
+        "https://t.me/+AbCdEf",  # The stored invite
+        "https://t.me/+abcdef",  # Invite hashes are case-sensitive: a different one
+        "@Joined",
+        "",
+        "# a comment",
+        "not an identifier!",
+    ])
+    assert result.model_dump() == {
+        "total": 8, "invalid": 1, "duplicates": 1, "already_requested": 2, "already_joined": 1, "created": 3,
+    }
+    assert uow.join_requests.created == ["@NewOne", "@newtwo", "+abcdef"]
+    assert uow.session.notifications == 1
+
+
+@pytest.mark.anyio
+async def test_reads_the_input_in_chunks(uow):
+    lines = [f"@channel{n}" for n in range(25)] + ["@CHANNEL3"]
+    result = await run(lines, chunk_size=10)
+    # The last chunk is 6 lines, one of them a repeat of an earlier chunk's.
+    assert [len(lookup) for lookup in uow.join_requests.lookups] == [10, 10, 5]
+    assert (result.total, result.duplicates, result.created) == (26, 1, 25)
+    assert uow.session.notifications == 3
+
+
+@pytest.mark.anyio
+async def test_consumes_the_input_lazily(uow):
+    consumed = 0
+    consumed_at_lookup = []
+
+    def lines():
+        nonlocal consumed
+        for n in range(5):
+            consumed += 1
+            yield f"@channel{n}"
+
+    find = uow.join_requests.find_existing_identifiers
+
+    async def find_existing_identifiers(identifiers):
+        consumed_at_lookup.append(consumed)
+        return await find(identifiers)
+
+    uow.join_requests.find_existing_identifiers = find_existing_identifiers
+    await run(lines(), chunk_size=2)
+    assert consumed_at_lookup == [2, 4, 5]
+
+
+@pytest.mark.anyio
+async def test_unknown_user_imports_nothing(uow):
+    assert await run(["@NewOne"], user_id=uuid.UUID(int=2)) is None
+    assert uow.join_requests.created == []
+
+
+# --- Against the database ---
+
+@pytest.mark.anyio
+async def test_existing_requests_match_usernames_case_insensitively(db_session):
+    user = models.User(telegram_id=uuid.uuid4().int % 2**62, full_name="Test")
+    db_session.add(user)
+    await db_session.flush()
+    suffix = uuid.uuid4().hex[:8]
+    repo = AsyncJoinRequestRepo(db_session)
+    await repo.bulk_create_requests([f"@Foo{suffix}", f"Invite{suffix}"], ["jobs"], user.id)
+    await repo.bulk_create_requests([f"@failed{suffix}"], ["jobs"], user.id)
+    await db_session.execute(
+        models.ChannelJoinRequest.__table__.update()
+        .where(models.ChannelJoinRequest.identifier == f"@failed{suffix}")
+        .values(status=models.JoinRequestStatus.FAILED)
+    )
+
+    found = await repo.find_existing_identifiers([f"@foo{suffix}", f"@FOO{suffix}", f"invite{suffix}", f"Invite{suffix}", f"@failed{suffix}"])
+    assert found == {f"@foo{suffix}", f"@FOO{suffix}", f"Invite{suffix}"}
@@ -0,0 +1,87 @@
+# tests/test_join_scheduler.py
+
+from types import SimpleNamespace
+
+import pytest
+from telethon.errors import FloodWaitError
+from telethon.tl.functions.channels import JoinChannelRequest
+
+from app.core import rate_limit
+from app.core.listener import join_scheduler
+from app.core.listener.join_scheduler import JOIN, JoinDeferred, JoinScheduler, MethodBudget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    # Only these modules see the fake clock; asyncio keeps the real one.
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=clock))
+    monkeypatch.setattr(join_scheduler, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_flood_wait_halves_the_rate_down_to_a_floor(clock):
+    budget = MethodBudget("join", per_hour=3600, burst=1)
+    budget.on_flood_wait(60)
+    assert budget.per_hour == pytest.approx(1800)
+    assert budget.bucket.paused_for == 60
+    for _ in range(10):
+        budget.on_flood_wait(1)
+    assert budget.per_hour == pytest.approx(3600 / 16)
+    assert budget.flood_waits == 11
+
+
+def test_successes_win_the_rate_back_up_to_the_maximum(clock):
+    budget = MethodBudget("join", per_hour=3600, burst=1)
+    budget.on_flood_wait(1)
+    for _ in range(100):
+        budget.on_success()
+    assert budget.per_hour == pytest.approx(3600)
+    assert budget.calls == 100
+
+
+class FakeClient:
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.requests = []
+
+    async def __call__(self, request, flood_sleep_threshold=None):
+        self.requests.append((request, flood_sleep_threshold))
+        if self.error:
+            raise self.error
+        return "ok"
+
+
+@pytest.mark.anyio
+async def test_call_defers_instead_of_waiting_past_the_deadline(clock):
+    scheduler = JoinScheduler(max_inline_wait=3600)
+    client = FakeClient()
+    request = JoinChannelRequest(channel="test")
+
+    burst = int(scheduler.budgets[JOIN].bucket.capacity)
+    for _ in range(burst):
+        assert await scheduler.call(client, request) == "ok"
+    with pytest.raises(JoinDeferred) as deferred:
+        await scheduler.call(client, request, deadline=clock.now + 1)
+    assert deferred.value.budget == JOIN
+    assert len(client.requests) == burst
+    assert client.requests[0][1] == 0
+
+
+@pytest.mark.anyio
+async def test_call_turns_a_flood_wait_into_join_deferred(clock):
+    scheduler = JoinScheduler()
+    client = FakeClient(FloodWaitError(request=None, capture=120))
+
+    with pytest.raises(JoinDeferred) as deferred:
+        await scheduler.call(client, JoinChannelRequest(channel="test"))
+    assert deferred.value.retry_after == 120
+    assert scheduler.budgets[JOIN].bucket.paused_for == 120
@@ -0,0 +1,44 @@
+# tests/test_keyword_matcher.py
+
+import random
+
+from app.services.keyword_matcher import AhoCorasick, KeywordMatcher
+
+
+def naive_match(queries: list[tuple[str, str]], text: str) -> set[str]:
+    return {owner for owner, query_text in queries if any(k in text.lower() for k in query_text.lower().split())}
+
+
+def test_find_reports_every_pattern_including_overlaps():
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+    found = {automaton.patterns[i] for i in automaton.find("ushers")}
+    assert found == {"he", "she", "hers"}
+
+
+def test_find_skips_empty_patterns():
+    automaton = AhoCorasick(["", "a"])
+    assert automaton.patterns == ["a"]
+    assert automaton.find("") == set()
+
+
+def test_match_is_case_insensitive_substring_of_any_keyword():
+    matcher = KeywordMatcher([("jobs", "Python Django"), ("rust", "RUST"), ("none", "kotlin")])
+    assert matcher.match("Hiring a DJANGO developer, trusted team") == {"jobs", "rust"}
+    assert matcher.match("") == set()
+
+
+def test_shared_keywords_are_stored_once():
+    matcher = KeywordMatcher([(1, "go python"), (2, "Python"), (3, "")])
+    assert matcher.keyword_count == 2
+    assert matcher.match("pythonic") == {1, 2}
+
+
+def test_match_agrees_with_the_naive_definition():
+    rng = random.Random(7)
+    alphabet = "abcAB "
+    words = ["".join(rng.choice("abcAB") for _ in range(rng.randint(1, 4))) for _ in range(40)]
+    queries = [(i, " ".join(rng.sample(words, rng.randint(1, 3)))) for i in range(60)]
+    matcher = KeywordMatcher(queries)
+    for _ in range(300):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert matcher.match(text) == naive_match(queries, text), text
@@ -0,0 +1,81 @@
+# tests/test_match_counter.py
+
+import datetime
+import uuid
+
+import pytest
+
+from app.services import match_counter
+from app.services.match_counter import MatchCounter
+
+
+class FakeStats:
+    def __init__(self, error: Exception | None):
+        self.error = error
+        self.recorded = []
+
+    async def record_matches(self, counts):
+        if self.error:
+            raise self.error
+        self.recorded.append(dict(counts))
+
+
+class FakeUnitOfWork:
+    """Stands in for AsyncUnitOfWork; every instance shares `stats`."""
+    stats: FakeStats
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    FakeUnitOfWork.stats = FakeStats(error=None)
+    monkeypatch.setattr(match_counter, "AsyncUnitOfWork", FakeUnitOfWork)
+    return FakeUnitOfWork.stats
+
+
+SUBSCRIPTION = uuid.UUID(int=1)
+MONDAY = datetime.datetime(2025, 3, 3, 10, tzinfo=datetime.timezone.utc)
+
+
+@pytest.mark.anyio
+async def test_flush_writes_counts_per_utc_day(stats):
+    counter = MatchCounter()
+    counter.add(SUBSCRIPTION, MONDAY)
+    counter.add(SUBSCRIPTION, MONDAY)
+    # 01:00 on Tuesday in UTC+3 is still Monday in UTC.
+    counter.add(SUBSCRIPTION, datetime.datetime(2025, 3, 4, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=3))))
+    await counter.flush()
+
+    assert stats.recorded == [{(SUBSCRIPTION, MONDAY.date()): 3}]
+    assert counter.stats() == {"pending": 0, "counted": 3, "flushes": 1, "failed_flushes": 0}
+
+
+@pytest.mark.anyio
+async def test_flush_without_counts_does_nothing(stats):
+    counter = MatchCounter()
+    await counter.flush()
+    assert stats.recorded == []
+    assert counter.flushes == 0
+
+
+@pytest.mark.anyio
+async def test_failed_flush_keeps_the_counts_for_the_next_one(stats):
+    counter = MatchCounter()
+    counter.add(SUBSCRIPTION, MONDAY)
+    stats.error = RuntimeError("database is down")
+    with pytest.raises(RuntimeError):
+        await counter.flush()
+    assert counter.stats()["pending"] == 1
+    assert counter.failed_flushes == 1
+
+    # Counted while the flush was failing; merged with the kept ones.
+    counter.add(SUBSCRIPTION, MONDAY)
+    stats.error = None
+    await counter.flush()
+    assert stats.recorded == [{(SUBSCRIPTION, MONDAY.date()): 2}]
+    assert counter.stats()["pending"] == 0
@@ -0,0 +1,161 @@
+# tests/test_message_archive.py
+
+import datetime
+import uuid
+
+import pytest
+
+from app.domain.schemas import CountStrategy, SearchMode
+from app.repo.message_archive import MessageArchive
+from helpers import message_filters, utc, uuid_n
+
+MARCH = utc(2025, 3, 1)
+APRIL = utc(2025, 4, 1)
+CHANNELS = (-1001000000001, -1001000000002)
+JOBS = {"id": uuid_n(900), "name": "jobs"}
+
+
+def archive_row(n: int, channel_telegram_id: int, sent_at: datetime.datetime, content: str, tags=()) -> dict:
+    return {
+        "id": uuid_n(n),
+        "telegram_message_id": n,
+        "channel_id": None,
+        "channel_telegram_id": channel_telegram_id,
+        "content": content,
+        "sent_at": sent_at,
+        "created_at": sent_at,
+        "tags": list(tags),
+    }
+
+
+@pytest.fixture
+def rows() -> list[dict]:
+    # Each pair of messages shares a sent_at, one per channel, so the id has to break the tie.
+    rows = []
+    for n in range(40):
+        channel = CHANNELS[n % 2]
+        sent_at = MARCH + datetime.timedelta(hours=17 * (n // 2))
+        rows.append(archive_row(n + 1, channel, sent_at, f"Message {n} about {'python' if n % 3 else 'Rust'}", [JOBS] if n % 4 == 0 else []))
+    return rows
+
+
+@pytest.fixture
+def archive(tmp_path, rows) -> MessageArchive:
+    archive = MessageArchive(tmp_path)
+    # One batch per channel, sorted like the real export, so each becomes a row group.
+    batches = [sorted((r for r in rows if r["channel_telegram_id"] == c), key=lambda r: r["sent_at"]) for c in CHANNELS]
+    archive.write(MARCH, APRIL, batches)
+    return archive
+
+
+def newest_first(rows: list[dict]) -> list[uuid.UUID]:
+    return [r["id"] for r in sorted(rows, key=lambda r: (r["sent_at"], r["id"]), reverse=True)]
+
+
+def read_all(archive: MessageArchive, filters, page_size: int) -> list[uuid.UUID]:
+    ids, cursor = [], None
+    while True:
+        page = archive.find_messages(filters, cursor, page_size).items
+        ids += [m.id for m in page]
+        if len(page) < page_size:
+            return ids
+        cursor = (page[-1].sent_at, page[-1].id)
+
+
+def test_write_marks_the_file_pending(archive, tmp_path):
+    [path] = archive.pending_files()
+    assert path.parent.name == "month=2025-03"
+    assert not list(tmp_path.rglob("*.tmp"))
+    archive.mark_done(path)
+    assert archive.pending_files() == []
+    assert archive.months() == [datetime.date(2025, 3, 1)]
+
+
+def test_id_chunks_cover_every_row(archive, rows):
+    [path] = archive.pending_files()
+    chunks = list(archive.id_chunks(path))
+    assert len(chunks) == len(CHANNELS)
+    assert sorted(i for ids, _, _ in chunks for i in ids) == sorted(r["id"] for r in rows)
+
+
+def test_round_trip_keeps_every_field(archive, rows):
+    [message] = archive.find_messages(message_filters(start_date=MARCH.date(), message_id=uuid_n(1)), None, 5).items
+    assert (message.id, message.telegram_message_id, message.channel_telegram_id) == (uuid_n(1), 1, CHANNELS[0])
+    assert message.content == rows[0]["content"]
+    assert message.sent_at == rows[0]["sent_at"]
+    assert [tag.name for tag in message.tags] == ["jobs"]
+    assert message.clickable_link == "https://t.me/c/1000000001/1"
+
+
+@pytest.mark.parametrize("page_size", [1, 3, 7, 100])
+def test_cursor_pages_list_everything_newest_first(archive, rows, page_size):
+    assert read_all(archive, message_filters(start_date=MARCH.date()), page_size) == newest_first(rows)
+
+
+@pytest.mark.parametrize("filters, keep", [
+    (dict(channel_telegram_id=CHANNELS[1]), lambda r: r["channel_telegram_id"] == CHANNELS[1]),
+    (dict(end_date=datetime.date(2025, 3, 10)), lambda r: r["sent_at"] < utc(2025, 3, 11)),
+    (dict(start_date=datetime.date(2025, 3, 10)), lambda r: r["sent_at"] >= utc(2025, 3, 10)),
+    (dict(search="RUST message"), lambda r: "Rust" in r["content"]),
+    (dict(search="about python", search_mode=SearchMode.PHRASE), lambda r: "about python" in r["content"]),
+    (dict(tags=["jobs", "news"]), lambda r: bool(r["tags"])),
+    (dict(tags=["news"]), lambda r: False),
+])
+def test_filters_and_exact_totals(archive, rows, filters, keep):
+    filters = message_filters(**{"start_date": MARCH.date(), **filters})
+    expected = newest_first([r for r in rows if keep(r)])
+    result = archive.find_messages(filters, None, 5)
+    assert [m.id for m in result.items] == expected[:5]
+    assert result.total == len(expected)
+    assert read_all(archive, filters, 4) == expected
+
+
+def test_count_strategies(archive, rows):
+    march_10 = dict(start_date=datetime.date(2025, 3, 10), end_date=datetime.date(2025, 3, 31))
+    exact = sum(r["sent_at"] >= utc(2025, 3, 10) for r in rows)
+    assert archive.find_messages(message_filters(**march_10, count=CountStrategy.CACHED), None, 1).total == exact
+    assert archive.find_messages(message_filters(**march_10, count=CountStrategy.NONE), None, 1).total is None
+    # Every row group straddles March 10th, so the estimate counts them whole.
+    assert archive.find_messages(message_filters(**march_10, count=CountStrategy.ESTIMATED), None, 1).total == len(rows)
+
+
+def test_months_outside_the_archive_find_nothing(archive):
+    filters = message_filters(start_date=datetime.date(2025, 4, 1))
+    assert not archive.overlaps(filters.start_date, None)
+    assert archive.overlaps(None, datetime.date(2025, 3, 1))
+    assert not archive.overlaps(None, None)
+    result = archive.find_messages(filters, None, 5)
+    assert (result.items, result.total) == ([], 0)
+
+
+def test_write_without_rows_returns_none(tmp_path):
+    archive = MessageArchive(tmp_path)
+    assert archive.write(MARCH, APRIL, iter([])) is None
+    assert archive.pending_files() == []
+    assert not list(tmp_path.rglob("*.parquet*"))
+
+
+def test_failed_write_leaves_nothing_behind(tmp_path, rows):
+    def batches():
+        yield rows[:10]
+        raise RuntimeError("connection lost")
+
+    archive = MessageArchive(tmp_path)
+    with pytest.raises(RuntimeError):
+        archive.write(MARCH, APRIL, batches())
+    assert not list(tmp_path.rglob("*.parquet*"))
+
+
+def test_rewriting_a_range_gets_a_new_file(archive, rows):
+    second = archive.write(MARCH, APRIL, [rows[:1]])
+    assert second.name.endswith("-2.parquet")
+    assert len(archive.pending_files()) == 2
+
+
+def test_marker_without_a_file_is_dropped(tmp_path):
+    archive = MessageArchive(tmp_path)
+    marker = tmp_path / "messages" / "month=2025-03" / "part-x.parquet.pending"
+    marker.parent.mkdir(parents=True)
+    marker.touch()
+    assert archive.pending_files() == []
+    assert not marker.exists()
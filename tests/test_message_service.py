@@ -0,0 +1,127 @@
+# tests/test_message_service.py
+
+import datetime
+
+import pytest
+
+from app.repo.message_archive import ArchiveMatches, ArchivedMessage
+from app.repo.message_repo import MESSAGE_KEYSET
+from app.repo.pagination import Page
+from app.services import message_service
+from helpers import message_filters, utc, uuid_n
+
+CHANNEL_TELEGRAM_ID = -1001000000001
+
+
+def newest_first(messages: list, cursor: tuple | None, limit: int) -> list:
+    messages = sorted(messages, key=lambda m: (m.sent_at, m.id), reverse=True)
+    if cursor:
+        messages = [m for m in messages if (m.sent_at, m.id) < cursor]
+    return messages[:limit]
+
+
+class FakeMessages:
+    """The database side: message rows as the repository returns them."""
+    def __init__(self, messages: list[ArchivedMessage], total: int | None):
+        self.messages = messages
+        self.total = total
+
+    async def get_paginated_messages(self, filters) -> Page:
+        assert filters.skip == 0
+        cursor = tuple(MESSAGE_KEYSET.decode(filters.cursor)) if filters.cursor else None
+        rows = newest_first(self.messages, cursor, filters.limit + 1)
+        next_cursor = MESSAGE_KEYSET.encode(rows[filters.limit - 1]) if len(rows) > filters.limit else None
+        items = [
+            {"id": m.id, "telegram_message_id": m.telegram_message_id, "content": m.content, "sent_at": m.sent_at, "clickable_link": m.clickable_link, "tags": []}
+            for m in rows[:filters.limit]
+        ]
+        return Page(total=self.total, items=items, next_cursor=next_cursor)
+
+
+class FakeChannels:
+    async def get_channels_by_ids(self, ids):
+        return []
+
+
+class FakeUnitOfWork:
+    def __init__(self, messages: FakeMessages):
+        self.messages = messages
+        self.channels = FakeChannels()
+
+
+class FakeArchive:
+    def __init__(self, messages: list[ArchivedMessage], total: int | None):
+        self.messages = messages
+        self.total = total
+
+    def find_messages(self, filters, cursor, limit) -> ArchiveMatches:
+        return ArchiveMatches(total=self.total, items=newest_first(self.messages, cursor, limit))
+
+
+def message(n: int, sent_at: datetime.datetime, content: str = "") -> ArchivedMessage:
+    return ArchivedMessage(
+        id=uuid_n(n),
+        telegram_message_id=n,
+        channel_id=None,
+        channel_telegram_id=CHANNEL_TELEGRAM_ID,
+        content=content,
+        sent_at=sent_at,
+    )
+
+
+# Recent messages in Postgres, older ones archived, with message 10 in both while its file is pending.
+DB_MESSAGES = [message(n, utc(2025, 3, n)) for n in range(10, 20)]
+ARCHIVED_MESSAGES = [message(n, utc(2025, 3, n), "archived") for n in range(1, 11)]
+ALL_IDS = [uuid_n(n) for n in range(19, 0, -1)]
+
+
+def setup(monkeypatch, db_total: int | None = 10, archive_total: int | None = 10) -> FakeUnitOfWork:
+    monkeypatch.setattr(message_service, "message_archive", FakeArchive(ARCHIVED_MESSAGES, archive_total))
+    return FakeUnitOfWork(FakeMessages(DB_MESSAGES, db_total))
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("limit", [1, 4, 10, 25])
+async def test_cursor_pages_merge_both_sources_newest_first(monkeypatch, limit):
+    uow = setup(monkeypatch)
+    ids, cursor = [], None
+    while True:
+        page = await message_service._paginate_with_archive(uow, message_filters(limit=limit, cursor=cursor))
+        ids += [m.id for m in page.items]
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert ids == ALL_IDS
+
+
+@pytest.mark.anyio
+async def test_skip_pages_merge_both_sources(monkeypatch):
+    uow = setup(monkeypatch)
+    page = await message_service._paginate_with_archive(uow, message_filters(skip=8, limit=4))
+    assert [m.id for m in page.items] == ALL_IDS[8:12]
+    assert page.next_cursor == MESSAGE_KEYSET.encode(page.items[-1])
+
+    last = await message_service._paginate_with_archive(uow, message_filters(skip=16, limit=4))
+    assert [m.id for m in last.items] == ALL_IDS[16:]
+    assert last.next_cursor is None
+
+
+@pytest.mark.anyio
+async def test_database_copy_wins_over_the_archived_one(monkeypatch):
+    uow = setup(monkeypatch)
+    page = await message_service._paginate_with_archive(uow, message_filters(skip=9, limit=1))
+    [item] = page.items
+    assert item.id == uuid_n(10)
+    assert item.content == ""
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("db_total, archive_total, expected", [
+    (10, 10, 20),
+    (None, 10, None),
+    (10, None, None),
+])
+async def test_totals_are_summed(monkeypatch, db_total, archive_total, expected):
+    uow = setup(monkeypatch, db_total, archive_total)
+    page = await message_service._paginate_with_archive(uow, message_filters())
+    assert page.total == expected
@@ -0,0 +1,230 @@
+# tests/test_message_writer.py
+
+import asyncio
+import datetime
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.listener import event_handler, message_writer
+from app.core.listener.message_writer import MessageBatchWriter
+from app.domain import schemas
+
+CHANNEL = schemas.ChannelCreate(telegram_id=-1001000000001, name="Test")
+SENT_AT = datetime.datetime(2025, 3, 1, tzinfo=datetime.timezone.utc)
+
+
+def item(n: int) -> tuple[schemas.MessageCreate, schemas.ChannelCreate]:
+    return schemas.MessageCreate(telegram_message_id=n, content=f"message {n}", sent_at=SENT_AT), CHANNEL
+
+
+class FakeStore:
+    """
+    Stands in for save_new_messages: keeps the messages by (chat, message) ID like
+    the unique constraint does, and fails any batch holding one of the `bad` IDs.
+    """
+    def __init__(self, bad=()):
+        self.bad = set(bad)
+        self.batches: list[list[int]] = []
+        self.stored: dict[tuple[int, int], schemas.Message] = {}
+
+    async def __call__(self, items):
+        ids = [message.telegram_message_id for message, _ in items]
+        self.batches.append(ids)
+        if self.bad & set(ids):
+            raise ValueError("invalid row")
+        results = []
+        for message, channel in items:
+            key = (channel.telegram_id, message.telegram_message_id)
+            if key in self.stored:
+                results.append(None)
+                continue
+            self.stored[key] = schemas.Message(
+                id=uuid.uuid4(),
+                telegram_message_id=message.telegram_message_id,
+                content=message.content,
+                sent_at=message.sent_at,
+                clickable_link="",
+            )
+            results.append(self.stored[key])
+        return results
+
+
+@pytest.fixture
+def store(monkeypatch) -> FakeStore:
+    store = FakeStore()
+    monkeypatch.setattr(message_writer, "save_new_messages", store)
+    message_writer.seen_messages.clear()
+    yield store
+    message_writer.seen_messages.clear()
+
+
+class Persisted:
+    def __init__(self):
+        self.ids: list[int] = []
+
+    async def __call__(self, message, channel):
+        self.ids.append(message.telegram_message_id)
+
+
+async def submit_all(writer: MessageBatchWriter, ids):
+    for n in ids:
+        await writer.submit(*item(n))
+
+
+@pytest.mark.anyio
+async def test_a_full_batch_is_written_without_waiting(store):
+    writer = MessageBatchWriter(Persisted(), max_batch=3, max_delay_ms=60_000)
+    writer.start()
+    await submit_all(writer, range(7))
+    await asyncio.sleep(0.01)
+    assert store.batches == [[0, 1, 2], [3, 4, 5]]
+    await writer.stop()
+    assert store.batches[-1] == [6]
+
+
+@pytest.mark.anyio
+async def test_a_partial_batch_is_written_after_the_delay(store):
+    writer = MessageBatchWriter(Persisted(), max_batch=100, max_delay_ms=20)
+    writer.start()
+    await submit_all(writer, [1, 2])
+    await asyncio.sleep(0.1)
+    assert store.batches == [[1, 2]]
+    await writer.stop()
+
+
+@pytest.mark.anyio
+async def test_stop_writes_everything_submitted(store):
+    writer = MessageBatchWriter(Persisted(), max_batch=4, max_delay_ms=60_000)
+    writer.start()
+    await submit_all(writer, range(10))
+    await writer.stop()
+    assert sorted(n for batch in store.batches for n in batch) == list(range(10))
+    with pytest.raises(RuntimeError):
+        await writer.submit(*item(11))
+
+
+@pytest.mark.anyio
+async def test_a_failed_batch_is_retried_one_message_at_a_time(store):
+    store.bad = {2}
+    persisted = Persisted()
+    writer = MessageBatchWriter(persisted, max_batch=3, max_delay_ms=60_000)
+    writer.start()
+    await submit_all(writer, [1, 2, 3])
+    await writer.stop()
+
+    assert store.batches == [[1, 2, 3], [1], [2], [3]]
+    assert persisted.ids == [1, 3]
+    assert writer.stats()["failed"] == 1
+
+
+@pytest.mark.anyio
+async def test_only_newly_inserted_messages_are_handed_on(store):
+    persisted = Persisted()
+    writer = MessageBatchWriter(persisted, max_batch=10, max_delay_ms=60_000)
+    writer.start()
+    await submit_all(writer, [1, 2, 2, 3, 1])
+    await writer.stop()
+
+    assert persisted.ids == [1, 2, 3]
+    assert (writer.messages, writer.duplicates) == (3, 2)
+
+
+@pytest.mark.anyio
+async def test_a_failing_handler_does_not_stop_the_others(store):
+    handled = []
+
+    async def on_persisted(message, channel):
+        handled.append(message.telegram_message_id)
+        if message.telegram_message_id == 1:
+            raise RuntimeError("notifier down")
+
+    writer = MessageBatchWriter(on_persisted, max_batch=10, max_delay_ms=60_000)
+    writer.start()
+    await submit_all(writer, [1, 2])
+    await writer.stop()
+    assert handled == [1, 2]
+
+
+# --- Re-delivered updates (seen_messages) ---
+
+class FakeClient:
+    """Captures the handler setup_event_handlers registers."""
+    def on(self, event_builder):
+        def register(handler):
+            self.handler = handler
+            return handler
+        return register
+
+
+class FakeIngestQueue:
+    def __init__(self):
+        self.events = []
+
+    async def put(self, event):
+        self.events.append(event.message.id)
+        return True
+
+
+@pytest.fixture
+def trigger(monkeypatch):
+    """The NewMessage handler, wired to a fake ingest queue (available as trigger.queue)."""
+    queue = FakeIngestQueue()
+    monkeypatch.setattr(event_handler, "ingest_queue", queue)
+    client = FakeClient()
+    event_handler.setup_event_handlers(client)
+
+    async def deliver(n: int):
+        await client.handler(SimpleNamespace(chat_id=CHANNEL.telegram_id, message=SimpleNamespace(id=n), raw_text=""))
+
+    deliver.queue = queue
+    return deliver
+
+
+@pytest.mark.anyio
+async def test_the_same_message_twice_is_stored_and_handed_on_once(store, trigger):
+    persisted = Persisted()
+    writer = MessageBatchWriter(persisted, max_batch=10, max_delay_ms=60_000)
+    writer.start()
+    await submit_all(writer, [1])
+    await writer.stop()
+    writer.start()
+    await submit_all(writer, [1])
+    await writer.stop()
+
+    assert list(store.stored) == [(CHANNEL.telegram_id, 1)]
+    assert persisted.ids == [1]
+    assert writer.duplicates == 1
+
+    # A re-delivered update for it never reaches the queue.
+    await trigger(1)
+    await trigger(2)
+    assert trigger.queue.events == [2]
+
+
+@pytest.mark.anyio
+async def test_a_message_is_not_seen_before_it_is_stored(store, trigger):
+    store.bad = {1}
+    # Receiving an update does not mark it; only the write does.
+    await trigger(1)
+    await trigger(1)
+    assert trigger.queue.events == [1, 1]
+
+    writer = MessageBatchWriter(Persisted(), max_batch=10, max_delay_ms=60_000)
+    writer.start()
+    await submit_all(writer, [1])
+    await asyncio.sleep(0.01)
+    assert message_writer.seen_messages.get((CHANNEL.telegram_id, 1)) is None
+    await writer.stop()
+
+    # The store failed, so a re-delivery must get another chance.
+    assert message_writer.seen_messages.get((CHANNEL.telegram_id, 1)) is None
+    await trigger(1)
+    assert trigger.queue.events == [1, 1, 1]
+
+    store.bad = set()
+    writer.start()
+    await submit_all(writer, [1])
+    await writer.stop()
+    assert message_writer.seen_messages.get((CHANNEL.telegram_id, 1)) is True
@@ -0,0 +1,143 @@
+# tests/test_pagination.py
+
+import datetime
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+
+from app.domain import models
+from app.domain.schemas import CountStrategy
+from app.repo import pagination
+from app.repo.channel_repo import CHANNEL_KEYSET
+from app.repo.message_repo import MESSAGE_KEYSET
+from app.repo.pagination import InvalidCursor, count_rows
+
+
+def message_row(sent_at: datetime.datetime, n: int = 1) -> SimpleNamespace:
+    return SimpleNamespace(sent_at=sent_at, id=uuid.UUID(int=n))
+
+
+def compile_sql(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+# --- Keyset ---
+
+def test_message_cursor_round_trips():
+    row = message_row(datetime.datetime(2025, 3, 1, 12, 30, tzinfo=datetime.timezone.utc))
+    cursor = MESSAGE_KEYSET.encode(row)
+    assert "=" not in cursor
+    assert MESSAGE_KEYSET.decode(cursor) == [row.sent_at, row.id]
+
+
+def test_channel_cursor_encodes_a_missing_name_as_empty():
+    row = SimpleNamespace(name=None, id=uuid.uuid4())
+    assert CHANNEL_KEYSET.decode(CHANNEL_KEYSET.encode(row)) == ["", row.id]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    "bm90IGpzb24",  # "not json"
+    CHANNEL_KEYSET.encode(SimpleNamespace(name="a", id=uuid.UUID(int=1))),  # Another listing's cursor
+    MESSAGE_KEYSET.encode(SimpleNamespace(sent_at="yesterday", id=uuid.UUID(int=1))),
+    MESSAGE_KEYSET.encode(SimpleNamespace(sent_at="2025-03-01T00:00:00", id="not-a-uuid")),
+])
+def test_decode_rejects_invalid_message_cursors(cursor):
+    with pytest.raises(InvalidCursor):
+        MESSAGE_KEYSET.decode(cursor)
+
+
+def test_decode_rejects_values_of_the_wrong_type():
+    with pytest.raises(InvalidCursor):
+        CHANNEL_KEYSET.decode(CHANNEL_KEYSET.encode(SimpleNamespace(name=5, id=uuid.UUID(int=1))))
+
+
+def test_after_descending_also_bounds_the_leading_column():
+    sql = compile_sql(MESSAGE_KEYSET.after(MESSAGE_KEYSET.encode(message_row(datetime.datetime(2025, 3, 1, tzinfo=datetime.timezone.utc)))))
+    assert sql == (
+        "(messages.sent_at, messages.id) < ('2025-03-01 00:00:00+00:00', '00000000-0000-0000-0000-000000000001') "
+        "AND messages.sent_at <= '2025-03-01 00:00:00+00:00'"
+    )
+
+
+def test_after_ascending_compares_nullable_strings_through_coalesce():
+    sql = compile_sql(CHANNEL_KEYSET.after(CHANNEL_KEYSET.encode(SimpleNamespace(name="b", id=uuid.UUID(int=1)))))
+    assert sql == (
+        "(coalesce(channels.name, ''), channels.id) > ('b', '00000000-0000-0000-0000-000000000001') "
+        "AND coalesce(channels.name, '') >= 'b'"
+    )
+
+
+# --- count_rows ---
+
+class FakeSession:
+    """Answers every scalar() with the next count, and compiles for Postgres without connecting."""
+    def __init__(self, *counts: int):
+        self.counts = list(counts)
+        self.queries = 0
+        self.bind = create_engine("postgresql+psycopg2://test@localhost/test")
+
+    def scalar(self, stmt):
+        self.queries += 1
+        return self.counts.pop(0)
+
+    def get_bind(self):
+        return self.bind
+
+
+@pytest.fixture(autouse=True)
+def empty_count_cache():
+    pagination._count_cache.clear()
+    yield
+    pagination._count_cache.clear()
+
+
+def channel_query(name: str = "test"):
+    return select(models.Channel).where(models.Channel.name == name)
+
+
+def test_none_runs_no_query():
+    session = FakeSession()
+    assert count_rows(session, channel_query(), CountStrategy.NONE) == (None, CountStrategy.NONE)
+    assert session.queries == 0
+
+
+def test_exact_counts():
+    assert count_rows(FakeSession(7), channel_query(), CountStrategy.EXACT) == (7, CountStrategy.EXACT)
+
+
+def test_estimated_uses_the_planner_estimate(monkeypatch):
+    monkeypatch.setattr(pagination, "_estimate_rows", lambda session, stmt: 1200)
+    session = FakeSession()
+    assert count_rows(session, channel_query(), CountStrategy.ESTIMATED) == (1200, CountStrategy.ESTIMATED)
+    assert session.queries == 0
+
+
+def test_estimated_falls_back_to_exact_without_statistics(monkeypatch):
+    monkeypatch.setattr(pagination, "_estimate_rows", lambda session, stmt: None)
+    assert count_rows(FakeSession(7), channel_query(), CountStrategy.ESTIMATED) == (7, CountStrategy.EXACT)
+
+
+def test_cached_counts_once_per_filter_combination():
+    session = FakeSession(7, 3)
+    assert count_rows(session, channel_query("a"), CountStrategy.CACHED) == (7, CountStrategy.EXACT)
+    assert count_rows(session, channel_query("a"), CountStrategy.CACHED) == (7, CountStrategy.CACHED)
+    assert count_rows(session, channel_query("b"), CountStrategy.CACHED) == (3, CountStrategy.EXACT)
+    assert session.queries == 2
+
+
+def test_cached_count_expires(monkeypatch):
+    monkeypatch.setattr(pagination.settings, "COUNT_CACHE_TTL_SECONDS", -1)
+    session = FakeSession(7, 8)
+    assert count_rows(session, channel_query(), CountStrategy.CACHED) == (7, CountStrategy.EXACT)
+    assert count_rows(session, channel_query(), CountStrategy.CACHED) == (8, CountStrategy.EXACT)
+
+
+@pytest.mark.anyio
+async def test_estimate_binds_the_filter_parameters(db_session):
+    stmt = channel_query("it's").where(models.Channel.telegram_id > 5)
+    estimate = await db_session.run_sync(lambda session: pagination._estimate_rows(session, stmt))
+    assert isinstance(estimate, int) and estimate >= 0
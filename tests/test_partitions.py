@@ -0,0 +1,43 @@
+# tests/test_partitions.py
+
+import datetime
+
+import pytest
+
+from app.core.months import add_months, month_start
+from app.repo.partition_repo import month_partition_name, partition_month
+
+
+def test_partition_name_round_trips():
+    name = month_partition_name("messages", datetime.date(2025, 3, 1))
+    assert name == "messages_y2025m03"
+    assert partition_month("messages", name) == datetime.date(2025, 3, 1)
+
+
+@pytest.mark.parametrize("name", [
+    "messages_default",
+    "message_tags_y2025m03",  # Another parent's partition
+    "messages_y2025m3",
+    "messages_y2025m03_old",
+])
+def test_partition_month_ignores_other_tables(name):
+    assert partition_month("messages", name) is None
+
+
+@pytest.mark.parametrize("month, count, expected", [
+    (datetime.date(2025, 3, 1), 0, datetime.date(2025, 3, 1)),
+    (datetime.date(2025, 3, 31), 1, datetime.date(2025, 4, 1)),
+    (datetime.date(2024, 2, 1), 1, datetime.date(2024, 3, 1)),
+    (datetime.date(2025, 11, 1), 2, datetime.date(2026, 1, 1)),
+    (datetime.date(2025, 1, 1), -1, datetime.date(2024, 12, 1)),
+    (datetime.date(2025, 3, 1), -27, datetime.date(2022, 12, 1)),
+])
+def test_add_months(month, count, expected):
+    assert add_months(month, count) == expected
+
+
+def test_month_bounds_of_a_datetime():
+    moment = datetime.datetime(2024, 12, 31, 23, 59, 59, 999, tzinfo=datetime.timezone.utc)
+    start = month_start(moment)
+    assert start == datetime.datetime(2024, 12, 1, tzinfo=datetime.timezone.utc)
+    assert add_months(start, 1) == datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
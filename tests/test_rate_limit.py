@@ -0,0 +1,53 @@
+# tests/test_rate_limit.py
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import rate_limit
+from app.core.rate_limit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    # Only these modules see the fake clock; asyncio keeps the real one.
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_bucket_bursts_up_to_capacity_then_refills(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0.0
+    clock.now += 100
+    assert [bucket.try_acquire() for _ in range(4)][-1] > 0
+
+
+def test_reserve_queues_callers_in_order(clock):
+    bucket = TokenBucket(rate=1, capacity=1)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 1.0, 2.0]
+    # A later try_acquire waits behind the reservations.
+    assert bucket.try_acquire() == pytest.approx(3.0)
+
+
+def test_pause_blocks_and_resumes_with_one_token(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.pause(30)
+    assert bucket.paused_for == 30
+    assert bucket.try_acquire() == 30
+
+    clock.now += 30
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(0.1)
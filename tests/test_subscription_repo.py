@@ -0,0 +1,31 @@
+# tests/test_subscription_repo.py
+
+import datetime
+import uuid
+
+import pytest
+
+from app.domain import models
+from app.repo.subscription_repo import AsyncSubscriptionRepo
+
+LONG_AGO = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@pytest.mark.anyio
+async def test_a_tag_only_change_produces_a_new_version(db_session):
+    repo = AsyncSubscriptionRepo(db_session)
+    user = models.User(telegram_id=uuid.uuid4().int % 2**62, full_name="Test")
+    subscription = models.Subscription(user=user, query_text="python", tags=[], created_at=LONG_AGO, updated_at=LONG_AGO)
+    db_session.add(subscription)
+    await db_session.flush()
+    before = await repo.get_subscriptions_version()
+
+    tag = models.Tag(name=f"test-{uuid.uuid4()}", description="")
+    await repo.add_tags(subscription, [tag])
+    after = await repo.get_subscriptions_version()
+    assert after != before
+    assert subscription.updated_at > LONG_AGO
+
+    # Tags it already has are no change at all.
+    await repo.add_tags(subscription, [tag])
+    assert await repo.get_subscriptions_version() == after